@@ -0,0 +1,199 @@
+"""
+Benchmark and regression check for the voice command matcher.
+
+Runs every utterance in command_corpus.json through CommandMatcher, fails if
+any action differs from the recorded one, then compares per-command latency
+against the previous if/elif substring chain.
+
+    python benchmarks/bench_command_matcher.py [--iterations N]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.command_matcher import CommandMatcher
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "command_corpus.json")
+
+
+def legacy_process_command(command):
+    """Process a voice command and return the action to take"""
+    # Basic command processing
+    command = command.lower().strip()
+    
+    # Reading commands
+    if any(phrase in command for phrase in ["read note", "read text", "read this"]):
+        return "read:all"
+    elif any(phrase in command for phrase in ["read selection", "read selected"]):
+        return "read:selection"
+    elif "stop reading" in command or "stop speaking" in command:
+        return "read:stop"
+    elif "pause reading" in command or "pause speaking" in command:
+        return "read:pause"
+    elif "resume reading" in command or "continue reading" in command:
+        return "read:resume"
+        
+    # Navigation commands
+    elif any(phrase in command for phrase in ["go to heading", "jump to heading", "go to section"]):
+        for phrase in ["go to heading", "jump to heading", "go to section"]:
+            if phrase in command:
+                title = command.split(phrase, 1)[-1].strip()
+                break
+        if title:
+            return f"nav:heading:{title}"
+    elif any(phrase in command for phrase in ["page up", "scroll up", "previous page"]):
+        return "nav:page_up"
+    elif any(phrase in command for phrase in ["page down", "scroll down", "next page"]):
+        return "nav:page_down"
+    elif "beginning" in command or "start of document" in command:
+        return "nav:top"
+    elif "end" in command or "end of document" in command:
+        return "nav:bottom"
+    elif any(phrase in command for phrase in ["select all", "select everything"]):
+        return "nav:select_all"
+    elif any(phrase in command for phrase in ["copy text", "copy this"]):
+        return "nav:copy"
+    elif any(phrase in command for phrase in ["paste text", "paste here"]):
+        return "nav:paste"
+    elif "undo" in command or "undo that" in command:
+        return "nav:undo"
+    elif "redo" in command or "redo that" in command:
+        return "nav:redo"
+    elif "find" in command or "search for" in command:
+        # Extract search term
+        search_term = command.split("find")[-1].strip() if "find" in command else command.split("search for")[-1].strip()
+        if search_term:
+            return f"nav:find:{search_term}"
+    
+    # File operations
+    elif any(phrase in command for phrase in ["new note", "create note", "start note"]):
+        return "new"
+    elif any(phrase in command for phrase in ["save note", "save this", "save document", "save"]):
+        return "save"
+    elif any(phrase in command for phrase in ["list notes", "show notes", "display notes", "all notes"]):
+        return "list"
+    elif any(phrase in command for phrase in ["clear note", "clear all", "clear text", "erase all"]):
+        return "clear"
+    
+    # Text formatting
+    elif any(phrase in command for phrase in ["make bold", "bold text", "set bold"]):
+        return "format:bold"
+    elif any(phrase in command for phrase in ["make italic", "italicize", "set italic"]):
+        return "format:italic"
+    elif any(phrase in command for phrase in ["regular text", "normal text", "plain text"]):
+        return "format:normal"
+    elif "font size" in command:
+        # Extract number from command
+        import re
+        sizes = re.findall(r'\d+', command)
+        if sizes:
+            return f"format:size:{sizes[0]}"
+        
+    # Color commands
+    elif "color red" in command:
+        return "format:color:red"
+    elif "color blue" in command:
+        return "format:color:blue"
+    elif "color green" in command:
+        return "format:color:green"
+    elif "color black" in command:
+        return "format:color:black"
+    elif "color" in command:
+        # Try to extract color name
+        words = command.split()
+        if len(words) > 1 and "color" in words:
+            color_index = words.index("color") + 1
+            if color_index < len(words):
+                return f"format:color:{words[color_index]}"
+    
+    # App control
+    elif any(phrase in command for phrase in ["quit app", "exit app", "close app", "quit", "exit"]):
+        return "quit"
+    elif "about" in command:
+        return "show:about"
+    elif "help" in command:
+        return "show:help"
+    elif "credits" in command:
+        return "show:credits"
+    
+    # Special formatting
+    elif any(phrase in command for phrase in ["new line", "new paragraph", "line break"]):
+        return "text:\n"
+    elif command.startswith("title:"):
+        return f"format:title:{command[6:]}"
+    elif command.startswith("heading:"):
+        return f"format:heading:{command[8:]}"
+    
+    # Date/Time insertion
+    elif any(phrase in command for phrase in ["insert date", "add date", "current date"]):
+        from datetime import datetime
+        return f"text:{datetime.now().strftime('%Y-%m-%d')}"
+    elif any(phrase in command for phrase in ["insert time", "add time", "current time"]):
+        from datetime import datetime
+        return f"text:{datetime.now().strftime('%H:%M:%S')}"
+    
+    # If no command matches, treat as note text
+    return "text:" + command
+
+
+def check_corpus(matcher, corpus):
+    """Return a list of (command, expected, actual) mismatches"""
+    failures = []
+    for entry in corpus:
+        actual = matcher.match(entry["command"])
+        if "pattern" in entry:
+            ok = re.match(entry["pattern"], actual) is not None
+            expected = entry["pattern"]
+        else:
+            expected = entry["action"]
+            ok = actual == expected
+        # Matching must be deterministic across repeated calls
+        ok = ok and all(matcher.match(entry["command"]) == actual for _ in range(3))
+        if not ok:
+            failures.append((entry["command"], expected, actual))
+    return failures
+
+
+def time_per_command(func, commands, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for command in commands:
+            func(command)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(commands))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    compile_start = time.perf_counter()
+    matcher = CommandMatcher()
+    compile_time = time.perf_counter() - compile_start
+
+    failures = check_corpus(matcher, corpus)
+    for command, expected, actual in failures:
+        print(f"MISMATCH {command!r}: expected {expected!r}, got {actual!r}")
+    print(f"Corpus: {len(corpus) - len(failures)}/{len(corpus)} commands match")
+
+    commands = [entry["command"] for entry in corpus]
+    new = time_per_command(matcher.match, commands, args.iterations)
+    old = time_per_command(legacy_process_command, commands, args.iterations)
+    print(f"Grammar compile: {compile_time * 1e6:.1f} us")
+    print(f"Matcher:       {new * 1e6:.2f} us/command")
+    print(f"Legacy chain:  {old * 1e6:.2f} us/command ({old / new:.2f}x)")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Editor responsiveness benchmark on the offscreen Qt platform.
+
+Builds the real main window headlessly and scripts the operations users
+notice: typing into small and large notes, large pastes, replacing the
+text of big notes, theme switches, storms of cursor moves across mixed
+formatting (each one runs format_changed) and voice actions through
+handle_voice_command.
+
+Every operation is timed twice: its wall time, and the event-loop latency
+after it returns, i.e. how long an event posted right then waits while
+the deferred relayout, repaint and highlighting it queued are processed.
+Together they bound how long a keypress would feel stuck.
+
+    python benchmarks/bench_editor.py [--quick] [--scenarios NAMES] [--json FILE]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from headless import create_window_class
+
+from PySide6.QtCore import QEventLoop, QTimer
+from PySide6.QtGui import QTextCharFormat, QTextCursor, QFont
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "command_corpus.json")
+KB = 1024
+MB = 1024 * KB
+
+WORDS = ("note voice dictation heading paragraph backup editor save list "
+         "speech command outline spell format theme").split()
+
+
+def synthetic_text(size):
+    """Plain text of about size characters, with a heading every 40 lines"""
+    lines = []
+    length = 0
+    index = 0
+    while length < size:
+        if index % 40 == 0:
+            line = f"# Section {index // 40}"
+        else:
+            line = " ".join(WORDS[(index + i) % len(WORDS)] for i in range(10))
+        lines.append(line)
+        length += len(line) + 1
+        index += 1
+    return "\n".join(lines)[:size]
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+        "p90_ms": round(percentile(samples, 0.9) * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+class EditorBenchmark:
+    def __init__(self, app, window):
+        self.app = app
+        self.window = window
+        self.editor = window.text_edit
+        self.results = {}
+
+    def settle(self):
+        """Process everything queued so far and return how long that took"""
+        fired = []
+        start = time.perf_counter()
+        QTimer.singleShot(0, lambda: fired.append(time.perf_counter()))
+        while not fired:
+            self.app.processEvents(QEventLoop.AllEvents)
+        return fired[0] - start
+
+    def measure(self, name, operation, repeats=1, setup=None):
+        """Time operation repeats times, plus the event-loop latency after each"""
+        wall, loop = [], []
+        started = time.perf_counter()
+        for i in range(repeats):
+            if setup is not None:
+                setup(i)
+                self.settle()
+            begin = time.perf_counter()
+            operation(i)
+            wall.append(time.perf_counter() - begin)
+            loop.append(self.settle())
+        self.results[name] = {
+            "count": repeats,
+            "total_s": round(time.perf_counter() - started, 3),
+            "wall": summarize(wall),
+            "event_loop": summarize(loop),
+        }
+
+    def load(self, text, position=None):
+        self.editor.setPlainText(text)
+        cursor = self.editor.textCursor()
+        cursor.setPosition(len(text) // 2 if position is None else position)
+        self.editor.setTextCursor(cursor)
+        self.settle()
+
+    # Scenarios
+
+    def typing(self, sizes, keystrokes):
+        text = "the quick brown fox jumps over the lazy dog. "
+        for size in sizes:
+            self.load(synthetic_text(size))
+            self.measure(f"typing in {size // KB} KB note",
+                         lambda i: QTest.keyClicks(self.editor, text[i % len(text)]),
+                         repeats=keystrokes)
+
+    def paste(self, sizes, repeats):
+        clipboard = QApplication.clipboard()
+        for size in sizes:
+            clipboard.setText(synthetic_text(size))
+            self.measure(f"paste {size // KB} KB",
+                         lambda i: self.editor.paste(),
+                         repeats=repeats,
+                         setup=lambda i: self.load(synthetic_text(64 * KB)))
+
+    def set_text(self, sizes, repeats):
+        for size in sizes:
+            text = synthetic_text(size)
+            self.measure(f"setPlainText {size // KB} KB",
+                         lambda i: self.editor.setPlainText(text),
+                         repeats=repeats,
+                         setup=lambda i: self.editor.clear())
+
+    def themes(self, rounds):
+        self.load(synthetic_text(256 * KB))
+        actions = self.window.theme_group.actions()
+        self.measure("theme switch",
+                     lambda i: actions[i % len(actions)].trigger(),
+                     repeats=rounds * len(actions))
+
+    def format_storm(self, runs, moves):
+        """Cursor moves through alternating bold/italic/plain runs"""
+        self.editor.clear()
+        cursor = self.editor.textCursor()
+        formats = []
+        for weight, italic in ((QFont.Bold, False), (QFont.Normal, True), (QFont.Normal, False)):
+            char_format = QTextCharFormat()
+            char_format.setFontWeight(weight)
+            char_format.setFontItalic(italic)
+            formats.append(char_format)
+        cursor.beginEditBlock()
+        for i in range(runs):
+            cursor.insertText(WORDS[i % len(WORDS)] + " ", formats[i % len(formats)])
+        cursor.endEditBlock()
+        self.editor.moveCursor(QTextCursor.Start)
+        self.settle()
+
+        calls = [0]
+        self.editor.currentCharFormatChanged.connect(lambda f: calls.__setitem__(0, calls[0] + 1))
+        self.measure("format_changed storm (cursor moves)",
+                     lambda i: self.editor.moveCursor(QTextCursor.NextWord),
+                     repeats=moves)
+        self.results["format_changed storm (cursor moves)"]["format_changed_calls"] = calls[0]
+
+    def voice_actions(self, rounds):
+        with open(CORPUS_PATH, encoding="utf-8") as f:
+            commands = [entry["command"] for entry in json.load(f)]
+        self.load(synthetic_text(256 * KB))
+
+        def run(i):
+            self.window.handle_voice_command(commands[i % len(commands)])
+            # Apply dictated text now rather than on the next frame timer
+            self.window.dictation_sink.flush()
+
+        self.measure("voice actions (handle_voice_command)", run, repeats=rounds * len(commands))
+
+
+SCENARIOS = ("typing", "paste", "set_text", "themes", "format_storm", "voice")
+
+
+def run(args):
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = create_window_class()()
+    window.resize(1000, 700)
+    bench = EditorBenchmark(app, window)
+    bench.settle()
+
+    quick = args.quick
+    scenarios = args.scenarios.split(",") if args.scenarios else SCENARIOS
+    for scenario in scenarios:
+        if scenario == "typing":
+            bench.typing([KB, (256 if quick else 2048) * KB], 100 if quick else 300)
+        elif scenario == "paste":
+            bench.paste([100 * KB, MB] if quick else [100 * KB, MB, 5 * MB], 3)
+        elif scenario == "set_text":
+            bench.set_text([100 * KB, MB] if quick else [100 * KB, MB, 10 * MB], 3)
+        elif scenario == "themes":
+            bench.themes(1 if quick else 3)
+        elif scenario == "format_storm":
+            bench.format_storm(5000 if quick else 50000, 300 if quick else 1000)
+        elif scenario == "voice":
+            bench.voice_actions(1 if quick else 3)
+        else:
+            raise SystemExit(f"Unknown scenario {scenario}; choose from {', '.join(SCENARIOS)}")
+
+    window.voice_manager.shutdown()
+    window.spell_checker.stop()
+    return bench.results
+
+
+def print_results(results):
+    print(f"{'operation':<40}{'count':>6}{'wall p50':>10}{'p90':>9}{'max':>10}"
+          f"{'loop p50':>10}{'p90':>9}{'max':>10}  (ms)")
+    for name, stats in results.items():
+        wall, loop = stats["wall"], stats["event_loop"]
+        print(f"{name:<40}{stats['count']:>6}{wall['p50_ms']:>10.2f}{wall['p90_ms']:>9.2f}"
+              f"{wall['max_ms']:>10.2f}{loop['p50_ms']:>10.2f}{loop['p90_ms']:>9.2f}"
+              f"{loop['max_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="smaller documents and fewer repeats")
+    parser.add_argument("--scenarios", help=f"comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"platform": sys.platform, "quick": args.quick, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
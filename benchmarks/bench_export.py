@@ -0,0 +1,107 @@
+"""
+Bulk export benchmark for NoteExporter on the offscreen Qt platform.
+
+Generates a corpus of markup notes in a temporary directory and exports it
+once per worker count, each time into a fresh folder, then once more into
+the last folder to time a resumed export with nothing left to do. Reports
+wall time, notes per second and the speedup over one worker.
+
+    python benchmarks/bench_export.py [--notes 1000] [--size 4096]
+        [--formats html,md,pdf] [--workers 1,2,4,8] [--json FILE]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QGuiApplication
+
+from core.exporter import NoteExporter
+from core.note_manager import NoteManager
+
+WORDS = ("note voice dictation heading paragraph backup editor save list "
+         "speech command outline spell format theme").split()
+
+
+def synthetic_note(index, size):
+    lines = [f"# Note {index}", "", "Some **bold** and *italic* text.", "",
+             "- first item", "- second item", "", "```", "code block", "```", ""]
+    text = "\n".join(lines)
+    words = []
+    while len(text) + sum(len(w) + 1 for w in words) < size:
+        words.append(WORDS[(index + len(words)) % len(WORDS)])
+    return text + " ".join(words) + "\n"
+
+
+def run(args):
+    base = tempfile.mkdtemp(prefix="bench_export_")
+    try:
+        manager = NoteManager(base_dir=base)
+        for i in range(args.notes):
+            with open(os.path.join(manager.notes_path, f"note_{i:06}.txt"), "w",
+                      encoding="utf-8") as f:
+                f.write(synthetic_note(i, args.size))
+
+        formats = args.formats.split(",")
+        results = []
+        for workers in [int(w) for w in args.workers.split(",")]:
+            dest = os.path.join(base, f"export_{workers}")
+            exporter = NoteExporter(manager, dest, formats, max_workers=workers)
+            start = time.perf_counter()
+            summary = exporter.export_all()
+            elapsed = time.perf_counter() - start
+            if summary["failed"]:
+                print(f"{len(summary['failed'])} notes failed, e.g. {summary['failed'][0]}")
+            results.append({"workers": workers, "seconds": elapsed,
+                            "notes_per_second": summary["exported"] / elapsed})
+
+        start = time.perf_counter()
+        summary = exporter.export_all()
+        resume_seconds = time.perf_counter() - start
+        return {"notes": args.notes, "size": args.size, "formats": formats,
+                "cpus": os.cpu_count(), "runs": results,
+                "resume_seconds": resume_seconds, "resume_skipped": summary["skipped"]}
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def print_results(results):
+    print(f"{results['notes']} notes of {results['size']} bytes to "
+          f"{', '.join(results['formats'])} on {results['cpus']} CPUs")
+    print(f"{'Workers':>8}{'Seconds':>10}{'Notes/s':>10}{'Speedup':>10}")
+    baseline = results["runs"][0]["seconds"]
+    for run_result in results["runs"]:
+        print(f"{run_result['workers']:>8}{run_result['seconds']:>10.2f}"
+              f"{run_result['notes_per_second']:>10.1f}{baseline / run_result['seconds']:>9.2f}x")
+    print(f"Resumed export skipped {results['resume_skipped']} notes in "
+          f"{results['resume_seconds'] * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--notes", type=int, default=1000, help="number of notes")
+    parser.add_argument("--size", type=int, default=4096, help="bytes per note")
+    parser.add_argument("--formats", default="html,md,pdf", help="comma-separated formats")
+    parser.add_argument("--workers", default=",".join(
+        str(n) for n in sorted({1, 2, 4, os.cpu_count() or 1})),
+        help="comma-separated worker counts")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv[:1])  # Fonts and PDF output need a GUI application
+    results = run(args)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Storage benchmark for NoteManager and the main window's save/list tasks.
+
+Generates synthetic note corpora in a temporary directory and measures
+NoteManager.generate_filename, save_note, load_note and list_notes, plus
+save_note_as and scan_notes, which run as the main window's save and list
+worker tasks. Each case runs in a fresh process, so its peak RSS is its own.
+
+Reports latency percentiles, throughput and peak RSS per case. Results can
+be stored as a JSON baseline and compared against one later; regressions
+beyond the threshold are flagged and make the script exit with status 1.
+
+    python benchmarks/bench_storage.py [--profile quick|full] [--cases NAMES]
+        [--save-baseline FILE] [--compare FILE] [--threshold 0.25] [--json FILE]
+
+The quick profile uses 10 and 1k notes and files up to 50 MB; the full
+profile adds 100k notes and a 500 MB note.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.note_manager import NoteManager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+KB = 1024
+MB = 1024 * KB
+
+# Case name -> (number of notes, size of each note in bytes)
+PROFILES = {
+    "quick": {
+        "10x1KB": (10, KB),
+        "1kx1KB": (1000, KB),
+        "100x64KB": (100, 64 * KB),
+        "10x1MB": (10, MB),
+        "1x50MB": (1, 50 * MB),
+    },
+    "full": {
+        "10x1KB": (10, KB),
+        "1kx1KB": (1000, KB),
+        "100kx1KB": (100000, KB),
+        "100x64KB": (100, 64 * KB),
+        "10x1MB": (10, MB),
+        "1x50MB": (1, 50 * MB),
+        "1x500MB": (1, 500 * MB),
+    },
+}
+
+# Metrics where a larger value is a regression
+LOWER_IS_BETTER = ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "peak_rss_mb")
+HIGHER_IS_BETTER = ("ops_per_second", "mb_per_second")
+
+WORDS = ("note voice dictation heading paragraph backup editor save list "
+         "speech command outline spell format theme").split()
+
+
+def synthetic_text(size, seed=0):
+    """Text of exactly size bytes made of words and line breaks"""
+    line = " ".join(WORDS[(seed + i) % len(WORDS)] for i in range(12)) + "\n"
+    repeats = size // len(line) + 1
+    return (line * repeats)[:size]
+
+
+def summarize(samples, size=0):
+    """Latency percentiles and throughput for per-operation timings in seconds"""
+    samples = sorted(samples)
+    total = sum(samples)
+    count = len(samples)
+
+    def percentile(fraction):
+        return samples[min(count - 1, int(fraction * count))] * 1000
+
+    result = {
+        "count": count,
+        "mean_ms": round(total / count * 1000, 4),
+        "p50_ms": round(percentile(0.5), 4),
+        "p90_ms": round(percentile(0.9), 4),
+        "p99_ms": round(percentile(0.99), 4),
+        "ops_per_second": round(count / total, 2) if total else 0.0,
+    }
+    if size:
+        result["mb_per_second"] = round(count * size / MB / total, 2) if total else 0.0
+    return result
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (MB if sys.platform == "darwin" else KB), 1)
+
+
+def run_case(count, size, repeats):
+    """Run every operation on a fresh corpus of count notes of size bytes"""
+    base_dir = tempfile.mkdtemp(prefix="storage_bench_")
+    try:
+        manager = NoteManager(base_dir=base_dir)
+        results = {}
+        callbacks = [0]
+
+        def count_callback(*args):
+            callbacks[0] += 1
+
+        filenames = [f"note_{i:06d}.txt" for i in range(count)]
+        contents = [synthetic_text(size, i) for i in range(min(count, 16))]
+
+        results["generate_filename"] = summarize(
+            [timed(manager.generate_filename)[0] for _ in range(max(1000, count))])
+
+        samples = []
+        for i, filename in enumerate(filenames):
+            samples.append(timed(manager.save_note, filename, contents[i % len(contents)])[0])
+        results["save_note"] = summarize(samples, size)
+
+        samples = [timed(manager.load_note, filename)[0] for filename in filenames]
+        results["load_note"] = summarize(samples, size)
+
+        results["list_notes"] = summarize([timed(manager.list_notes)[0] for _ in range(repeats)])
+
+        # The main window's save task writes to the chosen path plus a backup
+        save_dir = os.path.join(base_dir, "saved")
+        os.makedirs(save_dir)
+        samples = []
+        for i in range(min(count, 1000)):
+            path = os.path.join(save_dir, filenames[i])
+            samples.append(timed(manager.save_note_as, path, contents[i % len(contents)],
+                                 count_callback, count_callback)[0])
+        results["save_task"] = summarize(samples, size)
+
+        # The main window's list task, which reports progress per note
+        callbacks[0] = 0
+        samples = [timed(manager.scan_notes, count_callback, count_callback)[0]
+                   for _ in range(repeats)]
+        results["scan_notes_task"] = summarize(samples)
+        results["scan_notes_task"]["callbacks_per_scan"] = callbacks[0] // repeats
+
+        return {"notes": count, "note_bytes": size, "operations": results,
+                "peak_rss_mb": peak_rss_mb()}
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def run_case_isolated(count, size, repeats):
+    """Run a case in a child process so peak RSS is measured per case"""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (count, size, repeats))
+
+
+def compare(results, baseline, threshold):
+    """Return (case, operation, metric, baseline, current, change) regressions"""
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get("cases", {}).get(case)
+        if previous is None:
+            continue
+        pairs = [("-", "peak_rss_mb", previous.get("peak_rss_mb"), current.get("peak_rss_mb"))]
+        for operation, stats in current["operations"].items():
+            old = previous["operations"].get(operation, {})
+            for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+                if metric in stats and metric in old:
+                    pairs.append((operation, metric, old[metric], stats[metric]))
+        for operation, metric, old, new in pairs:
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            if worse:
+                regressions.append((case, operation, metric, old, new, change))
+    return regressions
+
+
+def print_case(case, result):
+    rss = result["peak_rss_mb"]
+    print(f"{case}: {result['notes']} notes of {result['note_bytes'] / KB:.0f} KB"
+          + (f", peak RSS {rss:.1f} MB" if rss is not None else ""))
+    print(f"  {'operation':<18}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+          f"{'ops/s':>12}{'MB/s':>10}")
+    for operation, stats in result["operations"].items():
+        mb = stats.get("mb_per_second")
+        print(f"  {operation:<18}{stats['count']:>8}{stats['p50_ms']:>10.3f}"
+              f"{stats['p90_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['ops_per_second']:>12.1f}"
+              f"{(f'{mb:.1f}' if mb is not None else '-'):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--cases", help="comma-separated case names from the profile")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="runs of list_notes and scan_notes per case")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative change counted as a regression (default 0.25)")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    cases = PROFILES[args.profile]
+    if args.cases:
+        names = args.cases.split(",")
+        unknown = [name for name in names if name not in cases]
+        if unknown:
+            parser.error(f"unknown cases for profile {args.profile}: {', '.join(unknown)}")
+        cases = {name: cases[name] for name in names}
+
+    results = {}
+    for case, (count, size) in cases.items():
+        results[case] = run_case_isolated(count, size, args.repeats)
+        print_case(case, results[case])
+
+    report = {"profile": args.profile, "platform": sys.platform, "cases": results}
+    for path in (args.save_baseline, args.json):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+        for case, operation, metric, old, new, change in regressions:
+            print(f"REGRESSION {case} {operation} {metric}: {old} -> {new} ({change:+.0%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Sync engine benchmark on a generated notes tree.
+
+Builds notes/ and backup/ folders of --notes notes each in a temporary
+directory and syncs them with an empty target folder, then runs the
+cases a shared-drive mirror sees day to day:
+
+    initial      everything copied to the empty target
+    unchanged    nothing changed; only stat() calls and the manifests
+    modified     --modified notes edited locally and pushed
+    pull         the same number edited on the target and pulled
+    cold         local manifests deleted, so every local file is hashed again
+
+Reports wall time, files hashed and copied, MB copied and peak RSS per
+case. Point --target at a mounted drive to measure a real share.
+
+    python benchmarks/bench_sync.py [--notes 100000] [--size 1024]
+        [--modified 1000] [--workers N] [--target DIR] [--json FILE]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.note_manager import NoteManager
+from core.sync_engine import MANIFEST_NAME, PULL, PUSH, SyncEngine
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+MB = 1024 * 1024
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (MB if sys.platform == "darwin" else 1024), 1)
+
+
+def write_tree(manager, count, size):
+    line = "the quick brown fox jumps over the lazy dog\n"
+    text = (line * (size // len(line) + 1))[:size - 8]
+    for i in range(count):
+        content = f"{i:07d}\n" + text
+        for folder in (manager.notes_path, manager.backup_path):
+            with open(os.path.join(folder, f"note_{i:07d}.txt"), "w", encoding="utf-8") as f:
+                f.write(content)
+
+
+def edit_notes(folder, count, step, label):
+    """Append a line to count notes spread over the tree; returns their names"""
+    names = sorted(os.listdir(folder))
+    names = [n for n in names if n.endswith(".txt")][::step][:count]
+    for name in names:
+        with open(os.path.join(folder, name), "a", encoding="utf-8") as f:
+            f.write(f"edited {label}\n")
+    return names
+
+
+def run_case(name, engine):
+    start = time.perf_counter()
+    summary = engine.sync()
+    elapsed = time.perf_counter() - start
+    if summary["failed"]:
+        print(f"{name}: {len(summary['failed'])} failed, e.g. {summary['failed'][0]}")
+    return {"case": name, "seconds": round(elapsed, 3), "hashed": summary["hashed"],
+            "copied": summary[PUSH] + summary[PULL], "mb_copied": round(summary["bytes"] / MB, 2),
+            "conflicts": summary["conflict"], "peak_rss_mb": peak_rss_mb()}
+
+
+def run(args):
+    base = tempfile.mkdtemp(prefix="bench_sync_")
+    # Inside --target, a fresh folder keeps the benchmark away from real files
+    target = tempfile.mkdtemp(prefix="bench_sync_", dir=args.target or base)
+    try:
+        manager = NoteManager(base_dir=os.path.join(base, "local"))
+        print(f"Writing {args.notes} notes and backups...", file=sys.stderr)
+        write_tree(manager, args.notes, args.size)
+        engine = SyncEngine(manager, target, max_workers=args.workers)
+        step = max(1, args.notes // max(1, args.modified))
+
+        results = [run_case("initial", engine), run_case("unchanged", engine)]
+        edit_notes(manager.notes_path, args.modified, step, "locally")
+        results.append(run_case("modified", engine))
+        edit_notes(os.path.join(target, "notes"), args.modified, step, "on the target")
+        results.append(run_case("pull", engine))
+        for folder in (manager.notes_path, manager.backup_path):
+            os.remove(os.path.join(folder, MANIFEST_NAME))
+        results.append(run_case("cold", engine))
+        return {"notes": args.notes, "size": args.size, "modified": args.modified,
+                "workers": engine.max_workers, "results": results}
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+        shutil.rmtree(target, ignore_errors=True)
+
+
+def print_results(results):
+    print(f"{results['notes']} notes + backups of {results['size']} bytes, "
+          f"{results['modified']} modified, {results['workers']} workers")
+    print(f"{'Case':<12}{'Seconds':>10}{'Hashed':>10}{'Copied':>10}{'MB':>10}{'RSS MB':>10}")
+    for case in results["results"]:
+        print(f"{case['case']:<12}{case['seconds']:>10.2f}{case['hashed']:>10}{case['copied']:>10}"
+              f"{case['mb_copied']:>10.1f}{case['peak_rss_mb'] or 0:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--notes", type=int, default=100000, help="notes in the tree")
+    parser.add_argument("--size", type=int, default=1024, help="bytes per note")
+    parser.add_argument("--modified", type=int, default=1000, help="notes edited between syncs")
+    parser.add_argument("--workers", type=int, help="sync threads (default: 4 per CPU)")
+    parser.add_argument("--target", help="folder, e.g. on a mounted drive, to create the "
+                                         "temporary target in (default: the system temp folder)")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Offline benchmark of the voice command pipeline, driven by recorded audio.
+
+Plays a directory of audio files through a fake microphone into the real
+VoiceManager (capture, phrase detection, recognition workers, in-order
+delivery) and dispatches every result through the main window's
+handle_voice_command on a headless Qt platform. Reports throughput,
+per-stage latency from VoiceMetrics and transcript/command accuracy.
+
+Expected transcripts come from transcripts.json in the audio directory
+({"file.wav": "text"} or {"file.wav": {"text": ..., "action": ...}}), or
+from a .txt file next to each recording. The default "oracle" recognizer
+returns the expected transcript of whichever recording a phrase came from,
+so the pipeline itself is measured; pass --backend vosk (or another
+registered backend) to include a real recognizer.
+
+    python benchmarks/bench_voice_pipeline.py [AUDIO_DIR] [--backend NAME]
+        [--workers N] [--speed X] [--latency S] [--json REPORT] [--trace FILE]
+    python benchmarks/bench_voice_pipeline.py --synthesize 40
+
+With --synthesize N and no AUDIO_DIR, N synthetic recordings of commands
+from command_corpus.json are generated into a temporary directory.
+"""
+import argparse
+import difflib
+import json
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr
+from PySide6.QtWidgets import QApplication
+
+from core.audio_capture import RecordedAudioSource, frame_energy
+from core import tracing
+from core.command_matcher import DEFAULT_MATCHER
+from core.recognition_backends import RecognizerBackend, create_backend
+from headless import create_window_class
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "command_corpus.json")
+AUDIO_EXTENSIONS = (".wav", ".aif", ".aiff", ".flac")
+
+
+class OracleBackend(RecognizerBackend):
+    """
+    Fake recognizer returning the expected transcript of the recording a
+    phrase was cut from. Each recording is identified by its loudest chunk,
+    which the capture stream passes through byte for byte.
+    """
+
+    name = "oracle"
+    label = "Oracle (benchmark)"
+    is_local = True
+
+    def __init__(self, recordings, transcripts, latency=0.0, chunk=RecordedAudioSource.CHUNK):
+        self.latency = latency
+        self._probes = []
+        width = RecordedAudioSource.SAMPLE_WIDTH
+        step = chunk * width
+        for (path, raw), text in zip(recordings, transcripts):
+            windows = [raw[i:i + step] for i in range(0, max(1, len(raw) - step + 1), step)]
+            loudest = max(windows, key=lambda w: frame_energy(w, width))
+            self._probes.append((loudest, text))
+
+    def recognize(self, recognizer, audio):
+        if self.latency:
+            time.sleep(self.latency)
+        raw = audio.get_raw_data()
+        for probe, text in self._probes:
+            if probe and probe in raw:
+                return text
+        raise sr.UnknownValueError()
+
+
+def load_corpus(audio_dir):
+    """Recordings in name order with their expected transcripts and actions"""
+    paths = sorted(os.path.join(audio_dir, name) for name in os.listdir(audio_dir)
+                   if name.lower().endswith(AUDIO_EXTENSIONS))
+    manifest = {}
+    manifest_path = os.path.join(audio_dir, "transcripts.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    expected = []
+    for path in paths:
+        entry = manifest.get(os.path.basename(path))
+        if entry is None:
+            sidecar = os.path.splitext(path)[0] + ".txt"
+            if os.path.exists(sidecar):
+                with open(sidecar, encoding="utf-8") as f:
+                    entry = f.read().strip()
+        if entry is None:
+            raise SystemExit(f"No transcript for {path}")
+        if isinstance(entry, str):
+            entry = {"text": entry}
+        text = entry["text"].lower().strip()
+        expected.append({"text": text, "action": entry.get("action") or DEFAULT_MATCHER.match(text)})
+    return paths, expected
+
+
+def synthesize_corpus(audio_dir, count, seed=1):
+    """Write count noise-burst 'utterances' of corpus commands, one per word"""
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        commands = [entry["command"] for entry in json.load(f)]
+    rng = random.Random(seed)
+    rate = RecordedAudioSource.SAMPLE_RATE
+    manifest = {}
+    for index in range(count):
+        text = commands[index % len(commands)]
+        samples = []
+        for _ in text.split():
+            # A syllable-like burst of noise under a sine envelope, then a short gap
+            length = int(rate * rng.uniform(0.25, 0.4))
+            samples.extend(int(rng.uniform(-1, 1) * 8000 * math.sin(math.pi * i / length))
+                           for i in range(length))
+            samples.extend([0] * int(rate * 0.08))
+        name = f"utterance_{index:04d}.wav"
+        with wave.open(os.path.join(audio_dir, name), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+        manifest[name] = text
+    with open(os.path.join(audio_dir, "transcripts.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref, hyp = reference.split(), hypothesis.split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def matched_fraction(expected, actual):
+    """Fraction of expected items found in order (tolerates split or lost phrases)"""
+    matcher = difflib.SequenceMatcher(a=expected, b=actual, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / max(1, len(expected))
+
+
+def run(args):
+    audio_dir = args.audio_dir
+    if audio_dir is None:
+        if not args.synthesize:
+            raise SystemExit("Give an audio directory or --synthesize N")
+        audio_dir = tempfile.mkdtemp(prefix="voice_bench_")
+        synthesize_corpus(audio_dir, args.synthesize)
+    paths, expected = load_corpus(audio_dir)
+    if not paths:
+        raise SystemExit(f"No recordings in {audio_dir}")
+
+    source = RecordedAudioSource(paths, speed=args.speed)
+    if args.backend == "oracle":
+        backend = OracleBackend(source.recordings, [e["text"] for e in expected], args.latency)
+    else:
+        backend = create_backend(args.backend)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = create_window_class()()
+    voice = window.voice_manager
+    # Calibrate per run instead of persisting a threshold for a fake device
+    voice.settings = None
+    voice.source_factory = lambda: source
+    voice.device_key = "benchmark"
+    voice.recognition_workers = args.workers
+    voice.set_backend(backend)
+    voice.set_streaming(args.streaming)
+    voice.metrics.reset()
+
+    started = time.perf_counter()
+    voice.start_listening()
+    timeout = started + source.duration / (args.speed or 1.0) + args.timeout
+    while time.perf_counter() < timeout:
+        app.processEvents()
+        if not voice.capture.is_running and voice.pending_phrases == 0:
+            app.processEvents()  # Deliver the last queued commands
+            break
+        time.sleep(0.002)
+    elapsed = time.perf_counter() - started
+    voice.stop_listening()
+    voice.shutdown()
+
+    received = window.received
+    actions = [DEFAULT_MATCHER.match(command) for command in received]
+    snapshot = voice.metrics.snapshot()
+    report = {
+        "recordings": len(paths),
+        "audio_seconds": round(source.duration, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "phrases_captured": voice.capture.segments_captured,
+        "commands_dispatched": len(received),
+        "commands_per_second": round(len(received) / elapsed, 2) if elapsed else 0.0,
+        "realtime_factor": round(source.duration / elapsed, 2) if elapsed else 0.0,
+        "backend": backend.name,
+        "workers": args.workers,
+        "transcript_accuracy": round(matched_fraction([e["text"] for e in expected], received), 4),
+        "command_accuracy": round(matched_fraction([e["action"] for e in expected], actions), 4),
+        "word_error_rate": round(word_error_rate(" ".join(e["text"] for e in expected),
+                                                 " ".join(received)), 4),
+        "outcomes": snapshot["outcomes"],
+        "errors": window.errors,
+        "latency_ms": snapshot["intervals"],
+    }
+    window.deleteLater()
+    return report
+
+
+def print_report(report):
+    print(f"Recordings:        {report['recordings']} ({report['audio_seconds']:.1f}s of audio)")
+    print(f"Backend:           {report['backend']} with {report['workers']} workers")
+    print(f"Elapsed:           {report['elapsed_seconds']:.2f}s "
+          f"({report['realtime_factor']:.1f}x real time)")
+    print(f"Dispatched:        {report['commands_dispatched']} of "
+          f"{report['phrases_captured']} phrases ({report['commands_per_second']:.1f} commands/s)")
+    print(f"Transcripts:       {100 * report['transcript_accuracy']:.1f}% correct, "
+          f"WER {100 * report['word_error_rate']:.1f}%")
+    print(f"Commands:          {100 * report['command_accuracy']:.1f}% correct")
+    if report["errors"]:
+        print(f"Errors:            {len(report['errors'])} (first: {report['errors'][0]})")
+    print()
+    print(f"{'stage':<12}{'count':>7}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    for name, stats in report["latency_ms"].items():
+        print(f"{name:<12}{stats['count']:>7}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+              f"{stats['p90_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("audio_dir", nargs="?", help="directory of recordings and transcripts")
+    parser.add_argument("--synthesize", type=int, default=0, metavar="N",
+                        help="generate N synthetic recordings when no directory is given")
+    parser.add_argument("--backend", default="oracle",
+                        help="oracle (default) or a registered backend such as vosk")
+    parser.add_argument("--workers", type=int, default=2, help="recognition worker threads")
+    parser.add_argument("--speed", type=float, default=4.0,
+                        help="playback speed relative to real time, 0 for unpaced")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated oracle recognition time in seconds")
+    parser.add_argument("--streaming", action="store_true",
+                        help="use streaming recognition when the backend supports it")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="seconds to wait for results after playback")
+    parser.add_argument("--json", metavar="REPORT", help="also write the report as JSON")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write a Chrome trace of the run across all threads")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracing.enable()
+
+    report = run(args)
+    print_report(report)
+    if args.trace:
+        tracing.disable()
+        print(f"\nWrote {tracing.export(args.trace)} trace events to {args.trace}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["commands_dispatched"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
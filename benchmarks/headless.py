@@ -0,0 +1,70 @@
+"""
+Headless main window shared by the GUI benchmarks.
+
+Import this after putting the repository root on sys.path; it selects the
+offscreen Qt platform unless another one was chosen explicitly.
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def create_window_class():
+    from main import DurangMain
+
+    class HeadlessWindow(DurangMain):
+        """
+        Main window for headless dispatch: modal dialogs, quitting and speech
+        output are recorded instead of performed, everything else runs as is.
+        """
+
+        _ui_ready = False
+
+        def __init__(self):
+            super().__init__()
+            self.received = []
+            self.suppressed = []
+            self.errors = []
+            self.voice_manager.speak_text = lambda text: self.suppressed.append("speak")
+            self.delayed_init()
+
+        def delayed_init(self):
+            # Built right away instead of after the splash timer, and only once
+            if not self._ui_ready:
+                self._ui_ready = True
+                super().delayed_init()
+
+        def check_first_run(self):
+            pass
+
+        def handle_voice_command(self, command):
+            self.received.append(command)
+            super().handle_voice_command(command)
+
+        def on_voice_error(self, error_msg):
+            self.errors.append(error_msg)
+
+        def confirm_action(self, title, message):
+            self.suppressed.append(title)
+            return True
+
+        def save_note(self):
+            self.suppressed.append("save")
+
+        def list_notes(self):
+            self.suppressed.append("list")
+
+        def show_about(self):
+            self.suppressed.append("about")
+
+        def show_voice_commands(self):
+            self.suppressed.append("help")
+
+        def show_credits(self):
+            self.suppressed.append("credits")
+
+        def close(self):
+            self.suppressed.append("quit")
+            return False
+
+    return HeadlessWindow
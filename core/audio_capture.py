@@ -0,0 +1,416 @@
+import math
+import queue
+import threading
+import time
+from array import array
+from collections import deque
+import speech_recognition as sr
+from . import tracing
+
+try:
+    import audioop
+except ImportError:  # Removed from the standard library in Python 3.13
+    audioop = None
+
+
+def frame_energy(frame, sample_width):
+    """RMS energy of a PCM frame, on the same scale as Recognizer.energy_threshold"""
+    if audioop is not None:
+        return audioop.rms(frame, sample_width)
+    if sample_width != 2 or not frame:
+        return 0
+    samples = array("h", frame)
+    return int(math.sqrt(sum(s * s for s in samples) / len(samples)))
+
+
+class AudioCaptureStream:
+    """
+    Long-lived audio capture with a ring buffer and energy-based voice
+    activity detection.
+
+    The source (an sr.AudioSource such as sr.Microphone) is opened once and
+    read continuously by a background thread into a short ring buffer, so
+    push-to-talk starts instantly and includes a pre-roll of the audio just
+    before the button was pressed. While capturing, frames are split into
+    phrases at pauses; each phrase is put on the segments queue as a
+    (segment_id, sr.AudioData) tuple, with ids increasing in capture order.
+
+    With a segment_listener, phrases are streamed to it instead of the
+    queue: segment_started(frames) once speech is detected, segment_frame(frame)
+    for every following frame and segment_finished(segment_id, audio) at the
+    end of the phrase. It is called from the reader thread and must be cheap.
+
+    When reading fails (e.g. the device was unplugged) the source is closed
+    and reopened with growing waits in between; on_error is called once per
+    outage, not for every failed attempt.
+
+    The noise floor is calibrated once per device and persisted through the
+    optional settings object; afterwards the threshold adapts while idle.
+    With a VoiceMetrics object, the end of speech and the moment the audio
+    is handed on are marked for every phrase.
+    """
+
+    CALIBRATION_SECONDS = 0.5
+    ENERGY_RATIO = 1.5        # Speech must be this much louder than the noise floor
+    DYNAMIC_DAMPING = 0.15    # Per-second weight kept from the previous threshold
+    MIN_ENERGY_THRESHOLD = 50
+    RETRY_SECONDS = 0.5       # First wait before reopening a failing source
+    MAX_RETRY_SECONDS = 8.0   # The wait doubles after every failed attempt up to this
+
+    def __init__(self, source_factory=sr.Microphone, device_key="default", settings=None,
+                 buffer_seconds=2.0, preroll_seconds=0.3, pause_threshold=0.8,
+                 phrase_time_limit=10, max_segments=8, segments=None,
+                 segment_listener=None, metrics=None):
+        self.source_factory = source_factory
+        self.device_key = device_key
+        self.settings = settings
+        self.buffer_seconds = buffer_seconds
+        self.preroll_seconds = preroll_seconds
+        self.pause_threshold = pause_threshold
+        self.phrase_time_limit = phrase_time_limit
+        self.segments = segments if segments is not None else queue.Queue(maxsize=max_segments)
+        self.segment_listener = segment_listener
+        self.metrics = metrics          # Optional VoiceMetrics for speech_end/audio_ready
+        self.energy_threshold = None
+        self.on_error = None            # Optional callback(str) for reader errors
+        self.on_segment_ready = None    # Optional callback() when a phrase was queued
+        self.on_segment_dropped = None  # Optional callback(segment_id) when the queue overflowed
+
+        self.source = None
+        self._running = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ring = deque()
+        self._capturing = False
+        self._segment = None
+        self._speech_seen = False
+        self._silent_seconds = 0.0
+        self._segment_seconds = 0.0
+        self._last_saved_threshold = None
+        self._next_segment_id = 0
+        self._streaming = False
+
+    @property
+    def is_running(self):
+        return self._running
+
+    @property
+    def segments_captured(self):
+        """Number of phrases handed on so far"""
+        return self._next_segment_id
+
+    def memory_report(self):
+        """Bytes held by the ring buffer, the phrase in progress and queued phrases"""
+        with self._lock:
+            ring = sum(len(frame) for frame in self._ring)
+            segment = sum(len(frame) for frame in self._segment or ())
+        queued = self.segments.qsize()
+        return {
+            "ring_frames": len(self._ring),
+            "ring_bytes": ring,
+            "phrase_bytes": segment,
+            "queued_phrases": queued,
+        }
+
+    @property
+    def _calibration_key(self):
+        return f"voice/calibration/{self.device_key}"
+
+    def start(self):
+        """Open the source and start the reader thread (no-op if running)"""
+        if self._running:
+            return
+        self.source = self.source_factory()
+        self.source.__enter__()
+        try:
+            self._calibrate()
+        except Exception:
+            self._close_source()
+            raise
+        chunk_seconds = self.source.CHUNK / self.source.SAMPLE_RATE
+        self._ring = deque(maxlen=max(1, int(self.buffer_seconds / chunk_seconds)))
+        self._running = True
+        self._thread = threading.Thread(target=self._read_loop, daemon=True,
+                                        name="audio-capture")
+        self._thread.start()
+
+    def stop(self):
+        """Stop reading, flush any phrase in progress and close the source"""
+        self._running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+        self.end_capture()
+        self._save_calibration()
+        self._close_source()
+
+    def _close_source(self):
+        try:
+            if self.source is not None:
+                self.source.__exit__(None, None, None)
+        except Exception:
+            pass  # Ignore cleanup errors
+        self.source = None
+
+    def _calibrate(self):
+        if self.settings is not None:
+            stored = self.settings.value(self._calibration_key, 0.0)
+            if stored:
+                self.energy_threshold = stored
+                self._last_saved_threshold = stored
+                return
+
+        # Measure the noise floor once for this device
+        frames = int(self.CALIBRATION_SECONDS * self.source.SAMPLE_RATE / self.source.CHUNK)
+        energies = []
+        for _ in range(max(1, frames)):
+            frame = self.source.stream.read(self.source.CHUNK)
+            energies.append(frame_energy(frame, self.source.SAMPLE_WIDTH))
+        noise = sum(energies) / len(energies) if energies else 0
+        self.energy_threshold = max(self.MIN_ENERGY_THRESHOLD, noise * self.ENERGY_RATIO)
+        self._save_calibration()
+
+    def _save_calibration(self):
+        if self.settings is None or self.energy_threshold is None:
+            return
+        if self.energy_threshold != self._last_saved_threshold:
+            self.settings.set_value(self._calibration_key, float(self.energy_threshold))
+            self._last_saved_threshold = self.energy_threshold
+
+    def set_segment_listener(self, listener):
+        """Stream phrases to listener, or queue them again when None"""
+        with self._lock:
+            self._finish_segment()
+            self.segment_listener = listener
+            if self._capturing:
+                self._start_segment()
+
+    def begin_capture(self):
+        """Start collecting a phrase, seeded with the pre-roll from the ring buffer"""
+        with self._lock:
+            self._capturing = True
+            self._start_segment()
+
+    def end_capture(self):
+        """Stop collecting; a phrase in progress is queued for recognition"""
+        with self._lock:
+            self._capturing = False
+            self._finish_segment()
+
+    @property
+    def _preroll_frames(self):
+        if self.source is None:
+            return 0
+        return int(self.preroll_seconds * self.source.SAMPLE_RATE / self.source.CHUNK)
+
+    def _start_segment(self):
+        preroll = self._preroll_frames
+        self._segment = list(self._ring)[-preroll:] if preroll else []
+        self._speech_seen = False
+        self._silent_seconds = 0.0
+        self._segment_seconds = 0.0
+
+    def _finish_segment(self):
+        frames, speech = self._segment, self._speech_seen
+        self._segment = None
+        self._speech_seen = False
+        if not frames or not speech or self.source is None:
+            self._streaming = False
+            return
+        # Speech ended where the trailing silence began
+        speech_end = time.perf_counter() - self._silent_seconds
+        audio = sr.AudioData(b"".join(frames), self.source.SAMPLE_RATE,
+                             self.source.SAMPLE_WIDTH)
+        item = (self._next_segment_id, audio)
+        self._next_segment_id += 1
+        if self.metrics is not None:
+            self.metrics.mark(item[0], "speech_end", speech_end)
+            self.metrics.mark(item[0], "audio_ready")
+        tracing.instant("phrase captured", "voice", segment=item[0], frames=len(frames))
+        if self._streaming:
+            self._streaming = False
+            self.segment_listener.segment_finished(*item)
+            if self.on_segment_ready:
+                self.on_segment_ready()
+            return
+        try:
+            self.segments.put_nowait(item)
+        except queue.Full:
+            # Recognition is falling behind; drop the oldest phrase
+            try:
+                dropped = self.segments.get_nowait()
+                if dropped is not None:
+                    tracing.instant("phrase dropped", "voice", segment=dropped[0])
+                if dropped is not None and self.on_segment_dropped:
+                    self.on_segment_dropped(dropped[0])
+            except queue.Empty:
+                pass
+            self.segments.put_nowait(item)
+        tracing.counter("recognition queue", "voice", phrases=self.segments.qsize())
+        if self.on_segment_ready:
+            self.on_segment_ready()
+
+    def _read_loop(self):
+        source = self.source
+        chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+        damping = self.DYNAMIC_DAMPING ** chunk_seconds
+        retry_seconds = None  # Set while the source is failing
+        while self._running:
+            try:
+                if source is None:
+                    raise OSError("audio device could not be reopened")
+                frame = source.stream.read(source.CHUNK)
+            except Exception as e:
+                if not self._running:
+                    break
+                if retry_seconds is None:
+                    retry_seconds = self.RETRY_SECONDS
+                    if self.on_error:
+                        self.on_error(f"Error reading audio: {str(e)}")
+                self._sleep_while_running(retry_seconds)
+                retry_seconds = min(retry_seconds * 2, self.MAX_RETRY_SECONDS)
+                if self._running:
+                    source = self._reopen_source()
+                continue
+            retry_seconds = None
+            if not frame:
+                # End of a finite source (e.g. a recording)
+                self._running = False
+                break
+
+            energy = frame_energy(frame, source.SAMPLE_WIDTH)
+            is_speech = energy > self.energy_threshold
+
+            with self._lock:
+                self._ring.append(frame)
+                if self._capturing and self._segment is not None:
+                    self._process_frame(frame, is_speech, chunk_seconds)
+
+                if not is_speech and not self._speech_seen:
+                    # Track the noise floor while nobody is talking
+                    target = max(self.MIN_ENERGY_THRESHOLD, energy * self.ENERGY_RATIO)
+                    self.energy_threshold = (self.energy_threshold * damping
+                                             + target * (1 - damping))
+
+        with self._lock:
+            self._finish_segment()
+
+    def _reopen_source(self):
+        """Close the failing source and open a new one; None if that fails too"""
+        with self._lock:
+            # The phrase in progress was cut off by the failure
+            self._finish_segment()
+            if self._capturing:
+                self._start_segment()
+        self._close_source()
+        try:
+            source = self.source_factory()
+            source.__enter__()
+        except Exception:
+            return None
+        self.source = source
+        tracing.instant("audio source reopened", "voice")
+        return source
+
+    def _sleep_while_running(self, seconds):
+        deadline = time.monotonic() + seconds
+        while self._running and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def _process_frame(self, frame, is_speech, chunk_seconds):
+        self._segment.append(frame)
+        self._segment_seconds += chunk_seconds
+        if self._streaming:
+            self.segment_listener.segment_frame(frame)
+        if is_speech:
+            if not self._speech_seen and self.segment_listener is not None:
+                # Speech detected: hand the listener everything collected so far
+                self._streaming = True
+                self.segment_listener.segment_started(list(self._segment))
+            self._speech_seen = True
+            self._silent_seconds = 0.0
+        elif self._speech_seen:
+            self._silent_seconds += chunk_seconds
+
+        if self._speech_seen and (self._silent_seconds >= self.pause_threshold
+                                  or self._segment_seconds >= self.phrase_time_limit):
+            # Phrase complete; keep capturing the next one while the button is held
+            self._finish_segment()
+            self._start_segment()
+        elif not self._speech_seen and len(self._segment) > self._preroll_frames:
+            # Only silence so far: keep no more than the pre-roll
+            del self._segment[0]
+            self._segment_seconds -= chunk_seconds
+
+
+class RecordedAudioSource:
+    """
+    Stand-in for sr.Microphone that plays back recorded audio files.
+
+    Each file (WAV, AIFF or FLAC) is converted to mono 16 kHz 16-bit PCM and
+    followed by silence, so the capture stream sees one phrase per file; the
+    leading silence covers noise-floor calibration. speed paces reads like a
+    live device (1.0 is real time, 0 reads as fast as possible). The source
+    can be entered repeatedly and restarts from the beginning every time, so
+    `lambda: source` works as a source_factory.
+    """
+
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+    CHUNK = 1024
+
+    def __init__(self, paths, gap_seconds=1.5, lead_seconds=1.0, speed=0.0):
+        self.paths = list(paths)
+        self.speed = speed
+        self.stream = None
+        recognizer = sr.Recognizer()
+        bytes_per_second = self.SAMPLE_RATE * self.SAMPLE_WIDTH
+        silence = bytes(int(gap_seconds * bytes_per_second) // 2 * 2)
+        parts = [bytes(int(lead_seconds * bytes_per_second) // 2 * 2)]
+        self.recordings = []  # (path, raw PCM) in playback order
+        for path in self.paths:
+            with sr.AudioFile(path) as source:
+                audio = recognizer.record(source)
+            raw = audio.get_raw_data(convert_rate=self.SAMPLE_RATE,
+                                     convert_width=self.SAMPLE_WIDTH)
+            self.recordings.append((path, raw))
+            parts.append(raw)
+            parts.append(silence)
+        self._data = b"".join(parts)
+
+    @property
+    def duration(self):
+        """Playback length in seconds, including the silence"""
+        return len(self._data) / (self.SAMPLE_RATE * self.SAMPLE_WIDTH)
+
+    def __enter__(self):
+        self.stream = _RecordedStream(self._data, self.SAMPLE_RATE, self.SAMPLE_WIDTH, self.speed)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+class _RecordedStream:
+    """Blocking read(frames) over in-memory PCM, optionally paced"""
+
+    def __init__(self, data, sample_rate, sample_width, speed):
+        self.data = data
+        self.sample_width = sample_width
+        self.bytes_per_second = sample_rate * sample_width
+        self.speed = speed
+        self.position = 0
+        self._started = None
+
+    def read(self, frames):
+        chunk = self.data[self.position:self.position + frames * self.sample_width]
+        self.position += len(chunk)
+        if self.speed > 0:
+            # Sleep until this chunk would have been captured by a live device
+            if self._started is None:
+                self._started = time.perf_counter()
+            due = self._started + self.position / self.bytes_per_second / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return chunk
@@ -0,0 +1,220 @@
+"""
+Command-line note operations without the GUI.
+
+    python main.py --cli list [--long] [--json]
+    python main.py --cli show NAME...
+    python main.py --cli search PATTERN [--ignore-case] [--regex] [--names-only]
+    python main.py --cli save [NAME] < text
+    python main.py --cli export DEST [NAME...]
+    python main.py --cli verify [--repair]
+    python main.py --cli import SOURCE [--ext .txt,.md] [--workers N] [--dry-run]
+    python main.py --cli sync TARGET [--workers N] [--dry-run] [--allow-deletions] [--reset]
+
+Only the standard library and NoteManager are imported, never Qt, widget
+or voice modules, so a call starts fast enough to run once per note in a
+shell pipeline. Every command accepts --dir to work on another notes folder.
+"python -m core.cli ..." is the same without compiling main.py first.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from .note_manager import NoteManager
+from .importer import NoteImporter, TEXT_EXTENSIONS, format_summary
+from .sync_engine import SyncEngine, SyncError, format_summary as format_sync_summary
+
+
+def cmd_list(manager, args):
+    if not args.long and not args.json:
+        for note in sorted(manager.list_notes()):
+            print(note)
+        return 0
+    notes = sorted(manager.scan_notes())
+    if args.json:
+        json.dump([{"name": name, "size": size, "modified": modified.isoformat()}
+                   for name, size, modified in notes], sys.stdout, indent=2)
+        print()
+    else:
+        for name, size, modified in notes:
+            print(f"{modified:%Y-%m-%d %H:%M}  {size:>10}  {name}")
+    return 0
+
+
+def cmd_show(manager, args):
+    status = 0
+    for name in args.names:
+        try:
+            content = manager.load_note(NoteManager.filename_for(name))
+        except FileNotFoundError:
+            print(f"{name}: note not found", file=sys.stderr)
+            status = 1
+            continue
+        sys.stdout.write(content)
+        if content and not content.endswith("\n"):
+            sys.stdout.write("\n")
+    return status
+
+
+def cmd_search(manager, args):
+    found = False
+    last = None
+    for name, number, line in manager.search_notes(args.pattern, args.ignore_case, args.regex):
+        found = True
+        if args.names_only:
+            if name != last:
+                print(name)
+                last = name
+        else:
+            print(f"{name}:{number}:{line}")
+    return 0 if found else 1
+
+
+def cmd_save(manager, args):
+    content = sys.stdin.read()
+    name = NoteManager.filename_for(args.name) if args.name else manager.generate_filename()
+    print(manager.save_note(name, content))
+    return 0
+
+
+def cmd_export(manager, args):
+    names = ([NoteManager.filename_for(name) for name in args.names]
+             or sorted(manager.list_notes()))
+    if args.dest == "-":
+        # One JSON object per line, for pipelines
+        for name in names:
+            print(json.dumps({"name": name, "content": manager.load_note(name)}))
+        return 0
+    os.makedirs(args.dest, exist_ok=True)
+    for name in names:
+        with open(os.path.join(args.dest, name), "w", encoding="utf-8") as f:
+            f.write(manager.load_note(name))
+    print(f"Exported {len(names)} notes to {args.dest}", file=sys.stderr)
+    return 0
+
+
+def cmd_verify(manager, args):
+    problems = manager.verify_backups(repair=args.repair)
+    for name, status in problems:
+        repaired = " (repaired)" if args.repair and status != "orphaned" else ""
+        print(f"{status:<9}{name}{repaired}")
+    unresolved = [p for p in problems if not args.repair or p[1] == "orphaned"]
+    if not problems:
+        print(f"All {len(manager.list_notes())} notes are backed up", file=sys.stderr)
+    return 1 if unresolved else 0
+
+
+def cmd_import(manager, args):
+    importer = NoteImporter(manager, extensions=args.ext.split(","), max_workers=args.workers)
+    summary = importer.import_tree(args.source, dry_run=args.dry_run)
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        for source, note, encoding in summary["imported"]:
+            print(f"{source} -> {note} ({encoding})")
+        for source, existing in summary["duplicates"]:
+            print(f"{source}: duplicate of {existing}", file=sys.stderr)
+    for source, error in summary["failed"]:
+        print(f"{source}: {error}", file=sys.stderr)
+    print(format_summary(summary), file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+def cmd_sync(manager, args):
+    engine = SyncEngine(manager, args.target, max_workers=args.workers)
+    summary = engine.sync(dry_run=args.dry_run, allow_deletions=args.allow_deletions,
+                          reset=args.reset)
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    for path in summary["conflict_copies"]:
+        print(f"Conflict: kept the other version as {path}", file=sys.stderr)
+    for path, error in summary["failed"]:
+        print(f"{path}: {error}", file=sys.stderr)
+    print(format_sync_summary(summary), file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py --cli",
+                                     description="Batch note operations without the GUI")
+    parser.add_argument("--dir", help="folder holding notes/ and backup/ (default: current)")
+    # Commands that need notes/ and backup/ to exist before they run; import
+    # and sync create them themselves, and not at all on a dry run
+    parser.set_defaults(creates_dirs=False)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list notes")
+    list_parser.add_argument("-l", "--long", action="store_true", help="with size and date")
+    list_parser.add_argument("--json", action="store_true", help="as JSON")
+    list_parser.set_defaults(func=cmd_list)
+
+    show_parser = commands.add_parser("show", help="print notes")
+    show_parser.add_argument("names", nargs="+", metavar="NAME")
+    show_parser.set_defaults(func=cmd_show)
+
+    search_parser = commands.add_parser("search", help="find lines in notes")
+    search_parser.add_argument("pattern")
+    search_parser.add_argument("-i", "--ignore-case", action="store_true")
+    search_parser.add_argument("-E", "--regex", action="store_true",
+                               help="treat the pattern as a regular expression")
+    search_parser.add_argument("-l", "--names-only", action="store_true",
+                               help="print only the names of matching notes")
+    search_parser.set_defaults(func=cmd_search)
+
+    save_parser = commands.add_parser("save", help="save standard input as a note")
+    save_parser.add_argument("name", nargs="?", help="note name (default: timestamped)")
+    save_parser.set_defaults(func=cmd_save, creates_dirs=True)
+
+    export_parser = commands.add_parser("export", help="copy notes to a folder")
+    export_parser.add_argument("dest", help="destination folder, or - for JSON lines on stdout")
+    export_parser.add_argument("names", nargs="*", metavar="NAME", help="default: all notes")
+    export_parser.set_defaults(func=cmd_export)
+
+    verify_parser = commands.add_parser("verify", help="check every note has a current backup")
+    verify_parser.add_argument("--repair", action="store_true",
+                               help="copy missing and stale backups again")
+    verify_parser.set_defaults(func=cmd_verify)
+
+    import_parser = commands.add_parser("import", help="copy a folder tree of text files in as notes")
+    import_parser.add_argument("source", help="folder to import, searched recursively")
+    import_parser.add_argument("--ext", default=",".join(TEXT_EXTENSIONS),
+                               help="comma-separated extensions to import (default: %(default)s)")
+    import_parser.add_argument("--workers", type=int, help="files read at once (default: 4 per CPU)")
+    import_parser.add_argument("-n", "--dry-run", action="store_true",
+                               help="report what would be imported without writing")
+    import_parser.add_argument("--json", action="store_true", help="report as JSON")
+    import_parser.set_defaults(func=cmd_import)
+
+    sync_parser = commands.add_parser("sync", help="two-way sync of notes and backups with a folder")
+    sync_parser.add_argument("target", help="existing folder, e.g. on a shared drive")
+    sync_parser.add_argument("--workers", type=int, help="files copied at once (default: 4 per CPU)")
+    sync_parser.add_argument("-n", "--dry-run", action="store_true",
+                             help="report what would change without copying")
+    sync_parser.add_argument("--allow-deletions", action="store_true",
+                             help="go ahead even if many local notes would be deleted")
+    sync_parser.add_argument("--reset", action="store_true",
+                             help="forget the last sync with TARGET: copy both ways, delete nothing")
+    sync_parser.add_argument("--json", action="store_true", help="report as JSON")
+    sync_parser.set_defaults(func=cmd_sync)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Reading commands must not create folders
+    manager = NoteManager(base_dir=args.dir, create_dirs=args.creates_dirs)
+    try:
+        return args.func(manager, args)
+    except BrokenPipeError:
+        # Downstream command (head, grep -m) stopped reading; silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError, re.error, SyncError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
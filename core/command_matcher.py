@@ -0,0 +1,182 @@
+import re
+from datetime import datetime
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+_TERMINAL = None  # Trie key under which the rules ending at a node are stored
+
+
+def _candidate_key(candidate):
+    return candidate[:3]
+
+
+def _text_after(command, spans, end):
+    """Raw command text following the matched phrase"""
+    return command[spans[end - 1][1]:].strip()
+
+
+def _heading_action(command, tokens, spans, end):
+    title = _text_after(command, spans, end)
+    return f"nav:heading:{title}" if title else None
+
+
+def _find_action(command, tokens, spans, end):
+    term = _text_after(command, spans, end)
+    return f"nav:find:{term}" if term else None
+
+
+def _size_action(command, tokens, spans, end):
+    # Prefer a number after "font size", fall back to any number in the command
+    for token in tokens[end:] + tokens[:end]:
+        if token.isdigit():
+            return f"format:size:{token}"
+    return None
+
+
+def _color_action(command, tokens, spans, end):
+    for token in tokens[end:]:
+        if token not in ("to", "the", "in", "into"):
+            return f"format:color:{token}"
+    return None
+
+
+def _date_action(command, tokens, spans, end):
+    return f"text:{datetime.now().strftime('%Y-%m-%d')}"
+
+
+def _time_action(command, tokens, spans, end):
+    return f"text:{datetime.now().strftime('%H:%M:%S')}"
+
+
+# Voice command grammar in priority order: earlier rules win when several
+# phrases occur in one utterance. An action is either a fixed string or a
+# handler(command, tokens, spans, end) that extracts arguments and returns
+# the action, or None to let the next matching rule try.
+DEFAULT_GRAMMAR = [
+    # Reading commands
+    (["read note", "read text", "read this"], "read:all"),
+    (["read selection", "read selected"], "read:selection"),
+    (["stop reading", "stop speaking"], "read:stop"),
+    (["pause reading", "pause speaking"], "read:pause"),
+    (["resume reading", "continue reading"], "read:resume"),
+    (["skip sentence", "next sentence"], "read:skip"),
+
+    # Navigation commands
+    (["go to heading", "jump to heading", "go to section"], _heading_action),
+    (["page up", "scroll up", "previous page"], "nav:page_up"),
+    (["page down", "scroll down", "next page"], "nav:page_down"),
+    (["beginning", "start of document", "go to top"], "nav:top"),
+    (["end", "end of document", "go to bottom"], "nav:bottom"),
+    (["select all", "select everything"], "nav:select_all"),
+    (["copy text", "copy this"], "nav:copy"),
+    (["paste text", "paste here"], "nav:paste"),
+    (["undo"], "nav:undo"),
+    (["redo"], "nav:redo"),
+    (["search for", "find"], _find_action),
+
+    # File operations
+    (["new note", "create note", "start note"], "new"),
+    (["save note", "save this", "save document", "save"], "save"),
+    (["list notes", "show notes", "display notes", "all notes"], "list"),
+    (["clear note", "clear all", "clear text", "erase all"], "clear"),
+
+    # Text formatting
+    (["make bold", "bold text", "set bold"], "format:bold"),
+    (["make italic", "italicize", "set italic"], "format:italic"),
+    (["regular text", "normal text", "plain text"], "format:normal"),
+    (["font size"], _size_action),
+    (["color"], _color_action),
+
+    # App control
+    (["quit app", "exit app", "close app", "quit", "exit"], "quit"),
+    (["about"], "show:about"),
+    (["help"], "show:help"),
+    (["credits"], "show:credits"),
+
+    # Special formatting
+    (["new line", "new paragraph", "line break"], "text:\n"),
+
+    # Date/Time insertion
+    (["insert date", "add date", "current date"], _date_action),
+    (["insert time", "add time", "current time"], _time_action),
+]
+
+# Raw prefixes checked before tokenizing, mapped to the action prefix
+DEFAULT_PREFIXES = [
+    ("title:", "format:title:"),
+    ("heading:", "format:heading:"),
+]
+
+
+class CommandMatcher:
+    """
+    Table-driven voice command matcher.
+
+    The grammar is compiled once into a trie over word tokens, so an
+    utterance is matched in a single pass over its words instead of a chain
+    of substring scans. Phrases only match on whole words ("send" never
+    matches "end"), and when several phrases occur the rule with the highest
+    priority (earliest in the grammar) wins, then the earliest position.
+    Anything that matches no rule is returned as "text:<command>".
+    """
+
+    def __init__(self, grammar=DEFAULT_GRAMMAR, prefixes=DEFAULT_PREFIXES):
+        self._trie = {}
+        self._prefixes = list(prefixes)
+        for priority, (phrases, action) in enumerate(grammar):
+            for phrase in phrases:
+                self._add(phrase, priority, action)
+
+    def _add(self, phrase, priority, action):
+        node = self._trie
+        for token in TOKEN_RE.findall(phrase.lower()):
+            node = node.setdefault(token, {})
+        node.setdefault(_TERMINAL, []).append((priority, action))
+
+    def _candidates(self, tokens):
+        """All (priority, start, -end, action) phrase matches in the utterance"""
+        found = []
+        trie = self._trie
+        count = len(tokens)
+        for start in range(count):
+            node = trie.get(tokens[start])
+            end = start + 1
+            while node is not None:
+                terminal = node.get(_TERMINAL)
+                if terminal:
+                    for priority, action in terminal:
+                        # Negated end: longer phrases win at equal priority/position
+                        found.append((priority, start, -end, action))
+                if end == count:
+                    break
+                node = node.get(tokens[end])
+                end += 1
+        return found
+
+    def match(self, command):
+        """Return the action string for a spoken command"""
+        command = command.lower().strip()
+
+        for prefix, action_prefix in self._prefixes:
+            if command.startswith(prefix):
+                return action_prefix + command[len(prefix):]
+
+        tokens = TOKEN_RE.findall(command)
+
+        candidates = self._candidates(tokens)
+        if candidates:
+            candidates.sort(key=_candidate_key)
+            spans = None
+            for priority, start, end, action in candidates:
+                if not callable(action):
+                    return action
+                if spans is None:
+                    spans = [m.span() for m in TOKEN_RE.finditer(command)]
+                result = action(command, tokens, spans, -end)
+                if result is not None:
+                    return result
+
+        # If no command matches, treat as note text
+        return "text:" + command
+
+DEFAULT_MATCHER = CommandMatcher()
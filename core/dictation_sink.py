@@ -0,0 +1,62 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+from . import tracing
+
+
+class DictationSink(QObject):
+    """
+    Coalesces dictated text into one document edit per frame.
+
+    Recognized utterances are buffered and applied together when the frame
+    timer fires, as a single insert inside one edit block (through the
+    UndoManager, so dictation grouping still applies). Relayout, the cursor
+    and format change signals and the toolbar refresh they trigger then run
+    once per batch instead of once per utterance. Anything that must see the
+    dictated text first (other commands, saving) calls flush().
+
+    With a VoiceMetrics object, utterances appended with their segment id
+    are marked executed, and their traces finished, when they are inserted.
+    """
+
+    flushed = Signal(str, int)  # Text inserted and the number of utterances it held
+
+    def __init__(self, undo_manager, interval_ms=16, metrics=None):
+        super().__init__()
+        self.undo_manager = undo_manager
+        self.metrics = metrics
+        self._pending = []
+        self._segments = []  # Segment ids of the buffered utterances, for metrics
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def pending(self):
+        """Buffered text not yet in the document"""
+        return "".join(self._pending)
+
+    def append(self, text, segment_id=None):
+        """Queue dictated text for the next frame"""
+        if not text:
+            return
+        self._pending.append(text)
+        if segment_id is not None:
+            self._segments.append(segment_id)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """Insert everything buffered now"""
+        self._timer.stop()
+        if not self._pending:
+            return
+        count = len(self._pending)
+        text = "".join(self._pending)
+        segments, self._pending, self._segments = self._segments, [], []
+        with tracing.span("dictation flush", "gui", utterances=count):
+            self.undo_manager.insert_dictation(text)
+        if self.metrics is not None:
+            for segment_id in segments:
+                self.metrics.mark(segment_id, "executed")
+                self.metrics.finish(segment_id, action="text")
+        self.flushed.emit(text, count)
@@ -0,0 +1,232 @@
+import json
+import os
+import queue
+import threading
+from PySide6.QtCore import QMarginsF, QRunnable, QThreadPool
+from PySide6.QtGui import QPageLayout, QPageSize, QPdfWriter, QTextDocument
+from . import tracing
+
+# Format -> extension of the exported file
+FORMATS = {
+    "html": ".html",
+    "md": ".md",
+    "pdf": ".pdf",
+}
+
+MANIFEST_NAME = ".export-manifest.jsonl"
+
+
+class _RenderTask(QRunnable):
+    """Renders one note on the exporter's pool and queues (name, stat, formats, error)"""
+
+    def __init__(self, exporter, name, stat, formats, results):
+        super().__init__()
+        self.exporter = exporter
+        self.name = name
+        self.stat = stat
+        self.formats = formats
+        self.results = results
+
+    def run(self):
+        try:
+            with tracing.span("export note", "export", name=self.name):
+                self.exporter.render_note(self.name, self.formats)
+            self.results.put((self.name, self.stat, self.formats, None))
+        except Exception as e:
+            self.results.put((self.name, self.stat, self.formats, str(e)))
+
+
+class NoteExporter:
+    """
+    Exports every note in the notes folder to HTML, Markdown and/or PDF.
+
+    Each note is rendered with its own offscreen QTextDocument on a pool of
+    max_workers threads (QThreadPool, since text layout needs QThreads).
+    At most two notes per thread are queued at a time, and every file is
+    written as soon as its note is rendered, so memory stays flat however
+    many notes there are.
+
+    Progress is kept in a manifest in the destination folder, one line per
+    finished note with the size, modification time and markup setting it was
+    exported with. Running the export again skips notes that are unchanged
+    and already exported in the requested formats, so an interrupted or
+    cancelled export resumes where it stopped.
+
+    With markup on, notes are read as the editor's Markdown-style markup;
+    otherwise as plain text. Markdown output is the note text itself.
+    """
+
+    def __init__(self, note_manager, dest_dir, formats=("html",), markup=True, max_workers=None):
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown export format: {', '.join(sorted(unknown))}")
+        if not formats:
+            raise ValueError("No export format selected")
+        self.note_manager = note_manager
+        self.dest_dir = dest_dir
+        self.formats = [f for f in FORMATS if f in formats]
+        self.markup = markup
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._cancelled = threading.Event()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.dest_dir, MANIFEST_NAME)
+
+    def cancel(self):
+        """Stop after the notes being rendered; safe to call from any thread"""
+        self._cancelled.set()
+
+    def output_path(self, name, fmt):
+        return os.path.join(self.dest_dir, os.path.splitext(name)[0] + FORMATS[fmt])
+
+    def render_note(self, name, formats):
+        """Write one note in the given formats; runs on a pool thread"""
+        with open(os.path.join(self.note_manager.notes_path, name), "r",
+                  encoding="utf-8", errors="replace") as f:
+            text = f.read()
+
+        doc = QTextDocument()
+        if self.markup:
+            doc.setMarkdown(text)
+        else:
+            doc.setPlainText(text)
+        doc.setMetaInformation(QTextDocument.DocumentTitle, os.path.splitext(name)[0])
+
+        for fmt in formats:
+            target = self.output_path(name, fmt)
+            # Write beside the target and rename, so an interrupted export
+            # never leaves a truncated file under the real name
+            partial = target + ".part"
+            if fmt == "pdf":
+                writer = QPdfWriter(partial)
+                writer.setTitle(os.path.splitext(name)[0])
+                writer.setPageSize(QPageSize(QPageSize.A4))
+                writer.setPageMargins(QMarginsF(15, 15, 15, 15), QPageLayout.Millimeter)
+                doc.print_(writer)
+                del writer  # The file is completed when the writer is destroyed
+            else:
+                with open(partial, "w", encoding="utf-8") as f:
+                    f.write(doc.toHtml() if fmt == "html" else text)
+            os.replace(partial, target)
+
+    def load_manifest(self):
+        """Return name -> entry for the notes recorded by earlier exports"""
+        entries = {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries[entry["name"]] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Line cut short by an interrupted export
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _write_manifest(self, entries):
+        partial = self.manifest_path + ".part"
+        with open(partial, "w", encoding="utf-8") as f:
+            for name in sorted(entries):
+                f.write(json.dumps(entries[name]) + "\n")
+        os.replace(partial, self.manifest_path)
+
+    def _is_current(self, entry, stat):
+        return (entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+                and entry.get("markup") == self.markup)
+
+    def pending_formats(self, name, stat, entry):
+        """Formats a note still needs, given its manifest entry (or None)"""
+        if entry is None or not self._is_current(entry, stat):
+            return list(self.formats)
+        done = set(entry.get("formats", ()))
+        return [f for f in self.formats
+                if f not in done or not os.path.exists(self.output_path(name, f))]
+
+    def export_all(self, names=None, resume=True, progress_callback=None, status_callback=None):
+        """
+        Export the given notes (default: all of them).
+        Runs as a worker task; the callbacks report progress and status.
+
+        Returns:
+            dict: Counts of exported and skipped notes, (name, error) pairs
+            for failed ones, whether it was cancelled, and the destination
+        """
+        progress_callback = progress_callback or _ignore
+        status_callback = status_callback or _ignore
+        self._cancelled.clear()
+
+        status_callback("Preparing export...")
+        os.makedirs(self.dest_dir, exist_ok=True)
+        names = sorted(names if names is not None else self.note_manager.list_notes())
+        manifest = self.load_manifest() if resume else {}
+
+        work = []
+        skipped = 0
+        for name in names:
+            stat = os.stat(os.path.join(self.note_manager.notes_path, name))
+            formats = self.pending_formats(name, stat, manifest.get(name))
+            if formats:
+                work.append((name, stat, formats))
+            else:
+                skipped += 1
+
+        total = len(work)
+        exported = 0
+        failed = []
+        results = queue.Queue()
+        pool = QThreadPool()
+        pool.setMaxThreadCount(self.max_workers)
+        window = self.max_workers * 2
+        next_index = in_flight = 0
+        last_percent = -1
+
+        with open(self.manifest_path, "a", encoding="utf-8") as log:
+            while next_index < total or in_flight:
+                while (next_index < total and in_flight < window
+                       and not self._cancelled.is_set()):
+                    name, stat, formats = work[next_index]
+                    pool.start(_RenderTask(self, name, stat, formats, results))
+                    next_index += 1
+                    in_flight += 1
+                if not in_flight:
+                    break  # Cancelled with nothing left running
+
+                name, stat, formats, error = results.get()
+                in_flight -= 1
+                if error is not None:
+                    failed.append((name, error))
+                    continue
+                exported += 1
+                entry = manifest.get(name)
+                if entry and self._is_current(entry, stat):
+                    formats = sorted(set(entry.get("formats", ())) | set(formats))
+                manifest[name] = {"name": name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                  "markup": self.markup, "formats": formats}
+                # Flushed per note, so a crash loses at most the notes in flight
+                log.write(json.dumps(manifest[name]) + "\n")
+                log.flush()
+
+                percent = int(100 * (exported + len(failed)) / total)
+                if percent != last_percent:
+                    last_percent = percent
+                    progress_callback(percent)
+                    status_callback(f"Exporting notes... {exported + len(failed)}/{total}")
+
+        pool.waitForDone()
+        # Appended lines repeat notes exported more than once; keep the last of each
+        self._write_manifest(manifest)
+        progress_callback(100)
+
+        return {
+            "exported": exported,
+            "skipped": skipped,
+            "failed": failed,
+            "cancelled": self._cancelled.is_set() and next_index < total,
+            "dest": self.dest_dir,
+        }
+
+
+def _ignore(*args):
+    pass
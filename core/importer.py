@@ -0,0 +1,295 @@
+import codecs
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from . import tracing
+
+try:
+    import charset_normalizer
+except ImportError:  # Optional; without it undecodable UTF-8 falls back to cp1252
+    charset_normalizer = None
+
+# Extensions imported by default
+TEXT_EXTENSIONS = (".txt", ".text", ".md", ".markdown", ".rst", ".org")
+
+# Byte order marks, longest first so UTF-32 is not taken for UTF-16
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+_UNSAFE_CHARS = re.compile(r'[^\w\-. ]+')
+
+
+def detect_encoding(data):
+    """
+    Guess the encoding of a text file's bytes.
+
+    Byte order marks win; then BOM-less UTF-16, recognised by its zero
+    bytes; then UTF-8, which rarely decodes text that is not UTF-8; then
+    charset_normalizer if installed; cp1252 (Windows "ANSI") otherwise.
+
+    Raises:
+        ValueError: The data looks binary rather than text
+    """
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+
+    # ASCII text in UTF-16 has a zero byte in every other position
+    sample = data[:4096]
+    if len(sample) >= 4:
+        even, odd = sample[0::2].count(0), sample[1::2].count(0)
+        if odd > len(sample) * 0.4 and even == 0:
+            return "utf-16-le"
+        if even > len(sample) * 0.4 and odd == 0:
+            return "utf-16-be"
+    if b"\x00" in data:
+        raise ValueError("Binary file")
+
+    try:
+        data.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    if charset_normalizer is not None:
+        match = charset_normalizer.from_bytes(data).best()
+        if match is not None:
+            return match.encoding
+    try:
+        data.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"  # Decodes any bytes
+
+
+def content_hash(text):
+    """Hash of a note's text, ignoring the line ending convention"""
+    return hashlib.sha256(normalize_newlines(text).encode("utf-8")).hexdigest()
+
+
+def normalize_newlines(text):
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class NoteImporter:
+    """
+    Imports a tree of text files into the notes folder.
+
+    Every file under the source folder with one of the given extensions is
+    read, decoded with its detected encoding and saved through
+    NoteManager.save_note (so it is backed up like any other note) with its
+    original modification time. Files are read and saved on a pool of
+    max_workers threads, at most two per thread at a time; duplicates and
+    names are settled in source order, so a tree always imports the same way.
+
+    Files whose text matches an existing note, or another file of the same
+    import, are skipped as duplicates; line endings do not count. Notes are
+    named after the file, plus "_2", "_3", ... when the name is taken, so
+    nothing is overwritten. A failure is reported per file and never stops
+    the rest of the import.
+    """
+
+    def __init__(self, note_manager, extensions=TEXT_EXTENSIONS, max_workers=None):
+        self.note_manager = note_manager
+        self.extensions = tuple(e.lower() if e.startswith(".") else "." + e.lower()
+                                for e in extensions)
+        # Mostly waiting on the disk, so more threads than cores pay off
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self._hashes = {}  # Content hash -> note filename
+        self._names = set()  # Lowercased note filenames taken
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop starting new files; safe to call from any thread"""
+        self._cancelled.set()
+
+    def find_sources(self, source_dir):
+        """Paths of the importable files under source_dir, skipping hidden folders"""
+        sources = []
+        for root, dirs, files in os.walk(source_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if not name.startswith(".") and name.lower().endswith(self.extensions):
+                    sources.append(os.path.join(root, name))
+        return sources
+
+    def _index_existing(self):
+        """Hash the notes already in the folder so re-imports are caught"""
+        self._names = {name.lower() for name in os.listdir(self.note_manager.notes_path)}
+        self._hashes = {}
+        notes = self.note_manager.list_notes()
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="import-index") as pool:
+            for name, digest in zip(notes, pool.map(self._hash_note, notes)):
+                if digest is not None:
+                    self._hashes.setdefault(digest, name)
+
+    def _hash_note(self, name):
+        try:
+            return content_hash(self.note_manager.load_note(name))
+        except (OSError, UnicodeDecodeError):
+            return None  # Unreadable notes cannot be duplicates of anything
+
+    def _reserve_name(self, path):
+        """Claim a free note filename based on the source file's name"""
+        stem = _UNSAFE_CHARS.sub("_", os.path.splitext(os.path.basename(path))[0]).strip(" ._")
+        stem = stem or "imported"
+        filename = f"{stem}.txt"
+        counter = 2
+        # Compared lowercased, as the notes folder may be on a case-insensitive file system
+        while filename.lower() in self._names:
+            filename = f"{stem}_{counter}.txt"
+            counter += 1
+        self._names.add(filename.lower())
+        return filename
+
+    def read_file(self, path):
+        """
+        Read and decode one source file; runs on a pool thread.
+
+        Returns:
+            tuple: (text with "\\n" line endings, encoding, content hash, size in bytes)
+        """
+        with tracing.span("read import", "import"):
+            with open(path, "rb") as f:
+                data = f.read()
+            encoding = detect_encoding(data)
+            text = normalize_newlines(data.decode(encoding))
+            return text, encoding, content_hash(text), len(data)
+
+    def save_file(self, filename, text, path):
+        """Save one imported note with its source's modification time; runs on a pool thread"""
+        with tracing.span("save import", "import"):
+            self.note_manager.save_note(filename, text)
+            mtime = os.path.getmtime(path)
+            for folder in (self.note_manager.notes_path, self.note_manager.backup_path):
+                os.utime(os.path.join(folder, filename), (mtime, mtime))
+
+    def import_tree(self, source_dir, dry_run=False, progress_callback=None, status_callback=None):
+        """
+        Import every matching file under source_dir.
+        Runs as a worker task; the callbacks report progress and status.
+
+        Returns:
+            dict: (source, note, encoding) for imported files, (source,
+            existing note) for duplicates, (source, error) for failures,
+            bytes read, seconds taken and whether it was cancelled
+        """
+        progress_callback = progress_callback or _ignore
+        status_callback = status_callback or _ignore
+        self._cancelled.clear()
+        start = time.perf_counter()
+
+        if not os.path.isdir(source_dir):
+            raise FileNotFoundError(f"Not a folder: {source_dir}")
+        status_callback("Finding files to import...")
+        if not dry_run:
+            self.note_manager.create_dirs()
+        sources = self.find_sources(source_dir)
+        status_callback("Checking existing notes...")
+        if os.path.isdir(self.note_manager.notes_path):
+            self._index_existing()
+
+        imported, duplicates, failed = [], [], []
+        total_bytes = 0
+        finished = 0
+        last_percent = -1
+        reads = deque()  # (path, future) in source order
+        saves = {}  # future -> (source, filename, encoding)
+        window = self.max_workers * 2  # Bounds the files held in memory
+        index = 0
+
+        def report():
+            nonlocal last_percent
+            percent = int(100 * finished / len(sources))
+            if percent != last_percent:
+                last_percent = percent
+                progress_callback(percent)
+                status_callback(f"Importing... {finished}/{len(sources)}")
+
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="import") as pool:
+            while True:
+                while (index < len(sources) and len(reads) + len(saves) < window
+                       and not self._cancelled.is_set()):
+                    reads.append((sources[index], pool.submit(self.read_file, sources[index])))
+                    index += 1
+                if not reads and not saves:
+                    break
+
+                # Reads finish in any order but are named in source order, so
+                # the same tree always gives the same note names
+                if reads and (reads[0][1].done() or not saves):
+                    path, future = reads.popleft()
+                    source = os.path.relpath(path, source_dir)
+                    try:
+                        text, encoding, digest, size = future.result()
+                    except Exception as e:
+                        failed.append((source, str(e)))
+                        finished += 1
+                        report()
+                        continue
+                    total_bytes += size
+                    existing = self._hashes.get(digest)
+                    if existing is not None:
+                        duplicates.append((source, existing))
+                        finished += 1
+                        report()
+                        continue
+                    filename = self._reserve_name(path)
+                    self._hashes[digest] = filename
+                    if dry_run:
+                        imported.append((source, filename, encoding))
+                        finished += 1
+                        report()
+                    else:
+                        saves[pool.submit(self.save_file, filename, text, path)] = (
+                            source, filename, encoding)
+                    continue
+
+                waiting = set(saves) | ({reads[0][1]} if reads else set())
+                done, _ = wait(waiting, return_when=FIRST_COMPLETED)
+                for future in done & set(saves):
+                    source, filename, encoding = saves.pop(future)
+                    try:
+                        future.result()
+                        imported.append((source, filename, encoding))
+                    except Exception as e:
+                        failed.append((source, str(e)))
+                    finished += 1
+                    report()
+
+        progress_callback(100)
+        return {
+            "imported": sorted(imported),
+            "duplicates": sorted(duplicates),
+            "failed": sorted(failed),
+            "bytes": total_bytes,
+            "seconds": time.perf_counter() - start,
+            "cancelled": self._cancelled.is_set() and finished < len(sources),
+            "dry_run": dry_run,
+        }
+
+
+def format_summary(summary):
+    """One line describing an import_tree() result"""
+    seconds = max(summary["seconds"], 1e-9)
+    files = len(summary["imported"]) + len(summary["duplicates"])
+    verb = "Would import" if summary["dry_run"] else "Imported"
+    text = (f"{verb} {len(summary['imported'])} notes, skipped {len(summary['duplicates'])} "
+            f"duplicates, {len(summary['failed'])} failed "
+            f"({files / seconds:.0f} files/s, {summary['bytes'] / seconds / 1024 / 1024:.1f} MB/s)")
+    if summary["cancelled"]:
+        text += "; stopped early"
+    return text
+
+
+def _ignore(*args):
+    pass
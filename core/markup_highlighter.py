@@ -0,0 +1,185 @@
+import re
+from PySide6.QtCore import QPoint, QTimer
+from PySide6.QtGui import QSyntaxHighlighter, QTextCharFormat, QFont, QColor
+from . import tracing
+
+# Block state bits carried from one block to the next
+STATE_CODE_FENCE = 0x1  # Block is inside a ``` fence
+STATE_STYLED = 0x2      # Formats were applied for the block's current text
+
+
+class MarkupHighlighter(QSyntaxHighlighter):
+    """
+    Lightweight Markdown-style markup highlighter for the note editor.
+
+    Headings ("# Title", "## Heading"), list items, **bold**, *italic* and
+    fenced code blocks are styled in place, so the markup lives in the plain
+    text and survives toPlainText() saves.
+
+    Only blocks near the viewport are styled. Blocks outside it get their
+    block state computed (so fences still cascade correctly) but no formats;
+    they are styled when they scroll into view. Qt only re-runs blocks that
+    changed, and stops cascading once a block's state is unchanged.
+
+    When a SpellChecker is attached, misspelled words in styled blocks are
+    underlined as well.
+    """
+
+    HEADING_RE = re.compile(r'^(#{1,6})\s+\S')
+    LIST_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+    BOLD_RE = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+    ITALIC_RE = re.compile(r'(?<![*_\w])([*_])(?=[^\s*_])(.+?)(?<=[^\s*_])\1(?![*_\w])')
+    FENCE_RE = re.compile(r'^\s*```')
+
+    HEADING_SIZES = {1: 24, 2: 18, 3: 15, 4: 13, 5: 12, 6: 11}
+    VIEWPORT_MARGIN = 20  # Extra blocks styled above and below the viewport
+
+    def __init__(self, text_edit):
+        super().__init__(text_edit.document())
+        self.text_edit = text_edit
+        self.enabled = True
+        self.spell_checker = None
+        self._first_visible = 0
+        self._last_visible = self._estimate_visible_rows()
+        self._build_formats()
+
+        # Coalesce scroll/resize/edit notifications into one viewport pass
+        self._viewport_timer = QTimer(self)
+        self._viewport_timer.setSingleShot(True)
+        self._viewport_timer.setInterval(0)
+        self._viewport_timer.timeout.connect(self.highlight_viewport)
+
+        text_edit.verticalScrollBar().valueChanged.connect(self._schedule_viewport_update)
+        text_edit.document().contentsChanged.connect(self._schedule_viewport_update)
+        text_edit.document().documentLayout().documentSizeChanged.connect(
+            self._schedule_viewport_update)
+
+    def _build_formats(self):
+        self.heading_formats = {}
+        for level, size in self.HEADING_SIZES.items():
+            fmt = QTextCharFormat()
+            fmt.setFontPointSize(size)
+            fmt.setFontWeight(QFont.Bold)
+            self.heading_formats[level] = fmt
+
+        self.marker_format = QTextCharFormat()
+        self.marker_format.setForeground(QColor(128, 128, 128))
+
+        self.bold_format = QTextCharFormat()
+        self.bold_format.setFontWeight(QFont.Bold)
+
+        self.italic_format = QTextCharFormat()
+        self.italic_format.setFontItalic(True)
+
+        self.code_format = QTextCharFormat()
+        self.code_format.setFontFamilies(["Consolas", "Courier New", "monospace"])
+        self.code_format.setForeground(QColor(160, 160, 160))
+
+        self.spelling_color = QColor(220, 50, 50)
+
+    def _schedule_viewport_update(self, *args):
+        self._viewport_timer.start()
+
+    def set_enabled(self, enabled):
+        """Turn markup styling on or off"""
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        self.rehighlight()
+
+    def set_spell_checker(self, spell_checker):
+        """Attach a SpellChecker whose results are underlined in the editor"""
+        if self.spell_checker is not None:
+            self.spell_checker.results_ready.disconnect(self.refresh_viewport)
+        self.spell_checker = spell_checker
+        if spell_checker is not None:
+            spell_checker.results_ready.connect(self.refresh_viewport)
+        self.refresh_viewport()
+
+    def _estimate_visible_rows(self):
+        line_height = max(1, self.text_edit.fontMetrics().lineSpacing())
+        return self.text_edit.viewport().height() // line_height + 1
+
+    def _is_near_viewport(self, block_number):
+        return (self._first_visible - self.VIEWPORT_MARGIN <= block_number
+                <= self._last_visible + self.VIEWPORT_MARGIN)
+
+    @tracing.traced("highlight viewport", "gui")
+    def highlight_viewport(self):
+        """Style blocks that scrolled into view but were skipped so far"""
+        viewport = self.text_edit.viewport()
+        first = self.text_edit.cursorForPosition(QPoint(0, 0)).block()
+        last = self.text_edit.cursorForPosition(
+            QPoint(viewport.width(), viewport.height())).block()
+        self._first_visible = first.blockNumber()
+        # Large documents are laid out incrementally; fall back to an estimate
+        self._last_visible = max(last.blockNumber(),
+                                 self._first_visible + self._estimate_visible_rows())
+
+        if not self.enabled and self.spell_checker is None:
+            return
+        self._rehighlight_viewport(force=False)
+
+    def refresh_viewport(self):
+        """Restyle every block near the viewport, e.g. after spell-check results"""
+        self._rehighlight_viewport(force=True)
+
+    def _rehighlight_viewport(self, force):
+        document = self.document()
+        block = document.findBlockByNumber(
+            max(0, self._first_visible - self.VIEWPORT_MARGIN))
+        end_number = self._last_visible + self.VIEWPORT_MARGIN
+        while block.isValid() and block.blockNumber() <= end_number:
+            state = block.userState()
+            if force or state == -1 or not state & STATE_STYLED:
+                self.rehighlightBlock(block)
+            block = block.next()
+
+    def highlightBlock(self, text):
+        previous = self.previousBlockState()
+        in_fence = previous != -1 and bool(previous & STATE_CODE_FENCE)
+        is_fence_line = bool(self.FENCE_RE.match(text))
+
+        # Fence state is always tracked so edits cascade only as far as needed
+        state = STATE_CODE_FENCE if in_fence != is_fence_line else 0
+
+        if not self._is_near_viewport(self.currentBlock().blockNumber()):
+            self.setCurrentBlockState(state)
+            return
+        self.setCurrentBlockState(state | STATE_STYLED)
+
+        if in_fence or is_fence_line:
+            if self.enabled:
+                self.setFormat(0, len(text), self.code_format)
+            return
+
+        if self.enabled:
+            self._apply_markup(text)
+        if self.spell_checker is not None:
+            self._apply_spelling(text)
+
+    def _apply_markup(self, text):
+        heading = self.HEADING_RE.match(text)
+        if heading:
+            level = len(heading.group(1))
+            self.setFormat(0, len(text), self.heading_formats[level])
+            marker = QTextCharFormat(self.heading_formats[level])
+            marker.merge(self.marker_format)
+            self.setFormat(0, level, marker)
+            return
+
+        list_item = self.LIST_RE.match(text)
+        if list_item:
+            self.setFormat(0, list_item.end(), self.marker_format)
+
+        for match in self.BOLD_RE.finditer(text):
+            self.setFormat(match.start(), match.end() - match.start(), self.bold_format)
+        for match in self.ITALIC_RE.finditer(text):
+            self.setFormat(match.start(), match.end() - match.start(), self.italic_format)
+
+    def _apply_spelling(self, text):
+        for start, length in self.spell_checker.misspellings(text):
+            fmt = QTextCharFormat(self.format(start))
+            fmt.setUnderlineStyle(QTextCharFormat.SpellCheckUnderline)
+            fmt.setUnderlineColor(self.spelling_color)
+            self.setFormat(start, length, fmt)
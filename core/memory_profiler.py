@@ -0,0 +1,324 @@
+import gc
+import json
+import os
+import sysconfig
+import time
+import tracemalloc
+from PySide6.QtCore import QObject
+from PySide6.QtWidgets import QApplication
+
+# Subsystem -> fragments of the source paths whose allocations belong to it;
+# fragments ending in ".py" must be the whole file name
+SUBSYSTEMS = (
+    ("editor", ("undo_manager", "markup_highlighter", "outline_index", "spell_checker",
+                "dictation_sink", "theme_manager")),
+    ("voice", ("voice_manager", "audio_capture", "recognition_backends", "command_matcher",
+               "wake_word", "voice_metrics", "speech_recognition", "vosk", "pyaudio")),
+    ("speech", ("tts_queue", "speech_cache", "pyttsx3")),
+    ("threads", ("worker.py", "thread_manager", "threading.py", "queue.py", "concurrent")),
+    ("storage", ("note_manager", "settings.py")),
+    ("ui", ("main.py", "ui_manager", "splash_screen", "PySide6", "shiboken6")),
+)
+OTHER = "other"
+
+_STDLIB = os.path.join(os.path.normcase(sysconfig.get_paths()["stdlib"]), "")
+# Usually inside the stdlib folder, but third-party code is not standard library
+_SITE_PACKAGES = tuple({os.path.join(os.path.normcase(sysconfig.get_paths()[key]), "")
+                        for key in ("purelib", "platlib")})
+_IGNORED = (tracemalloc.__file__, __file__, "<frozen importlib._bootstrap>",
+            "<frozen importlib._bootstrap_external>")
+
+
+def start_tracing(frames=25):
+    """Start recording Python allocations, keeping frames of traceback each"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _is_stdlib(filename):
+    return filename.startswith(_STDLIB) and not filename.startswith(_SITE_PACKAGES)
+
+
+def _matches(filename, fragment):
+    if fragment.endswith(".py"):
+        # "main.py" must not match "__main__.py" or "domain.py"
+        return os.path.basename(filename) == fragment
+    return fragment in filename
+
+
+def subsystem_for(traceback):
+    """
+    Subsystem of an allocation, from the innermost frame of app or library
+    code. Standard library frames (queue, threading) only count when nothing
+    else matches, so a queue filled by the voice manager counts as voice.
+    """
+    frames = list(traceback)
+    frames.reverse()  # Innermost frame first
+    for skip_stdlib in (True, False):
+        for frame in frames:
+            filename = os.path.normcase(frame.filename)
+            if skip_stdlib and _is_stdlib(filename):
+                continue
+            for name, fragments in SUBSYSTEMS:
+                if any(_matches(filename, fragment) for fragment in fragments):
+                    return name
+    return OTHER
+
+
+def current_rss():
+    """Resident set size in bytes, or None where it cannot be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def count_qt_objects():
+    """
+    Live Qt objects by class: those reachable from the application's object
+    trees, and the QObject wrappers Python still holds. A Worker or QThread
+    that outlived its task shows up in the second count even once it has
+    left every object tree.
+    """
+    in_tree = {}
+    app = QApplication.instance()
+    roots = []
+    if app is not None:
+        roots = [app] + [w for w in app.topLevelWidgets() if w.parent() is None]
+    for root in roots:
+        for obj in [root] + root.findChildren(QObject):
+            name = obj.metaObject().className()
+            in_tree[name] = in_tree.get(name, 0) + 1
+
+    wrappers = {}
+    for obj in gc.get_objects():
+        if isinstance(obj, QObject):
+            name = type(obj).__name__
+            wrappers[name] = wrappers.get(name, 0) + 1
+    return in_tree, wrappers
+
+
+class MemorySnapshot:
+    """Memory state at one point in time, grouped by subsystem"""
+
+    def __init__(self, label, trace, subsystems, qt_objects, qt_wrappers, reports, rss):
+        self.label = label
+        self.time = time.time()
+        self.trace = trace              # tracemalloc.Snapshot, or None when not tracing
+        self.subsystems = subsystems    # name -> {"bytes", "blocks"}
+        self.qt_objects = qt_objects
+        self.qt_wrappers = qt_wrappers
+        self.reports = reports          # source name -> memory_report() dict
+        self.rss = rss
+
+    @property
+    def traced_bytes(self):
+        return sum(entry["bytes"] for entry in self.subsystems.values())
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "time": self.time,
+            "rss_bytes": self.rss,
+            "traced_bytes": self.traced_bytes if self.trace is not None else None,
+            "subsystems": self.subsystems,
+            "qt_objects": self.qt_objects,
+            "qt_wrappers": self.qt_wrappers,
+            "reports": self.reports,
+        }
+
+
+class MemoryProfiler:
+    """
+    On-demand memory reports for long-running sessions.
+
+    A snapshot combines tracemalloc statistics (when tracing is on) grouped
+    by subsystem, counts of live Qt objects, and the memory_report() of each
+    registered source, e.g. the undo manager's document and history
+    estimates or the voice manager's audio buffers. Two snapshots can be
+    diffed to see which subsystem grew in between.
+    """
+
+    TOP_LINES = 15
+
+    def __init__(self):
+        self.snapshots = []
+        self._sources = {}
+
+    @property
+    def is_tracing(self):
+        return tracemalloc.is_tracing()
+
+    def add_source(self, name, report_func):
+        """Include report_func(), a dict of numbers, in every snapshot"""
+        self._sources[name] = report_func
+
+    def take_snapshot(self, label=None):
+        trace = None
+        subsystems = {}
+        if tracemalloc.is_tracing():
+            trace = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, pattern) for pattern in _IGNORED])
+            for stat in trace.statistics("traceback"):
+                entry = subsystems.setdefault(subsystem_for(stat.traceback),
+                                              {"bytes": 0, "blocks": 0})
+                entry["bytes"] += stat.size
+                entry["blocks"] += stat.count
+
+        reports = {}
+        for name, report_func in self._sources.items():
+            try:
+                reports[name] = report_func()
+            except Exception as e:
+                print(f"Error collecting {name} memory report: {str(e)}")
+
+        qt_objects, qt_wrappers = count_qt_objects()
+        snapshot = MemorySnapshot(label or f"Snapshot {len(self.snapshots) + 1}", trace,
+                                  subsystems, qt_objects, qt_wrappers, reports, current_rss())
+        self.snapshots.append(snapshot)
+        return snapshot
+
+    def clear(self):
+        self.snapshots = []
+
+    def diff(self, old, new):
+        """Changes from old to new, largest growth first"""
+
+        def delta(before, after):
+            changes = {key: after.get(key, 0) - before.get(key, 0)
+                       for key in set(before) | set(after)}
+            return dict(sorted(((k, v) for k, v in changes.items() if v),
+                               key=lambda item: -abs(item[1])))
+
+        subsystems = {}
+        for name in set(old.subsystems) | set(new.subsystems):
+            before = old.subsystems.get(name, {"bytes": 0, "blocks": 0})
+            after = new.subsystems.get(name, {"bytes": 0, "blocks": 0})
+            subsystems[name] = {"bytes": after["bytes"] - before["bytes"],
+                                "blocks": after["blocks"] - before["blocks"]}
+
+        reports = {}
+        for name in set(old.reports) | set(new.reports):
+            before, after = old.reports.get(name, {}), new.reports.get(name, {})
+            numbers = {key: value for key, value in after.items()
+                       if isinstance(value, (int, float)) and not isinstance(value, bool)}
+            changes = delta({k: before.get(k, 0) for k in numbers}, numbers)
+            if changes:
+                reports[name] = changes
+
+        top_lines = []
+        if old.trace is not None and new.trace is not None:
+            for stat in new.trace.compare_to(old.trace, "lineno")[:self.TOP_LINES]:
+                if stat.size_diff:
+                    frame = stat.traceback[0]
+                    top_lines.append({"location": f"{frame.filename}:{frame.lineno}",
+                                      "bytes": stat.size_diff, "blocks": stat.count_diff})
+
+        rss = None
+        if old.rss is not None and new.rss is not None:
+            rss = new.rss - old.rss
+        return {
+            "from": old.label,
+            "to": new.label,
+            "seconds": round(new.time - old.time, 1),
+            "rss_bytes": rss,
+            "subsystems": dict(sorted(subsystems.items(), key=lambda item: -item[1]["bytes"])),
+            "qt_objects": delta(old.qt_objects, new.qt_objects),
+            "qt_wrappers": delta(old.qt_wrappers, new.qt_wrappers),
+            "reports": reports,
+            "top_lines": top_lines,
+        }
+
+    def export_json(self, path):
+        """Write every snapshot, and the diff of the first and last, to path"""
+        data = {"snapshots": [snapshot.to_dict() for snapshot in self.snapshots]}
+        if len(self.snapshots) > 1:
+            data["diff"] = self.diff(self.snapshots[0], self.snapshots[-1])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+def _size(value):
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{sign}{value:.0f} {unit}" if unit == "B" else f"{sign}{value:.1f} {unit}"
+        value /= 1024
+    return f"{sign}{value:.1f} GB"
+
+
+def _signed(value, size=False):
+    text = _size(value) if size else str(value)
+    return text if value < 0 else "+" + text
+
+
+def format_snapshot(snapshot, top_classes=15):
+    """Plain-text report of one snapshot"""
+    lines = [snapshot.label, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.time))]
+    if snapshot.rss is not None:
+        lines.append(f"Resident memory: {_size(snapshot.rss)}")
+    lines.append("")
+    if snapshot.trace is None:
+        lines.append("Python allocations: not tracing (start tracing to group them by subsystem)")
+    else:
+        lines.append(f"Python allocations: {_size(snapshot.traced_bytes)}")
+        for name, entry in sorted(snapshot.subsystems.items(), key=lambda item: -item[1]["bytes"]):
+            lines.append(f"  {name:<10}{_size(entry['bytes']):>12}{entry['blocks']:>10} blocks")
+
+    for name, report in snapshot.reports.items():
+        lines.append("")
+        lines.append(f"{name.capitalize()}:")
+        for key, value in report.items():
+            shown = _size(value) if key.endswith("_bytes") and value is not None else value
+            lines.append(f"  {key:<24}{shown}")
+
+    for title, counts in (("Qt objects in object trees", snapshot.qt_objects),
+                          ("QObject wrappers held by Python", snapshot.qt_wrappers)):
+        lines.append("")
+        lines.append(f"{title}: {sum(counts.values())}")
+        for name, count in sorted(counts.items(), key=lambda item: -item[1])[:top_classes]:
+            lines.append(f"  {name:<32}{count:>6}")
+    return "\n".join(lines)
+
+
+def format_diff(diff):
+    """Plain-text report of a diff between two snapshots"""
+    lines = [f"{diff['from']} -> {diff['to']} ({diff['seconds']}s apart)"]
+    if diff["rss_bytes"] is not None:
+        lines.append(f"Resident memory: {_signed(diff['rss_bytes'], size=True)}")
+
+    lines.append("")
+    if diff["subsystems"]:
+        lines.append("Python allocations by subsystem:")
+        for name, entry in diff["subsystems"].items():
+            lines.append(f"  {name:<10}{_signed(entry['bytes'], size=True):>12}"
+                         f"{_signed(entry['blocks']):>10} blocks")
+    else:
+        lines.append("Python allocations: not traced in both snapshots")
+
+    for name, changes in diff["reports"].items():
+        lines.append("")
+        lines.append(f"{name.capitalize()}:")
+        for key, value in changes.items():
+            lines.append(f"  {key:<24}{_signed(value, size=key.endswith('_bytes'))}")
+
+    for title, key in (("Qt objects in object trees", "qt_objects"),
+                       ("QObject wrappers held by Python", "qt_wrappers")):
+        lines.append("")
+        lines.append(f"{title}:" if diff[key] else f"{title}: unchanged")
+        for name, count in diff[key].items():
+            lines.append(f"  {name:<32}{_signed(count):>6}")
+
+    if diff["top_lines"]:
+        lines.append("")
+        lines.append("Largest changes by line:")
+        for entry in diff["top_lines"]:
+            lines.append(f"  {_signed(entry['bytes'], size=True):>12}  {entry['location']}")
+    return "\n".join(lines)
@@ -1,28 +1,61 @@
+import filecmp
 import os
+import re
 import shutil
+import threading
 from datetime import datetime
 
 
 class NoteManager:
-    def __init__(self):
-        self.notes_path = os.path.join(os.getcwd(), "notes")
-        self.backup_path = os.path.join(os.getcwd(), "backup")
+    def __init__(self, base_dir=None, create_dirs=True):
+        base_dir = base_dir or os.getcwd()
+        self.notes_path = os.path.join(base_dir, "notes")
+        self.backup_path = os.path.join(base_dir, "backup")
+        # Saves come from the editor's worker and from note service pool threads
+        self.write_lock = threading.Lock()
+        if create_dirs:
+            self.create_dirs()
+
+    def create_dirs(self):
         os.makedirs(self.notes_path, exist_ok=True)
         os.makedirs(self.backup_path, exist_ok=True)
 
     def list_notes(self):
         return [f for f in os.listdir(self.notes_path) if f.endswith(".txt")]
 
+    @staticmethod
+    def filename_for(name):
+        """Note filename for a name from outside the app, kept inside the notes folder"""
+        name = os.path.basename(name.strip())
+        if not name or name in (".", ".."):
+            raise ValueError("Invalid note name")
+        return name if name.endswith(".txt") else name + ".txt"
+
     def generate_filename(self):
         now = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"note_{now}.txt"
+        filename = f"note_{now}.txt"
+        # One-second resolution: a second note in the same second gets a suffix
+        counter = 2
+        while os.path.exists(os.path.join(self.notes_path, filename)):
+            filename = f"note_{now}_{counter}.txt"
+            counter += 1
+        return filename
 
     def save_note(self, filename, content):
         filepath = os.path.join(self.notes_path, filename)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
+        with self.write_lock:
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.write(content)
+            shutil.copy(filepath, os.path.join(self.backup_path, filename))
+        return filepath
 
-        shutil.copy(filepath, os.path.join(self.backup_path, filename))
+    def append_note(self, filename, content):
+        """Append to a note, creating it if needed, and refresh its backup"""
+        filepath = os.path.join(self.notes_path, filename)
+        with self.write_lock:
+            with open(filepath, "a", encoding="utf-8") as f:
+                f.write(content)
+            shutil.copy(filepath, os.path.join(self.backup_path, filename))
         return filepath
 
     def load_note(self, filename):
@@ -30,4 +63,120 @@ class NoteManager:
         if os.path.exists(filepath):
             with open(filepath, "r", encoding="utf-8") as f:
                 return f.read()
-        raise FileNotFoundError("Note not found")
\ No newline at end of file
+        raise FileNotFoundError("Note not found")
+
+    def save_note_as(self, path, content, progress_callback=None, status_callback=None):
+        """
+        Write a note to any path and keep a copy in the backup folder.
+        Runs as a worker task; the callbacks report progress and status.
+        """
+        progress_callback = progress_callback or _ignore
+        status_callback = status_callback or _ignore
+
+        with self.write_lock:
+            # Save main file
+            status_callback("Saving note...")
+            progress_callback(25)
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            progress_callback(50)
+
+            # Create backup
+            status_callback("Creating backup...")
+            backup_path = os.path.join(self.backup_path, os.path.basename(path))
+            with open(backup_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            progress_callback(100)
+
+        return path
+
+    def load_note_from(self, path, progress_callback=None, status_callback=None):
+        """
+        Read a note from any path.
+        Runs as a worker task; the callbacks report progress and status.
+        """
+        progress_callback = progress_callback or _ignore
+        status_callback = status_callback or _ignore
+
+        status_callback(f"Opening {os.path.basename(path)}...")
+        progress_callback(10)
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        progress_callback(100)
+        return path, content
+
+    def scan_notes(self, progress_callback=None, status_callback=None):
+        """
+        Return (filename, size in bytes, modified datetime) for every note.
+        Runs as a worker task; the callbacks report progress and status.
+        """
+        progress_callback = progress_callback or _ignore
+        status_callback = status_callback or _ignore
+
+        status_callback("Scanning notes directory...")
+        progress_callback(10)
+
+        notes = self.list_notes()
+        note_info = []
+        total_notes = len(notes)
+        for i, note in enumerate(notes, 1):
+            path = os.path.join(self.notes_path, note)
+            size = os.path.getsize(path)
+            modified = datetime.fromtimestamp(os.path.getmtime(path))
+            note_info.append((note, size, modified))
+
+            progress = 10 + int(90 * i / total_notes)
+            progress_callback(progress)
+            status_callback(f"Scanning notes... {i}/{total_notes}")
+
+        return note_info
+
+    def search_notes(self, pattern, ignore_case=False, regex=False):
+        """
+        Yield (filename, line number, line) for every line of every note
+        containing pattern, a plain string unless regex is set.
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        matcher = re.compile(pattern if regex else re.escape(pattern), flags)
+        for note in sorted(self.list_notes()):
+            path = os.path.join(self.notes_path, note)
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for number, line in enumerate(f, 1):
+                    if matcher.search(line):
+                        yield note, number, line.rstrip("\n")
+
+    def verify_backups(self, repair=False):
+        """
+        Compare every note with its copy in the backup folder.
+        Returns (filename, status) for the notes that are not backed up
+        correctly: "missing", "differs" or "orphaned" (a backup without a
+        note). With repair, missing and stale backups are copied again.
+        """
+        problems = []
+        notes = set(self.list_notes())
+        backups = set()
+        if os.path.isdir(self.backup_path):
+            backups = {f for f in os.listdir(self.backup_path) if f.endswith(".txt")}
+
+        for note in sorted(notes):
+            path = os.path.join(self.notes_path, note)
+            backup = os.path.join(self.backup_path, note)
+            if note not in backups:
+                status = "missing"
+            elif not filecmp.cmp(path, backup, shallow=False):
+                status = "differs"
+            else:
+                continue
+            problems.append((note, status))
+            if repair:
+                os.makedirs(self.backup_path, exist_ok=True)
+                shutil.copy(path, backup)
+
+        for backup in sorted(backups - notes):
+            problems.append((backup, "orphaned"))
+        return problems
+
+
+def _ignore(*args):
+    pass
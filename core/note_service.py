@@ -0,0 +1,304 @@
+import json
+import os
+import re
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+from .note_manager import NoteManager
+from .note_service_client import service_name
+from . import tracing
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+NOTE_NOT_FOUND = 1
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class _Connection:
+    """A client socket and the bytes received from it that are not yet a full line"""
+
+    __slots__ = ("socket", "buffer")
+
+    def __init__(self, socket):
+        self.socket = socket
+        self.buffer = b""
+
+
+class _Batch:
+    """Responses of a batch request, sent together once every call finished"""
+
+    __slots__ = ("connection_id", "responses", "remaining")
+
+    def __init__(self, connection_id, size):
+        self.connection_id = connection_id
+        self.responses = [None] * size
+        self.remaining = size
+
+
+class NoteService(QObject):
+    """
+    Local JSON-RPC 2.0 server exposing NoteManager to other tools.
+
+    Clients connect to a QLocalServer (a Unix domain socket, or a named pipe
+    on Windows) and keep the connection open for as many requests as they
+    like. Requests and responses are single lines of JSON; a line holding an
+    array is a batch and is answered with one array once all of its calls
+    are done. Responses to separate requests may arrive out of order and are
+    matched by id.
+
+    Every call runs on the ThreadManager's pool, so file I/O never blocks the
+    GUI; only parsing and socket writes happen on the GUI thread. Writes
+    share NoteManager.write_lock with the editor's own saves. Notes
+    larger than STREAM_THRESHOLD (or any note, with "stream": true) are sent
+    by load_note as "chunk" notifications before the final response.
+
+    Methods: list_notes, scan_notes, load_note(name[, stream]),
+    save_note(name, content), append_note(name, content),
+    search_notes(pattern[, ignore_case, regex, limit]), generate_filename.
+    """
+
+    STREAM_THRESHOLD = 256 * 1024
+    CHUNK_SIZE = 64 * 1024
+    MAX_REQUEST_BYTES = 32 * 1024 * 1024  # A longer line drops the connection
+
+    error_occurred = Signal(str)
+    note_changed = Signal(str)     # Path of a note a client saved or appended to
+    _chunk_ready = Signal(object)  # (connection id, request id, offset, text) from pool threads
+
+    def __init__(self, note_manager, thread_manager, name=None):
+        super().__init__()
+        self.note_manager = note_manager
+        self.thread_manager = thread_manager
+        self.name = name or service_name()
+        self.server = None
+        self._connections = {}
+        self._next_connection_id = 0
+        self._chunk_ready.connect(self._send_chunk)
+        self._methods = {
+            "list_notes": self._list_notes,
+            "scan_notes": self._scan_notes,
+            "load_note": self._load_note,
+            "save_note": self._save_note,
+            "append_note": self._append_note,
+            "search_notes": self._search_notes,
+            "generate_filename": self._generate_filename,
+        }
+
+    @property
+    def is_running(self):
+        return self.server is not None and self.server.isListening()
+
+    @property
+    def address(self):
+        """Socket path (or pipe name) clients connect to"""
+        return self.server.fullServerName() if self.server is not None else None
+
+    @property
+    def client_count(self):
+        return len(self._connections)
+
+    def start(self):
+        """Start listening; returns False (and emits error_occurred) on failure"""
+        if self.is_running:
+            return True
+        # Another process (e.g. a --new-instance window) may already serve
+        # this name; removing its socket would silently take over its clients
+        probe = QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(200):
+            probe.disconnectFromServer()
+            self.error_occurred.emit(f"Note service is already running as {self.name}")
+            return False
+        # Nobody answers: any socket file left is from a crashed run
+        QLocalServer.removeServer(self.name)
+        server = QLocalServer(self)
+        # Only the current user may connect
+        server.setSocketOptions(QLocalServer.UserAccessOption)
+        if not server.listen(self.name):
+            self.error_occurred.emit(f"Note service could not start: {server.errorString()}")
+            return False
+        server.newConnection.connect(self._on_new_connection)
+        self.server = server
+        return True
+
+    def stop(self):
+        if self.server is None:
+            return
+        for connection in list(self._connections.values()):
+            connection.socket.disconnectFromServer()
+        self._connections.clear()
+        self.server.close()
+        self.server.deleteLater()
+        self.server = None
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            connection_id = self._next_connection_id
+            self._next_connection_id += 1
+            self._connections[connection_id] = _Connection(socket)
+            socket.readyRead.connect(lambda cid=connection_id: self._on_ready_read(cid))
+            socket.disconnected.connect(lambda cid=connection_id: self._on_disconnected(cid))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_disconnected(self, connection_id):
+        self._connections.pop(connection_id, None)
+
+    def _on_ready_read(self, connection_id):
+        connection = self._connections.get(connection_id)
+        if connection is None:
+            return
+        connection.buffer += connection.socket.readAll().data()
+        *lines, connection.buffer = connection.buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                self._handle_line(connection_id, line)
+        if len(connection.buffer) > self.MAX_REQUEST_BYTES:
+            # Never buffer an endless line; the client has to reconnect
+            self._send(connection_id, _error_response(None, INVALID_REQUEST, "Request too large"))
+            del self._connections[connection_id]
+            connection.socket.disconnectFromServer()
+
+    def _handle_line(self, connection_id, line):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            self._send(connection_id, _error_response(None, PARSE_ERROR, "Parse error"))
+            return
+
+        if isinstance(message, list):
+            if not message:
+                self._send(connection_id, _error_response(None, INVALID_REQUEST, "Empty batch"))
+                return
+            batch = _Batch(connection_id, len(message))
+            for index, request in enumerate(message):
+                self._dispatch(connection_id, request, batch, index)
+        else:
+            self._dispatch(connection_id, message)
+
+    def _dispatch(self, connection_id, request, batch=None, index=0):
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise RpcError(INVALID_REQUEST, "Invalid request")
+            method = self._methods.get(request["method"])
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Unknown method {request['method']}")
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+        except RpcError as e:
+            self._respond(batch, index, connection_id, _error_response(request_id, e.code, str(e)))
+            return
+
+        # Chunks only make sense for a request answered on its own
+        stream_key = (connection_id, request_id) if batch is None and request_id is not None else None
+        self.thread_manager.submit(
+            self._call, method, request["method"], request_id, params, stream_key,
+            on_result=lambda response: self._respond(batch, index, connection_id, response))
+
+    def _call(self, method, name, request_id, params, stream_key):
+        """Pool thread: run one method and build its response"""
+        with tracing.span(f"rpc {name}", "service"):
+            try:
+                result = method(stream_key=stream_key, **params)
+            except RpcError as e:
+                return _error_response(request_id, e.code, str(e))
+            except TypeError as e:
+                return _error_response(request_id, INVALID_PARAMS, str(e))
+            except FileNotFoundError:
+                return _error_response(request_id, NOTE_NOT_FOUND, "Note not found")
+            except (ValueError, re.error) as e:
+                return _error_response(request_id, INVALID_PARAMS, str(e))
+            except Exception as e:
+                return _error_response(request_id, INTERNAL_ERROR, str(e))
+        if request_id is None:
+            return None  # Notification: no response
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _respond(self, batch, index, connection_id, response):
+        if batch is None:
+            if response is not None:
+                self._send(connection_id, response)
+            return
+        batch.responses[index] = response
+        batch.remaining -= 1
+        if batch.remaining == 0:
+            responses = [r for r in batch.responses if r is not None]
+            if responses:
+                self._send(batch.connection_id, responses)
+
+    def _send(self, connection_id, message):
+        connection = self._connections.get(connection_id)
+        if connection is None:
+            return  # Client went away while the call ran
+        connection.socket.write(json.dumps(message).encode("utf-8") + b"\n")
+
+    def _send_chunk(self, chunk):
+        connection_id, request_id, offset, text = chunk
+        self._send(connection_id, {"jsonrpc": "2.0", "method": "chunk",
+                                   "params": {"id": request_id, "offset": offset, "data": text}})
+
+    # Methods, run on pool threads
+
+    def _list_notes(self, stream_key=None):
+        return sorted(self.note_manager.list_notes())
+
+    def _scan_notes(self, stream_key=None):
+        return [{"name": name, "size": size, "modified": modified.isoformat()}
+                for name, size, modified in sorted(self.note_manager.scan_notes())]
+
+    def _load_note(self, name, stream=None, stream_key=None):
+        filename = NoteManager.filename_for(name)
+        path = os.path.join(self.note_manager.notes_path, filename)
+        if stream is None:
+            stream = os.path.getsize(path) > self.STREAM_THRESHOLD
+        if not stream or stream_key is None:
+            return {"name": filename, "content": self.note_manager.load_note(filename)}
+
+        connection_id, request_id = stream_key
+        offset = chunks = 0
+        with open(path, "r", encoding="utf-8") as f:
+            while True:
+                text = f.read(self.CHUNK_SIZE)
+                if not text:
+                    break
+                if connection_id not in self._connections:
+                    break  # Client disconnected; stop reading
+                self._chunk_ready.emit((connection_id, request_id, offset, text))
+                offset += len(text)
+                chunks += 1
+        return {"name": filename, "length": offset, "chunks": chunks}
+
+    def _save_note(self, name, content, stream_key=None):
+        path = self.note_manager.save_note(NoteManager.filename_for(name), content)
+        self.note_changed.emit(path)
+        return {"path": path}
+
+    def _append_note(self, name, content, stream_key=None):
+        path = self.note_manager.append_note(NoteManager.filename_for(name), content)
+        self.note_changed.emit(path)
+        return {"path": path}
+
+    def _search_notes(self, pattern, ignore_case=False, regex=False, limit=1000, stream_key=None):
+        matches = []
+        for name, number, line in self.note_manager.search_notes(pattern, ignore_case, regex):
+            matches.append({"name": name, "line": number, "text": line})
+            if len(matches) >= limit:
+                break
+        return matches
+
+    def _generate_filename(self, stream_key=None):
+        return self.note_manager.generate_filename()
+
+
+def _error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
@@ -0,0 +1,103 @@
+import getpass
+import itertools
+import json
+import os
+import socket
+import tempfile
+
+
+def service_name():
+    """Per-user socket name, so users on one machine each reach their own notes"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    return f"durangdback-notes-{user}"
+
+
+class NoteServiceError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{message} (code {code})")
+        self.code = code
+
+
+class NoteServiceClient:
+    """
+    Client for the note service of a running DurangDBack, for scripts and
+    other tools. Standard library only; Unix domain sockets only.
+
+        with NoteServiceClient() as notes:
+            notes.call("append_note", name="log", content="done\\n")
+            names, text = notes.batch([("list_notes", {}),
+                                       ("load_note", {"name": "log"})])
+
+    The connection stays open between calls. Streamed load_note results are
+    reassembled, so call() always returns the whole note.
+    """
+
+    def __init__(self, path=None, name=None, timeout=30.0):
+        # QLocalServer puts the socket in the temp directory unless given a path
+        self.path = path or os.path.join(tempfile.gettempdir(), name or service_name())
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(self.path)
+        self._reader = self._socket.makefile("rb")
+        self._ids = itertools.count(1)
+        self._chunks = {}
+        self._responses = {}
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, message):
+        self._socket.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+    def _read_until(self, done):
+        """Read messages, collecting chunks and responses, until done() holds"""
+        while not done():
+            line = self._reader.readline()
+            if not line:
+                raise ConnectionError("Note service closed the connection")
+            message = json.loads(line)
+            if isinstance(message, dict) and message.get("method") == "chunk":
+                params = message["params"]
+                self._chunks.setdefault(params["id"], []).append(params["data"])
+                continue
+            for response in message if isinstance(message, list) else [message]:
+                self._responses[response.get("id")] = response
+
+    def _result(self, request_id):
+        response = self._responses.pop(request_id)
+        if "error" in response:
+            raise NoteServiceError(response["error"]["code"], response["error"]["message"])
+        result = response["result"]
+        chunks = self._chunks.pop(request_id, None)
+        if chunks is not None:
+            result = dict(result, content="".join(chunks))
+        return result
+
+    def call(self, method, **params):
+        """Run one method and return its result"""
+        request_id = next(self._ids)
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        self._read_until(lambda: request_id in self._responses)
+        return self._result(request_id)
+
+    def batch(self, calls):
+        """Run (method, params) pairs in one request; results in the same order"""
+        ids = [next(self._ids) for _ in calls]
+        self._send([{"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+                    for request_id, (method, params) in zip(ids, calls)])
+        self._read_until(lambda: all(request_id in self._responses for request_id in ids))
+        return [self._result(request_id) for request_id in ids]
+
+    def notify(self, method, **params):
+        """Run a method without waiting for, or getting, a response"""
+        self._send({"jsonrpc": "2.0", "method": method, "params": params})
@@ -0,0 +1,138 @@
+import re
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QTextCursor
+
+
+class HeadingEntry:
+    """A heading in the document, anchored by a cursor that follows edits"""
+
+    __slots__ = ("level", "title", "cursor")
+
+    def __init__(self, level, title, cursor):
+        self.level = level
+        self.title = title
+        self.cursor = cursor
+
+    @property
+    def position(self):
+        return self.cursor.position()
+
+
+class OutlineIndex(QObject):
+    """
+    Incrementally maintained index of the markup headings in a document.
+
+    Entries are kept sorted by position. Each one holds a QTextCursor at the
+    start of its block, so Qt shifts positions on every edit and the order
+    never has to be recomputed. On contentsChange only the blocks touched by
+    the edit are re-parsed; the affected entries are found by binary search.
+
+    Cursors of removed entries are released from the event loop rather than
+    inside contentsChange: QTextDocument.clear() (and so setPlainText())
+    restores its cursor list after emitting the signal, and a cursor
+    destroyed in between would leave a dangling pointer behind.
+    """
+
+    outline_changed = Signal()  # Emitted when headings were added, removed or renamed
+
+    HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+
+    def __init__(self, document):
+        super().__init__()
+        self.document = document
+        self._entries = []
+        self._by_title = {}
+        self._retired = []
+        self._release_timer = QTimer(self)
+        self._release_timer.setSingleShot(True)
+        self._release_timer.setInterval(0)
+        self._release_timer.timeout.connect(self._retired.clear)
+        document.contentsChange.connect(self._on_contents_change)
+        self._reindex(document.firstBlock(), document.lastBlock())
+
+    def entries(self):
+        """Headings in document order"""
+        return list(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, title):
+        """
+        Look up a heading by title without touching the document: exact
+        match first, then prefix, then substring (case-insensitive). Among
+        several matches the one nearest the top of the document wins.
+        """
+        key = title.strip().lower()
+        if not key:
+            return None
+        matches = self._by_title.get(key)
+        if not matches:
+            matches = [e for name, entries in self._by_title.items()
+                       if name.startswith(key) for e in entries]
+        if not matches:
+            matches = [e for name, entries in self._by_title.items()
+                       if key in name for e in entries]
+        return min(matches, key=lambda e: e.position) if matches else None
+
+    def _lower_bound(self, position):
+        lo, hi = 0, len(self._entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entries[mid].position < position:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _on_contents_change(self, position, chars_removed, chars_added):
+        first = self.document.findBlock(position)
+        last = self.document.findBlock(position + chars_added)
+        if not first.isValid():
+            first = self.document.firstBlock()
+        if not last.isValid():
+            last = self.document.lastBlock()
+        self._reindex(first, last)
+
+    def _reindex(self, first, last):
+        """Replace the entries between two blocks (inclusive) with fresh ones"""
+        start = first.position()
+        end = last.position() + last.length()
+
+        # Entries of deleted blocks collapse into the edited range as well
+        lo = self._lower_bound(start)
+        hi = self._lower_bound(end)
+        removed = self._entries[lo:hi]
+
+        added = []
+        block = first
+        while block.isValid():
+            match = self.HEADING_RE.match(block.text())
+            if match and match.group(2):
+                cursor = QTextCursor(block)
+                cursor.setKeepPositionOnInsert(True)
+                added.append(HeadingEntry(len(match.group(1)), match.group(2), cursor))
+            if block == last:
+                break
+            block = block.next()
+
+        if not removed and not added:
+            return
+        unchanged = (len(removed) == len(added) and all(
+            a.level == b.level and a.title == b.title and a.position == b.position
+            for a, b in zip(removed, added)))
+        if unchanged:
+            return
+
+        self._entries[lo:hi] = added
+        self._retired.extend(removed)
+        self._release_timer.start()
+        for entry in removed:
+            entries = self._by_title.get(entry.title.lower())
+            if entries:
+                entries.remove(entry)
+                if not entries:
+                    del self._by_title[entry.title.lower()]
+        for entry in added:
+            self._by_title.setdefault(entry.title.lower(), []).append(entry)
+        self.outline_changed.emit()
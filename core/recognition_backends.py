@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import speech_recognition as sr
+
+
+class RecognizerBackend:
+    """
+    Base class for speech recognition backends used by VoiceManager.
+
+    recognize() returns the transcript for an sr.AudioData and signals
+    failures the same way speech_recognition does: sr.UnknownValueError when
+    the speech was unintelligible, sr.RequestError when the backend itself
+    failed (network, missing model, ...).
+    """
+
+    name = "base"
+    label = "Base"
+    is_local = False
+    supports_streaming = False
+    selectable = True  # Offered in the Recognition Engine menu
+
+    def recognize(self, recognizer, audio):
+        raise NotImplementedError
+
+    def start_stream(self, sample_rate, sample_width):
+        """
+        Begin a streaming recognition session for one phrase. Backends with
+        supports_streaming return an object with accept(frame), returning
+        the current partial hypothesis (or None), and finish(), returning
+        the final transcript or raising sr.UnknownValueError.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API (requires network access)"""
+
+    name = "google"
+    label = "Google (online)"
+
+    def __init__(self, language="en-US"):
+        self.language = language
+
+    def recognize(self, recognizer, audio):
+        return recognizer.recognize_google(audio, language=self.language)
+
+
+class SphinxBackend(RecognizerBackend):
+    """CMU PocketSphinx via speech_recognition (offline, needs pocketsphinx)"""
+
+    name = "sphinx"
+    label = "PocketSphinx (offline)"
+    is_local = True
+
+    def __init__(self, language="en-US"):
+        self.language = language
+
+    def recognize(self, recognizer, audio):
+        return recognizer.recognize_sphinx(audio, language=self.language)
+
+
+class VoskBackend(RecognizerBackend):
+    """
+    Vosk/Kaldi on-device recognition (offline, needs the vosk package and a
+    model directory such as vosk-model-small-en-us). The model is loaded
+    once and reused, so latency is bounded by local CPU only. An optional
+    grammar (a list of phrases, "[unk]" for anything else) restricts the
+    vocabulary, which makes decoding much cheaper, e.g. for keyword spotting.
+    """
+
+    name = "vosk"
+    label = "Vosk (offline)"
+    is_local = True
+    supports_streaming = True
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model_path=None, grammar=None):
+        self.model_path = model_path or os.path.join(os.getcwd(), "models", "vosk")
+        self.grammar = grammar
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _load_model(self):
+        # Recognition workers and the streaming thread may all ask at once;
+        # the model is large and must be loaded only once
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    import vosk
+                except ImportError:
+                    raise sr.RequestError("Offline recognition requires the 'vosk' package")
+                if not os.path.isdir(self.model_path):
+                    raise sr.RequestError(f"Vosk model not found at {self.model_path}")
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(self.model_path)
+            return self._model
+
+    def create_recognizer(self, sample_rate=SAMPLE_RATE):
+        model = self._load_model()
+        import vosk
+        if self.grammar:
+            return vosk.KaldiRecognizer(model, sample_rate, json.dumps(self.grammar))
+        return vosk.KaldiRecognizer(model, sample_rate)
+
+    def recognize(self, recognizer, audio):
+        kaldi = self.create_recognizer()
+        kaldi.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2))
+        text = json.loads(kaldi.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def start_stream(self, sample_rate, sample_width):
+        # Kaldi resamples internally, so frames are fed at the source rate
+        return _VoskStream(self.create_recognizer(sample_rate))
+
+    def close(self):
+        with self._model_lock:
+            self._model = None
+
+
+class _VoskStream:
+    """Streaming session over a KaldiRecognizer"""
+
+    def __init__(self, kaldi):
+        self.kaldi = kaldi
+        self._final_parts = []
+
+    def accept(self, frame):
+        if self.kaldi.AcceptWaveform(frame):
+            # Kaldi closed an utterance inside the phrase; keep it for the final text
+            text = json.loads(self.kaldi.Result()).get("text", "")
+            if text:
+                self._final_parts.append(text)
+            return " ".join(self._final_parts) or None
+        partial = json.loads(self.kaldi.PartialResult()).get("partial", "")
+        return " ".join(self._final_parts + ([partial] if partial else [])) or None
+
+    def finish(self):
+        text = json.loads(self.kaldi.FinalResult()).get("text", "")
+        text = " ".join(self._final_parts + ([text] if text else []))
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class FakeBackend(RecognizerBackend):
+    """
+    Deterministic backend for tests and benchmarks.
+
+    transcripts is either a list, returned in order for successive calls,
+    or a dict keyed by FakeBackend.key_for(audio). Unknown audio returns
+    default, or raises sr.UnknownValueError when default is None. latency
+    simulates recognition time in seconds.
+    """
+
+    name = "fake"
+    label = "Fake (testing)"
+    is_local = True
+    supports_streaming = True
+    selectable = False
+    FRAMES_PER_WORD = 4  # Streaming reveals one more word every few frames
+
+    def __init__(self, transcripts=None, default=None, latency=0.0):
+        self.transcripts = transcripts if transcripts is not None else []
+        self.default = default
+        self.latency = latency
+        self._index = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(audio):
+        """Stable key for a piece of audio: SHA-1 of its raw PCM data"""
+        return hashlib.sha1(audio.get_raw_data()).hexdigest()
+
+    def _next_transcript(self):
+        with self._lock:
+            if self._index < len(self.transcripts):
+                text = self.transcripts[self._index]
+                self._index += 1
+                return text
+        return self.default
+
+    def recognize(self, recognizer, audio):
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(self.transcripts, dict):
+            text = self.transcripts.get(self.key_for(audio), self.default)
+        else:
+            text = self._next_transcript()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def start_stream(self, sample_rate, sample_width):
+        if isinstance(self.transcripts, dict):
+            raise sr.RequestError("Streaming needs a list of fake transcripts")
+        return _FakeStream(self._next_transcript(), self.FRAMES_PER_WORD)
+
+
+class _FakeStream:
+    """Streaming session revealing a scripted transcript word by word"""
+
+    def __init__(self, text, frames_per_word):
+        self.words = (text or "").split()
+        self.frames_per_word = frames_per_word
+        self.frames = 0
+
+    def accept(self, frame):
+        self.frames += 1
+        shown = min(len(self.words), self.frames // self.frames_per_word)
+        return " ".join(self.words[:shown]) or None
+
+    def finish(self):
+        if not self.words:
+            raise sr.UnknownValueError()
+        return " ".join(self.words)
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+    SphinxBackend.name: SphinxBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+
+def create_backend(name, **options):
+    """Create a recognizer backend by name"""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown recognition backend: {name}")
+    return backend_class(**options)
@@ -0,0 +1,49 @@
+from PySide6.QtCore import QSettings
+
+
+class Settings:
+    """
+    Persistent application settings backed by QSettings.
+
+    Values are returned with the type of their default, since some QSettings
+    backends store everything as strings.
+    """
+
+    DEFAULTS = {
+        "undo/max_steps": 1000,
+        "undo/max_bytes": 16 * 1024 * 1024,
+        "undo/group_dictation_ms": 3000,
+        "undo/ask_when_full": True,  # False: clear the history without asking
+        "voice/backend": "google",
+        "voice/vosk_model": "",
+        "voice/streaming": True,
+        "voice/hands_free": False,
+        "voice/wake_phrase": "hey durang",
+        "tts/cache_enabled": True,
+        "tts/cache_max_bytes": 64 * 1024 * 1024,
+        "service/enabled": False,
+        "service/name": "",  # Empty: durangdback-notes-<user>
+        "export/formats": "html",
+        "export/dir": "",
+        "export/workers": 0,  # 0: one per CPU core
+        "sync/target": "",
+    }
+
+    def __init__(self, organization="Quick Red Tech", application="DurangDBack"):
+        self._settings = QSettings(organization, application)
+
+    def value(self, key, default=None):
+        if default is None:
+            default = self.DEFAULTS.get(key)
+        value = self._settings.value(key, default)
+        if default is None or value is None:
+            return value
+        try:
+            if isinstance(default, bool):
+                return value if isinstance(value, bool) else str(value).lower() in ("1", "true", "yes")
+            return type(default)(value)
+        except (TypeError, ValueError):
+            return default
+
+    def set_value(self, key, value):
+        self._settings.setValue(key, value)
@@ -0,0 +1,115 @@
+import getpass
+import json
+import os
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+
+def instance_name():
+    """Per-user server name, so users on one machine each get their own instance"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    return f"durangdback-instance-{user}"
+
+
+def forward_to_running_instance(args, name=None, timeout_ms=1000):
+    """
+    Hand args to an already running instance. Returns True once it has
+    acknowledged them, so the caller can exit; False if none is running.
+
+    Only QtCore and QtNetwork are needed, so this runs before the window,
+    voice stack and theme are loaded and takes a few milliseconds.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name or instance_name())
+    if not socket.waitForConnected(timeout_ms):
+        return False
+    message = {"args": list(args), "cwd": os.getcwd()}
+    socket.write(json.dumps(message).encode("utf-8") + b"\n")
+    socket.waitForBytesWritten(timeout_ms)
+    reply = b""
+    while not reply.endswith(b"\n") and socket.waitForReadyRead(timeout_ms):
+        reply += socket.readAll().data()
+    socket.disconnectFromServer()
+    return reply.strip() == b"ok"
+
+
+class SingleInstance(QObject):
+    """
+    Makes the running process the one instance for the current user.
+
+    listen() claims the instance name with a QLocalServer; later launches
+    find it through forward_to_running_instance() and send their command
+    line instead of starting up. Each message is re-emitted here as
+    message_received(args, cwd) on the GUI thread.
+    """
+
+    message_received = Signal(list, str)  # Arguments of the second launch and its working directory
+
+    def __init__(self, name=None):
+        super().__init__()
+        self.name = name or instance_name()
+        self.server = None
+        self._buffers = {}
+
+    @property
+    def is_primary(self):
+        return self.server is not None
+
+    def listen(self):
+        """
+        Claim the instance name. Returns False if another live instance
+        already holds it (e.g. one launched at the same moment).
+        """
+        # With access options Qt binds the socket elsewhere and renames it into
+        # place, which would silently take the name from a live instance
+        probe = QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(200):
+            probe.disconnectFromServer()
+            return False
+        # Nobody answers: any socket file left is from a crashed instance
+        QLocalServer.removeServer(self.name)
+        server = QLocalServer(self)
+        server.setSocketOptions(QLocalServer.UserAccessOption)
+        if not server.listen(self.name):
+            print(f"Single-instance server unavailable: {server.errorString()}")
+            return False
+        server.newConnection.connect(self._on_new_connection)
+        self.server = server
+        return True
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+
+    def _on_disconnected(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def _on_ready_read(self, socket):
+        data = self._buffers.get(socket, b"") + socket.readAll().data()
+        if not data.endswith(b"\n"):
+            self._buffers[socket] = data
+            return
+        self._buffers[socket] = b""
+        try:
+            message = json.loads(data)
+            args, cwd = list(message["args"]), str(message.get("cwd", ""))
+        except (ValueError, KeyError, TypeError):
+            socket.write(b"error\n")
+            return
+        # Acknowledge first so the other process can exit right away
+        socket.write(b"ok\n")
+        socket.flush()
+        self.message_received.emit(args, cwd)
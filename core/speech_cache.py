@@ -0,0 +1,182 @@
+import os
+import wave
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class SpeechCache:
+    """
+    On-disk cache of synthesized sentences.
+
+    Each sentence is rendered once to a WAV file named after the SHA-1 of
+    the sentence, voice id and rate, so changing the voice or rate never
+    plays stale audio. The total size is bounded; the least recently used
+    files are deleted first. Recency is tracked in memory and seeded from
+    file modification times when the cache directory is opened.
+    """
+
+    EXTENSION = ".wav"
+
+    def __init__(self, cache_dir=None, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir or os.path.join(os.getcwd(), "cache", "speech")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+        self._load_index()
+
+    @staticmethod
+    def key_for(sentence, voice, rate):
+        """Cache key for a sentence spoken with a given voice and rate"""
+        data = f"{sentence}|{voice}|{rate}".encode("utf-8")
+        return hashlib.sha1(data).hexdigest()
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + self.EXTENSION)
+
+    def _load_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            files = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file():
+                    if entry.name.endswith(self.EXTENSION):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, entry.name[:-len(self.EXTENSION)], stat.st_size))
+                    elif entry.name.endswith(".tmp"):
+                        os.remove(entry.path)  # Left over from an interrupted render
+        except OSError as e:
+            print(f"Error opening speech cache: {str(e)}")
+            return
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key):
+        """Path of the cached audio for key, or None; marks it as recently used"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            self._forget(key)
+            return None
+        return path
+
+    def render(self, engine, sentence, voice, rate):
+        """
+        Synthesize sentence to the cache with a pyttsx3 engine and return the
+        file path. Must be called from the thread that owns the engine.
+        """
+        key = self.key_for(sentence, voice, rate)
+        path = self.get(key)
+        if path is not None:
+            return path
+        tmp_path = self.path_for(key) + ".tmp"
+        engine.save_to_file(sentence, tmp_path)
+        engine.runAndWait()
+        # Some drivers write other formats (AIFF on macOS) whatever the
+        # extension; only keep files the player can read back
+        try:
+            with wave.open(tmp_path, "rb") as wav:
+                wav.getparams()
+        except (OSError, EOFError, wave.Error):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        path = self.path_for(key)
+        os.replace(tmp_path, path)
+        self._add(key, os.path.getsize(path))
+        return path
+
+    def _add(self, key, size):
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+        self._evict()
+
+    def _forget(self, key):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+
+    def _evict(self):
+        """Delete least recently used files until the cache fits max_bytes"""
+        while True:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes or len(self._entries) <= 1:
+                    return
+                key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass  # Already gone
+
+    def clear(self):
+        """Delete every cached file"""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for key in keys:
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+
+class WavPlayer:
+    """
+    Blocking WAV playback through PyAudio (already needed for the microphone).
+
+    play() runs on the caller's thread and checks should_stop() between
+    chunks, so skip and stop cut playback off within a few milliseconds.
+    """
+
+    CHUNK_FRAMES = 1024
+
+    def __init__(self):
+        import pyaudio
+        self._pyaudio = pyaudio
+        self._audio = pyaudio.PyAudio()
+
+    def play(self, path, should_stop=None, on_progress=None):
+        """
+        Play a WAV file. on_progress(fraction) is called after every chunk.
+        Returns False when playback was cut off by should_stop.
+        """
+        with wave.open(path, "rb") as wav:
+            total = wav.getnframes() or 1
+            stream = self._audio.open(
+                format=self._audio.get_format_from_width(wav.getsampwidth()),
+                channels=wav.getnchannels(),
+                rate=wav.getframerate(),
+                output=True)
+            try:
+                played = 0
+                while True:
+                    if should_stop is not None and should_stop():
+                        return False
+                    data = wav.readframes(self.CHUNK_FRAMES)
+                    if not data:
+                        return True
+                    stream.write(data)
+                    played += self.CHUNK_FRAMES
+                    if on_progress is not None:
+                        on_progress(min(1.0, played / total))
+            finally:
+                stream.stop_stream()
+                stream.close()
+
+    def close(self):
+        self._audio.terminate()
@@ -0,0 +1,257 @@
+import os
+import re
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from PySide6.QtCore import QObject, Signal
+from . import tracing
+
+# Word lists tried in order when no explicit path is given; none ships with
+# the app, so without a system dictionary spell checking is unavailable
+DEFAULT_WORDLISTS = [
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "words.txt"),
+    "/usr/share/dict/words",
+    "/usr/share/dict/american-english",
+    "/usr/share/dict/british-english",
+]
+
+WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
+ALPHABET = "abcdefghijklmnopqrstuvwxyz'"
+
+
+class SpellDictionary:
+    """
+    Compact word index: a sorted, de-duplicated list of lowercase words
+    searched with binary search. Lookups are O(log n) and the index costs
+    one string per word, with no per-node overhead as in a trie.
+
+    Added words go into a new list that replaces the old one, so a lookup
+    running on another thread always searches a complete, sorted list.
+    """
+
+    def __init__(self, words=()):
+        self._words = sorted({w.strip().lower() for w in words if w.strip()})
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return cls(f)
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word):
+        word = word.lower()
+        words = self._words  # The same list for both steps, even if add() runs meanwhile
+        i = bisect_left(words, word)
+        return i < len(words) and words[i] == word
+
+    def add(self, word):
+        self.update([word])
+
+    def update(self, words):
+        """Add several words with a single copy of the list"""
+        new = {w.strip().lower() for w in words if w.strip()}
+        new = [w for w in new if w not in self]
+        if new:
+            self._words = sorted(self._words + new)
+
+    def suggestions(self, word, limit=5, time_budget=0.05):
+        """
+        Return known words one edit away from word (deletes, transposes,
+        replaces, inserts), falling back to two edits when none are found.
+        The two-edit search, which grows with the square of the word length,
+        stops after limit * 4 candidates or time_budget seconds.
+        """
+        word = word.lower()
+        candidates = [w for w in self._edits1(word) if w in self]
+        if not candidates:
+            candidates = self._edits2_known(word, limit * 4, time.perf_counter() + time_budget)
+        unique = sorted(set(candidates), key=lambda w: (abs(len(w) - len(word)), w))
+        return unique[:limit]
+
+    def _edits2_known(self, word, cap, deadline):
+        found = set()
+        for edit in self._edits1(word):
+            if time.perf_counter() > deadline:
+                break
+            for w in self._edits1(edit):
+                if w not in found and w in self:
+                    found.add(w)
+                    if len(found) >= cap:
+                        return list(found)
+        return list(found)
+
+    @staticmethod
+    def _edits1(word):
+        splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+        deletes = [a + b[1:] for a, b in splits if b]
+        transposes = [a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1]
+        replaces = [a + c + b[1:] for a, b in splits if b for c in ALPHABET]
+        inserts = [a + c + b for a, b in splits for c in ALPHABET]
+        return set(deletes + transposes + replaces + inserts)
+
+
+class SpellChecker(QObject):
+    """
+    Background spell checker for editor blocks.
+
+    The highlighter asks for the misspellings of each block it styles. Results
+    are cached by block text, so unchanged blocks are never re-checked; unseen
+    text is queued and checked in a worker thread, and results_ready is emitted
+    once a batch has been processed.
+    """
+
+    results_ready = Signal()       # Emitted when queued blocks have been checked
+    dictionary_loaded = Signal(int)  # Emitted with the word count once loaded
+    error_occurred = Signal(str)   # Emitted when no word list could be loaded
+
+    CACHE_SIZE = 5000  # Distinct block texts kept in the result cache
+
+    def __init__(self, wordlist_path=None, user_dictionary_path=None):
+        super().__init__()
+        self.wordlist_path = wordlist_path
+        self.user_dictionary_path = user_dictionary_path
+        self.dictionary = None
+        self._load_failed = False
+        self._cache = OrderedDict()
+        self._pending = set()
+        self._words_added = 0  # Bumped by add_word(), so older results are not cached
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """Load the word list and start checking; connect error_occurred first"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._check_loop, daemon=True,
+                                            name="spell-check")
+            self._thread.start()
+
+    @property
+    def is_ready(self):
+        return self.dictionary is not None
+
+    def _find_wordlist(self):
+        if self.wordlist_path:
+            return self.wordlist_path
+        for path in DEFAULT_WORDLISTS:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _load_dictionary(self):
+        path = self._find_wordlist()
+        if not path:
+            self.error_occurred.emit(
+                "Spell checking is unavailable: no word list found. Put one word per line "
+                f"in {DEFAULT_WORDLISTS[0]} (or install a system dictionary) and restart.")
+            return False
+        try:
+            dictionary = SpellDictionary.from_file(path)
+            if self.user_dictionary_path and os.path.exists(self.user_dictionary_path):
+                with open(self.user_dictionary_path, "r", encoding="utf-8") as f:
+                    dictionary.update(f)
+        except Exception as e:
+            self.error_occurred.emit(f"Error loading word list: {str(e)}")
+            return False
+        self.dictionary = dictionary
+        self.dictionary_loaded.emit(len(dictionary))
+        return True
+
+    def _check_loop(self):
+        """Worker loop: load the word list, then check queued block texts"""
+        if not self._load_dictionary():
+            self._load_failed = True
+            return
+        while True:
+            text = self._queue.get()
+            if text is None:
+                break
+            batch = [text]
+            # Drain whatever else is queued so the UI is notified once per batch
+            while True:
+                try:
+                    text = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if text is None:
+                    return
+                batch.append(text)
+
+            with tracing.span("check blocks", "spelling", blocks=len(batch)):
+                for text in batch:
+                    with self._lock:
+                        words_added = self._words_added
+                    spans = self._find_misspellings(text)
+                    with self._lock:
+                        self._pending.discard(text)
+                        if words_added != self._words_added:
+                            continue  # Checked against the old word list; asked for again later
+                        self._cache[text] = spans
+                        if len(self._cache) > self.CACHE_SIZE:
+                            self._cache.popitem(last=False)
+            self.results_ready.emit()
+
+    def _find_misspellings(self, text):
+        dictionary = self.dictionary
+        spans = []
+        for match in WORD_RE.finditer(text):
+            word = match.group()
+            if len(word) < 2 or word.isupper():
+                continue  # Skip single letters and acronyms
+            if word not in dictionary and not (
+                    word.lower().endswith("'s") and word[:-2] in dictionary):
+                spans.append((match.start(), match.end() - match.start()))
+        return spans
+
+    def misspellings(self, text):
+        """
+        Return cached (start, length) spans for text, or an empty list while
+        the text is queued for checking in the background.
+        """
+        if self._load_failed or not text.strip():
+            return []
+        with self._lock:
+            spans = self._cache.get(text)
+            if spans is not None:
+                self._cache.move_to_end(text)
+                return spans
+            if text in self._pending:
+                return []
+            self._pending.add(text)
+        self._queue.put(text)
+        return []
+
+    def is_correct(self, word):
+        return not self.is_ready or word in self.dictionary
+
+    def suggestions(self, word, limit=5):
+        """Compute suggestions for a word on demand (e.g. on right-click)"""
+        if not self.is_ready:
+            return []
+        suggestions = self.dictionary.suggestions(word, limit)
+        if word[:1].isupper():
+            suggestions = [s.capitalize() for s in suggestions]
+        return suggestions
+
+    def add_word(self, word):
+        """Add a word to the dictionary and persist it in the user dictionary"""
+        if not self.is_ready:
+            return
+        self.dictionary.add(word)
+        if self.user_dictionary_path:
+            try:
+                with open(self.user_dictionary_path, "a", encoding="utf-8") as f:
+                    f.write(word.lower() + "\n")
+            except Exception as e:
+                print(f"Error saving user dictionary: {str(e)}")
+        with self._lock:
+            self._words_added += 1
+            self._cache.clear()
+
+    def stop(self):
+        """Stop the worker thread"""
+        self._queue.put(None)
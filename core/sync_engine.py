@@ -0,0 +1,404 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from . import tracing
+
+MANIFEST_NAME = ".sync-manifest.json"
+STATE_PREFIX = ".sync-state-"
+PARTIAL_SUFFIX = ".sync-part"
+
+# Planned actions
+PUSH = "push"                    # Copy local -> target
+PULL = "pull"                    # Copy target -> local
+DELETE_REMOTE = "delete_remote"  # Deleted locally since the last sync
+DELETE_LOCAL = "delete_local"    # Deleted on the target since the last sync
+CONFLICT = "conflict"            # Changed on both sides
+
+# Refuse a sync that would delete more local files than this, unless allowed
+MASS_DELETE_MIN = 3
+MASS_DELETE_FRACTION = 0.1
+
+
+class SyncError(Exception):
+    pass
+
+
+class MassDeletionError(SyncError):
+    """A sync would delete many local files; rerun with allow_deletions to go ahead"""
+
+    def __init__(self, folder, count, total):
+        super().__init__(f"Sync would delete {count} of {total} files in {folder}; "
+                         f"the target may have been emptied or replaced")
+        self.folder = folder
+        self.count = count
+        self.total = total
+
+
+def file_hash(path):
+    """SHA-256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except ValueError:
+        print(f"Ignoring unreadable sync manifest {path}")
+        return default
+
+
+def _save_json(path, data):
+    partial = path + PARTIAL_SUFFIX
+    with open(partial, "w", encoding="utf-8") as f:
+        # dumps() uses the C encoder; dump() encodes piece by piece in Python
+        f.write(json.dumps(data, separators=(",", ":")))
+    os.replace(partial, path)
+
+
+def _is_sync_file(name):
+    return name == MANIFEST_NAME or name.startswith(STATE_PREFIX) or name.endswith(PARTIAL_SUFFIX)
+
+
+def plan_changes(local, remote, base, deletions=True):
+    """
+    Decide what to do with every path, comparing both sides to the hashes
+    they agreed on at the last sync. With an empty base nothing is ever
+    deleted.
+
+    Args:
+        local, remote (dict): path -> hash for the files on each side
+        base (dict): path -> hash both sides had after the last sync
+        deletions (bool): Carry deletions over; if False a file deleted on
+            one side is copied back from the other
+
+    Returns:
+        list: (action, path) pairs for the paths that differ
+    """
+    actions = []
+    for path in sorted(set(local) | set(remote)):
+        here, there, last = local.get(path), remote.get(path), base.get(path)
+        if here == there:
+            continue
+        if there == last:
+            actions.append((PUSH if here else DELETE_REMOTE if deletions else PULL, path))
+        elif here == last:
+            actions.append((PULL if there else DELETE_LOCAL if deletions else PUSH, path))
+        elif here is None:
+            actions.append((PULL, path))  # Deleted here but edited there: keep the edit
+        elif there is None:
+            actions.append((PUSH, path))
+        else:
+            actions.append((CONFLICT, path))
+    return actions
+
+
+class _Tree:
+    """One side of a folder pair: its files and the manifest caching their hashes"""
+
+    def __init__(self, root):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.files = {}  # path -> [size, mtime_ns, hash]
+        self.changed = False  # Files differ from the saved manifest
+
+    def path(self, rel):
+        return os.path.join(self.root, *rel.split("/"))
+
+    def scan(self, pool):
+        """
+        Stat every file, reusing the manifest's hash when size and mtime
+        match, and hash the rest on the pool. Returns how many were hashed.
+        """
+        cached = _load_json(self.manifest_path, {}).get("files", {})
+        found = []
+        stack = [""]
+        while stack:
+            prefix = stack.pop()
+            with os.scandir(os.path.join(self.root, prefix) if prefix else self.root) as entries:
+                for entry in entries:
+                    rel = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith("."):
+                            stack.append(rel + "/")
+                    elif entry.is_file() and not _is_sync_file(entry.name):
+                        stat = entry.stat()
+                        found.append((rel, stat.st_size, stat.st_mtime_ns))
+
+        self.files = {}
+        stale = []
+        for rel, size, mtime_ns in found:
+            entry = cached.get(rel)
+            if entry and entry[0] == size and entry[1] == mtime_ns:
+                self.files[rel] = entry
+            else:
+                stale.append((rel, size, mtime_ns))
+        for (rel, size, mtime_ns), digest in zip(
+                stale, pool.map(lambda item: file_hash(self.path(item[0])), stale)):
+            self.files[rel] = [size, mtime_ns, digest]
+        self.changed = bool(stale) or len(cached) != len(self.files)
+        return len(stale)
+
+    def hashes(self):
+        return {rel: entry[2] for rel, entry in self.files.items()}
+
+    def save_manifest(self):
+        _save_json(self.manifest_path, {"version": 1, "files": self.files})
+
+    def copy_from(self, other, rel, dest_rel=None):
+        """Copy a file from another tree, through a partial file, keeping its mtime"""
+        dest_rel = dest_rel or rel
+        source, target = other.path(rel), self.path(dest_rel)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = target + PARTIAL_SUFFIX
+        shutil.copy2(source, partial)
+        os.replace(partial, target)
+        stat = os.stat(target)
+        self.files[dest_rel] = [stat.st_size, stat.st_mtime_ns, other.files[rel][2]]
+        self.changed = True
+        return stat.st_size
+
+    def delete(self, rel):
+        try:
+            os.remove(self.path(rel))
+        except FileNotFoundError:
+            pass
+        self.files.pop(rel, None)
+        self.changed = True
+
+
+class SyncEngine:
+    """
+    Two-way sync of the notes and backup folders with a target folder,
+    e.g. on a shared or mounted drive.
+
+    Each side keeps a manifest of path, size, mtime and content hash for
+    its files, so unchanged files are only stat()ed, never read again. The
+    local side also keeps the hashes both sides agreed on at the last sync
+    with this target; comparing each side against them tells which side a
+    change came from, so only changed files are copied and deletions are
+    carried over.
+
+    A file changed on both sides is a conflict: the newer version is kept
+    under the original name on both sides and the other is kept next to it
+    as "<name>.conflict-<time>-<side><ext>". A file deleted on one side but
+    edited on the other is restored.
+
+    Deletions are never carried into backup/; a deleted backup is copied
+    back instead. A target that has lost a folder it was synced with (an
+    unmounted or wiped drive) stops the sync with a SyncError rather than
+    deleting the local copies, and a sync that would delete more than a
+    small share of the local notes raises MassDeletionError unless
+    allow_deletions is set. reset=True forgets the last sync with the
+    target, so the next one only copies and never deletes.
+
+    Copies go through a partial file and a rename, so an interrupted sync
+    leaves no half-written notes; it only leaves work for the next run.
+    """
+
+    FOLDERS = ("notes", "backup")
+    KEEP_DELETED = ("backup",)  # Folders that never lose files to a sync
+
+    def __init__(self, note_manager, target_dir, max_workers=None):
+        self.note_manager = note_manager
+        self.target_dir = target_dir
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self._cancelled = threading.Event()
+        # Different targets each need their own last-sync state
+        target_id = hashlib.sha1(os.path.abspath(target_dir).encode("utf-8")).hexdigest()[:12]
+        self.state_name = f"{STATE_PREFIX}{target_id}.json"
+
+    def cancel(self):
+        """Stop starting new transfers; safe to call from any thread"""
+        self._cancelled.set()
+
+    def folder_pairs(self):
+        local = {"notes": self.note_manager.notes_path, "backup": self.note_manager.backup_path}
+        return [(name, local[name], os.path.join(self.target_dir, name)) for name in self.FOLDERS]
+
+    def sync(self, dry_run=False, allow_deletions=False, reset=False,
+             progress_callback=None, status_callback=None):
+        """
+        Sync every folder pair.
+        Runs as a worker task; the callbacks report progress and status.
+
+        Returns:
+            dict: Counts per action, conflict copies made, (path, error)
+            pairs for failed transfers, files hashed, bytes copied, folders
+            synced as if for the first time, seconds taken and whether it
+            was cancelled
+
+        Raises:
+            SyncError: The target lost a folder synced before
+            MassDeletionError: Too many local files would be deleted
+        """
+        progress_callback = progress_callback or _ignore
+        status_callback = status_callback or _ignore
+        self._cancelled.clear()
+        start = time.perf_counter()
+
+        # A missing target is usually an unmounted drive; never sync into its mount point
+        if not os.path.isdir(self.target_dir):
+            raise FileNotFoundError(f"Sync target not found: {self.target_dir}")
+        pairs = self.folder_pairs()
+        if reset and not dry_run:
+            for name, local_root, remote_root in pairs:
+                try:
+                    os.remove(os.path.join(local_root, self.state_name))
+                except FileNotFoundError:
+                    pass
+        # Check every folder before changing any
+        for name, local_root, remote_root in pairs:
+            synced_before = _load_json(os.path.join(local_root, self.state_name), {})
+            if synced_before and not os.path.isdir(remote_root):
+                raise SyncError(f"{remote_root} is gone since the last sync (is the drive "
+                                f"mounted?). Sync with it again from the start (File > Sync Folder, "
+                                f"or --reset) to copy the notes back to it.")
+
+        summary = {PUSH: 0, PULL: 0, DELETE_REMOTE: 0, DELETE_LOCAL: 0, CONFLICT: 0,
+                   "conflict_copies": [], "failed": [], "hashed": 0, "bytes": 0,
+                   "unchanged": 0, "restarted": [], "dry_run": dry_run}
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="sync") as pool:
+            for index, (name, local_root, remote_root) in enumerate(pairs):
+                def folder_progress(fraction, index=index):
+                    progress_callback(int(100 * (index + fraction) / len(pairs)))
+                status_callback(f"Syncing {name}...")
+                with tracing.span("sync folder", "sync", folder=name):
+                    self._sync_folder(local_root, remote_root, name, pool, dry_run,
+                                      allow_deletions, summary, folder_progress)
+                if self._cancelled.is_set():
+                    break
+
+        progress_callback(100)
+        summary["seconds"] = time.perf_counter() - start
+        summary["cancelled"] = self._cancelled.is_set()
+        return summary
+
+    def _sync_folder(self, local_root, remote_root, name, pool, dry_run, allow_deletions,
+                     summary, progress):
+        state_path = os.path.join(local_root, self.state_name)
+        base = _load_json(state_path, {})
+        old_base = dict(base)
+        if base and not os.path.exists(os.path.join(remote_root, MANIFEST_NAME)):
+            # The folder is there but not the files synced into it (replaced,
+            # or restored from elsewhere): sync as if for the first time,
+            # which copies both ways and deletes nothing
+            summary["restarted"].append(name)
+            base = {}
+        if not dry_run:
+            # The remote folder is only created here when nothing was synced
+            # into it before; sync() refuses a target that lost it
+            os.makedirs(local_root, exist_ok=True)
+            os.makedirs(remote_root, exist_ok=True)
+        local, remote = _Tree(local_root), _Tree(remote_root)
+        for tree in (local, remote):
+            if os.path.isdir(tree.root):
+                summary["hashed"] += tree.scan(pool)
+        progress(0.3)
+
+        actions = plan_changes(local.hashes(), remote.hashes(), base,
+                               deletions=name not in self.KEEP_DELETED)
+        summary["unchanged"] += len(set(local.files) | set(remote.files)) - len(actions)
+        deletions = sum(1 for action, rel in actions if action == DELETE_LOCAL)
+        if (deletions > max(MASS_DELETE_MIN, len(local.files) * MASS_DELETE_FRACTION)
+                and not allow_deletions and not dry_run):
+            raise MassDeletionError(name, deletions, len(local.files))
+        if dry_run:
+            for action, rel in actions:
+                summary[action] += 1
+            return
+
+        def run(action, rel):
+            if self._cancelled.is_set():
+                return None
+            with tracing.span(action, "sync"):
+                if action == PUSH:
+                    return remote.copy_from(local, rel)
+                if action == PULL:
+                    return local.copy_from(remote, rel)
+                if action == DELETE_REMOTE:
+                    remote.delete(rel)
+                elif action == DELETE_LOCAL:
+                    local.delete(rel)
+                else:
+                    return self._resolve_conflict(local, remote, rel, name, summary)
+                return 0
+
+        # Each path is handled by one task, so tasks never touch the same entry
+        futures = [(action, rel, pool.submit(run, action, rel)) for action, rel in actions]
+        for done, (action, rel, future) in enumerate(futures, 1):
+            try:
+                copied = future.result()
+            except OSError as e:
+                summary["failed"].append((f"{name}/{rel}", str(e)))
+            else:
+                if copied is not None:
+                    summary[action] += 1
+                    summary["bytes"] += copied
+            progress(0.3 + 0.7 * done / len(futures))
+
+        # Paths that now match on both sides become the new base; the rest
+        # (failed or cancelled) keep their old base and are retried next time
+        local_hashes, remote_hashes = local.hashes(), remote.hashes()
+        for rel in set(base) | set(local_hashes) | set(remote_hashes):
+            here, there = local_hashes.get(rel), remote_hashes.get(rel)
+            if here == there:
+                if here is None:
+                    base.pop(rel, None)
+                else:
+                    base[rel] = here
+        # An unchanged 100k-note tree would otherwise rewrite megabytes of manifest
+        for tree in (local, remote):
+            if tree.changed:
+                tree.save_manifest()
+        if base != old_base:
+            _save_json(state_path, base)
+
+    def _resolve_conflict(self, local, remote, rel, folder, summary):
+        """Keep the newer version under rel and the older one as a conflict copy on both sides"""
+        if local.files[rel][1] >= remote.files[rel][1]:
+            newer, older, older_side = local, remote, "target"
+        else:
+            newer, older, older_side = remote, local, "local"
+        stem, ext = os.path.splitext(rel)
+        stamp = datetime.fromtimestamp(older.files[rel][1] / 1e9).strftime("%Y%m%d-%H%M%S")
+        copy_rel = f"{stem}.conflict-{stamp}-{older_side}{ext}"
+        counter = 2
+        while copy_rel in local.files or copy_rel in remote.files:
+            copy_rel = f"{stem}.conflict-{stamp}-{older_side}-{counter}{ext}"
+            counter += 1
+
+        copied = older.copy_from(older, rel, copy_rel)
+        copied += newer.copy_from(older, copy_rel)
+        copied += older.copy_from(newer, rel)
+        summary["conflict_copies"].append(f"{folder}/{copy_rel}")
+        return copied
+
+
+def format_summary(summary):
+    """One line describing a sync() result"""
+    verb = "Would copy" if summary["dry_run"] else "Copied"
+    text = (f"{verb} {summary[PUSH]} up, {summary[PULL]} down; deleted "
+            f"{summary[DELETE_REMOTE]} on the target, {summary[DELETE_LOCAL]} here; "
+            f"{summary[CONFLICT]} conflicts, {len(summary['failed'])} failed, "
+            f"{summary['unchanged']} unchanged ({summary['seconds']:.1f} s)")
+    if summary["restarted"]:
+        text += f"; no earlier sync found in the target's {', '.join(summary['restarted'])}"
+    if summary["cancelled"]:
+        text += "; stopped early"
+    return text
+
+
+def _ignore(*args):
+    pass
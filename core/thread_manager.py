@@ -1,5 +1,7 @@
-from PySide6.QtCore import QObject
-from .worker import create_thread_worker
+import shiboken6
+from PySide6.QtCore import QObject, QThreadPool
+from .worker import PooledWorker, create_thread_worker
+from . import tracing
 
 class ThreadManager(QObject):
     """
@@ -10,6 +12,9 @@ class ThreadManager(QObject):
     def __init__(self):
         super().__init__()
         self._active_threads = {}
+        # Short, frequent tasks share a pool instead of a QThread each
+        self._pool = QThreadPool(self)
+        self._pooled = set()
         
     def start_worker(self, name, task_func, *args, 
                     on_start=None, on_result=None, on_error=None, 
@@ -38,6 +43,8 @@ class ThreadManager(QObject):
         
         # Create new thread and worker
         thread, worker = create_thread_worker(task_func, *args, **kwargs)
+        thread.setObjectName(f"worker:{name}")  # Thread name in traces
+        tracing.instant("start worker", "worker", name=name)
         
         # Connect optional callbacks
         if on_start:
@@ -53,14 +60,50 @@ class ThreadManager(QObject):
         if on_status:
             worker.signals.status.connect(on_status)
             
-        # Store thread and worker
+        # Store thread and worker; forgotten once done, so the name can be reused
         self._active_threads[name] = (thread, worker)
+        thread.finished.connect(lambda: self._forget(name, thread))
         
         # Start the thread
         thread.start()
         
         return thread, worker
     
+    def submit(self, task_func, *args, on_result=None, on_error=None,
+               on_finished=None, **kwargs):
+        """
+        Runs a short task on the shared thread pool.
+        
+        Args:
+            task_func (callable): Function to run on a pool thread
+            *args: Arguments for the task function
+            on_result: Callback with the task's return value
+            on_error: Callback with (type, value, traceback text) on failure
+            on_finished: Callback when the task is done either way
+            **kwargs: Keyword arguments for the task function
+            
+        Callbacks run on the thread that called submit().
+        """
+        task = PooledWorker(task_func, *args, **kwargs)
+        if on_result:
+            task.signals.result.connect(on_result)
+        if on_error:
+            task.signals.error.connect(on_error)
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        # Keep the Python wrapper (and its signals) alive until the task is done
+        self._pooled.add(task)
+        task.signals.finished.connect(lambda: self._pooled.discard(task))
+        self._pool.start(task)
+        return task
+        
+    @property
+    def pool_size(self):
+        return self._pool.maxThreadCount()
+        
+    def set_pool_size(self, threads):
+        self._pool.setMaxThreadCount(max(1, threads))
+    
     def stop_worker(self, name):
         """
         Stops and cleans up a worker thread.
@@ -69,10 +112,22 @@ class ThreadManager(QObject):
             name (str): The identifier of the thread to stop
         """
         if name in self._active_threads:
-            thread, worker = self._active_threads[name]
-            worker.stop()
-            thread.quit()
-            thread.wait()
+            thread, worker = self._active_threads.pop(name)
+            # A finished thread may already have been deleted by deleteLater()
+            if shiboken6.isValid(worker):
+                worker.stop()
+            if shiboken6.isValid(thread):
+                thread.quit()
+                thread.wait()
+    
+    def _forget(self, name, thread):
+        """Drop a finished worker, unless the name was reused meanwhile"""
+        entry = self._active_threads.get(name)
+        if entry is not None and entry[0] is thread:
+            # finished is emitted just before the thread ends; the last reference
+            # must not go while it still runs
+            if shiboken6.isValid(thread):
+                thread.wait()
             del self._active_threads[name]
             
     def stop_all(self):
@@ -82,6 +137,8 @@ class ThreadManager(QObject):
         names = list(self._active_threads.keys())
         for name in names:
             self.stop_worker(name)
+        self._pool.clear()
+        self._pool.waitForDone()
             
     def is_running(self, name):
         """
@@ -93,4 +150,28 @@ class ThreadManager(QObject):
         Returns:
             bool: True if the thread is running, False otherwise
         """
-        return name in self._active_threads
\ No newline at end of file
+        return name in self._active_threads
+            
+    def memory_report(self):
+        """
+        Counts of the threads and workers this manager is tracking.
+        
+        Returns:
+            dict: Tracked workers, how many still run, and how many finished
+            threads are still tracked after Qt deleted them
+        """
+        running = finished = 0
+        for thread, worker in self._active_threads.values():
+            try:
+                if thread.isRunning():
+                    running += 1
+            except RuntimeError:
+                # deleteLater() already destroyed the finished thread
+                finished += 1
+        return {
+            "tracked_workers": len(self._active_threads),
+            "running_threads": running,
+            "finished_threads": finished,
+            "pooled_tasks": len(self._pooled),
+            "pool_threads": self._pool.activeThreadCount(),
+        }
@@ -0,0 +1,187 @@
+"""
+Lightweight cross-thread tracing, exported as Chrome trace event JSON.
+
+Spans and instant events are recorded with the id and name of the thread
+they happen on, so the GUI thread, ThreadManager workers and the voice and
+speech threads line up on one timeline in chrome://tracing or
+ui.perfetto.dev.
+
+Tracing is off by default. While it is off, span() returns a shared no-op
+context manager and instant() returns right away, so the calls can stay in
+hot paths.
+
+    with tracing.span("recognize", "voice", segment=segment_id):
+        ...
+    tracing.instant("phrase dropped", "voice")
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+_enabled = False
+_events = []
+_lock = threading.Lock()
+_thread_names = {}  # Trace thread id -> thread name
+_thread_ids = itertools.count(1)
+_generation = 0  # Bumped by clear(), so threads register their names again
+_local = threading.local()
+_max_events = 0
+_dropped = 0
+_origin_ns = time.perf_counter_ns()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(max_events=1000000):
+    """Start recording; events past max_events are counted but not kept"""
+    global _enabled, _max_events
+    _max_events = max_events
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def clear():
+    global _dropped, _generation
+    with _lock:
+        _events.clear()
+        _thread_names.clear()
+        _dropped = 0
+        _generation += 1
+
+
+def event_count():
+    return len(_events)
+
+
+def _now_us():
+    return (time.perf_counter_ns() - _origin_ns) / 1000
+
+
+def _thread_id():
+    """
+    Trace id of the current thread. Ids are handed out per thread and name,
+    never reused like OS thread idents, and a thread that is renamed gets a
+    new one, so every id keeps the name it was recorded under.
+    """
+    name = threading.current_thread().name
+    if name.startswith("Dummy-"):
+        # A QThread: Python only knows it as a dummy thread
+        from PySide6.QtCore import QThread
+        name = QThread.currentThread().objectName() or name
+    cached = getattr(_local, "thread", None)
+    if cached is not None and cached[0] == name and cached[1] == _generation:
+        return cached[2]
+    with _lock:
+        tid = next(_thread_ids)
+        _thread_names[tid] = name
+        _local.thread = (name, _generation, tid)
+    return tid
+
+
+def _record(event):
+    global _dropped
+    with _lock:
+        if len(_events) < _max_events:
+            _events.append(event)
+        else:
+            _dropped += 1
+
+
+class _Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = _now_us()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _record({"name": self.name, "cat": self.category, "ph": "X", "ts": self.start,
+                 "dur": end - self.start, "pid": os.getpid(), "tid": _thread_id(),
+                 "args": self.args})
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, category="app", /, **args):
+    """Context manager timing a block as a complete event"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def instant(name, category="app", /, **args):
+    """Record a point in time on the current thread"""
+    if not _enabled:
+        return
+    _record({"name": name, "cat": category, "ph": "i", "s": "t", "ts": _now_us(),
+             "pid": os.getpid(), "tid": _thread_id(), "args": args})
+
+
+def counter(name, category="app", /, **values):
+    """Record the current value of one or more counters"""
+    if not _enabled:
+        return
+    _record({"name": name, "cat": category, "ph": "C", "ts": _now_us(),
+             "pid": os.getpid(), "tid": _thread_id(), "args": values})
+
+
+def traced(name=None, category="app"):
+    """Decorator recording every call of a function as a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def export(path):
+    """Write the recorded events as Chrome trace JSON; returns the event count"""
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+        names = dict(_thread_names)
+        dropped = _dropped
+    metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                 "args": {"name": "DurangDBack"}}]
+    for tid, name in names.items():
+        metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                         "args": {"name": name}})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms",
+                   "otherData": {"dropped_events": dropped}}, f)
+    return len(events)
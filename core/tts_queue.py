@@ -0,0 +1,259 @@
+import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, Signal
+from . import tracing
+
+# A sentence runs up to terminal punctuation (plus closing quotes/brackets),
+# a line break, or the end of the text
+SENTENCE_RE = re.compile(r'[^.!?\n]*(?:[.!?]+["\')\]]*|\n|$)')
+
+
+def split_sentences(text):
+    """Lazily yield (start, end, sentence) for the non-blank sentences of text"""
+    for match in SENTENCE_RE.finditer(text):
+        sentence = match.group().strip()
+        if sentence:
+            yield match.start(), match.end(), sentence
+
+
+class TTSActor(QObject):
+    """
+    Text-to-speech actor thread.
+
+    A single background thread owns the pyttsx3 engine, which is created
+    there on first use. Text is segmented into sentences lazily, one sentence
+    ahead of the one being spoken, and each sentence is spoken on its own so
+    pause, resume and skip take effect at sentence boundaries. Other threads
+    only post commands and flip flags; they never touch the engine.
+
+    With a SpeechCache, sentences are rendered to WAV files instead and
+    played on a separate playback thread; while one sentence plays the actor
+    renders the next, so cached or pre-rendered sentences start instantly.
+    Without a usable audio player the engine speaks directly.
+    """
+
+    speech_started = Signal()           # Emitted when a text starts being read
+    speech_finished = Signal()          # Emitted when reading ends, is stopped or fails
+    progress = Signal(int, int)         # Characters spoken so far, total characters
+    sentence_started = Signal(int, int)  # Start and end offsets of the sentence being read
+    error_occurred = Signal(str)        # Emitted when the engine fails
+
+    def __init__(self, rate=150, prefer_female_voice=True, cache=None, player_factory=None):
+        super().__init__()
+        self.rate = rate
+        self.prefer_female_voice = prefer_female_voice
+        self.cache = cache
+        self.player_factory = player_factory
+        self.engine = None
+        self.voice_id = None
+        self._player = None
+        self._playback = None
+        self._rendering = False
+        self._commands = queue.Queue()
+        self._thread = None
+        self._cond = threading.Condition()
+        self._generation = 0      # Bumped to cancel whatever is being read
+        self._paused = False
+        self._skip = False
+        self._speaking = False
+        self._sentence_offset = 0
+        self._total = 0
+        self._active_generation = 0
+
+    @property
+    def is_speaking(self):
+        return self._speaking
+
+    @property
+    def is_paused(self):
+        return self._paused
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name="tts")
+            self._thread.start()
+
+    def speak(self, text):
+        """Read text aloud, replacing anything currently being read"""
+        with self._cond:
+            self._generation += 1
+            self._paused = False
+            self._skip = False
+            generation = self._generation
+            self._cond.notify_all()
+        self._ensure_thread()
+        self._commands.put(("speak", text, generation))
+
+    def stop(self):
+        """Stop reading; the current word is cut off"""
+        with self._cond:
+            self._generation += 1
+            self._paused = False
+            self._cond.notify_all()
+
+    def pause(self):
+        """Pause after the current sentence"""
+        with self._cond:
+            if self._speaking:
+                self._paused = True
+
+    def resume(self):
+        """Resume reading at the next sentence"""
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def skip(self):
+        """Skip the rest of the current sentence"""
+        with self._cond:
+            self._skip = True
+            self._paused = False
+            self._cond.notify_all()
+
+    def shutdown(self):
+        """Stop reading and end the actor thread"""
+        self.stop()
+        if self._thread is not None:
+            self._commands.put(("quit", None, None))
+
+    def _create_engine(self):
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty('rate', self.rate)
+        if self.prefer_female_voice:
+            # Try to set a female voice if available
+            for voice in engine.getProperty('voices'):
+                if "female" in voice.name.lower():
+                    engine.setProperty('voice', voice.id)
+                    break
+        engine.connect('started-word', self._on_word)
+        self.voice_id = engine.getProperty('voice')
+        return engine
+
+    def _on_word(self, name, location, length):
+        """Engine callback (actor thread): report progress, honour skip/stop"""
+        if self._rendering:
+            return  # Rendering to the cache, nothing is being heard
+        self.progress.emit(self._sentence_offset + location + length, self._total)
+        if self._skip or self._generation != self._active_generation:
+            self.engine.stop()
+
+    def _run(self):
+        while True:
+            command, text, generation = self._commands.get()
+            if command == "quit":
+                self._close_player()
+                break
+            if generation != self._generation:
+                continue  # Superseded before it started
+            if self.engine is None:
+                try:
+                    self.engine = self._create_engine()
+                except Exception as e:
+                    self.error_occurred.emit(f"Text-to-speech unavailable: {str(e)}")
+                    self.speech_finished.emit()
+                    continue
+            self._read(text, generation)
+
+    def _read(self, text, generation):
+        self._active_generation = generation
+        self._total = len(text)
+        self._speaking = True
+        self.speech_started.emit()
+        try:
+            sentences = split_sentences(text)
+            current = next(sentences, None)
+            while current is not None:
+                with self._cond:
+                    while self._paused and self._generation == generation:
+                        self._cond.wait()
+                    if self._generation != generation:
+                        break
+                    self._skip = False
+
+                # Segment the next sentence before speaking this one
+                upcoming = next(sentences, None)
+                start, end, sentence = current
+                self._sentence_offset = start
+                self.sentence_started.emit(start, end)
+                self._speak_sentence(sentence, start, end, generation,
+                                     upcoming[2] if upcoming else None)
+                if self._generation == generation:
+                    self.progress.emit(end, self._total)
+                current = upcoming
+        except Exception as e:
+            self.error_occurred.emit(f"Error in speech thread: {str(e)}")
+        finally:
+            self._speaking = False
+            with self._cond:
+                self._paused = False
+            self.speech_finished.emit()
+
+    def _speak_sentence(self, sentence, start, end, generation, upcoming=None):
+        with tracing.span("speak sentence", "speech", start=start, end=end):
+            self._speak_sentence_now(sentence, start, end, generation, upcoming)
+
+    def _speak_sentence_now(self, sentence, start, end, generation, upcoming):
+        if self.cache is not None and self._ensure_player():
+            path = self._render(sentence)
+            if path is not None:
+                playing = self._playback.submit(self._play, path, start, end, generation)
+                if upcoming is not None:
+                    self._render(upcoming)  # Pre-render while this sentence plays
+                playing.result()
+                return
+        self.engine.say(sentence)
+        self.engine.runAndWait()
+
+    def _ensure_player(self):
+        if self._player is None:
+            try:
+                if self.player_factory is None:
+                    from .speech_cache import WavPlayer
+                    self.player_factory = WavPlayer
+                self._player = self.player_factory()
+            except Exception as e:
+                print(f"Speech cache disabled, no audio player: {str(e)}")
+                self.cache = None
+                return False
+            self._playback = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-playback")
+        return True
+
+    def _close_player(self):
+        if self._playback is not None:
+            self._playback.shutdown(wait=True)
+            self._playback = None
+        if self._player is not None:
+            self._player.close()
+            self._player = None
+
+    def _render(self, sentence):
+        """Cached audio for sentence (actor thread), or None if it can't be rendered"""
+        if self.cache is None:
+            return None
+        self._rendering = True
+        try:
+            with tracing.span("render sentence", "speech", chars=len(sentence)):
+                path = self.cache.render(self.engine, sentence, self.voice_id, self.rate)
+        except Exception as e:
+            print(f"Error rendering speech: {str(e)}")
+            path = None
+        finally:
+            self._rendering = False
+        if path is None:
+            # The driver can't render playable files; speak directly from now on
+            self.cache = None
+        return path
+
+    def _play(self, path, start, end, generation):
+        """Playback thread: play one sentence, reporting progress through it"""
+        def should_stop():
+            return self._skip or self._generation != generation
+
+        def on_progress(fraction):
+            self.progress.emit(start + int(fraction * (end - start)), self._total)
+
+        with tracing.span("play sentence", "speech", start=start, end=end):
+            self._player.play(path, should_stop, on_progress)
@@ -0,0 +1,175 @@
+import time
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QTextDocument
+
+# Rough per-item costs used for memory estimates
+UNDO_COMMAND_OVERHEAD = 64   # bytes per recorded change
+BLOCK_OVERHEAD = 96          # bytes per QTextBlock (fragment, layout, user state)
+FORMAT_OVERHEAD = 160        # bytes per QTextFormat in the document's format collection
+HARD_LIMIT_FACTOR = 4        # keep_history() never lets the history grow past this many times the limits
+
+
+class UndoManager(QObject):
+    """
+    Keeps the editor's undo history bounded and reports its memory footprint.
+
+    Typing runs are merged into one undo step by QTextDocument itself, and
+    consecutive dictation inserts are merged here, which keeps long sessions
+    well below the limits. QTextDocument cannot drop only its oldest undo
+    steps, so going over the step or byte limit means clearing the whole
+    history: with ask_when_full, limit_reached is emitted and the caller
+    either clears it or calls keep_history(), which asks again once the
+    history has doubled; otherwise it is cleared right away. Past
+    HARD_LIMIT_FACTOR times the limits it is cleared without asking.
+    """
+
+    history_trimmed = Signal(str)  # Emitted with a reason when the history is cleared
+    limit_reached = Signal(str)    # Emitted with a reason when ask_when_full is set and a limit is exceeded
+
+    def __init__(self, text_edit, max_steps=1000, max_bytes=16 * 1024 * 1024,
+                 group_window_ms=3000, ask_when_full=True):
+        super().__init__()
+        self.text_edit = text_edit
+        self.document = text_edit.document()
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        self.group_window_ms = group_window_ms
+        self.ask_when_full = ask_when_full
+        self._step_limit = max_steps   # Raised past max_steps by keep_history()
+        self._byte_limit = max_bytes
+        self._asking = False
+        self._history_bytes = 0
+        self._undo_steps = 0
+        self._command_added = False
+        self._last_dictation = None  # (time, cursor position, document revision)
+
+        self.document.contentsChange.connect(self._on_contents_change)
+        self.document.undoCommandAdded.connect(self._on_undo_command_added)
+
+    def set_limits(self, max_steps, max_bytes):
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        self._step_limit = max_steps
+        self._byte_limit = max_bytes
+        self.enforce_limits()
+
+    @property
+    def history_bytes(self):
+        """Estimated bytes held by the undo/redo history"""
+        return self._history_bytes
+
+    def _on_undo_command_added(self):
+        # Emitted before the contentsChange of the same edit, never for undo/redo
+        self._command_added = True
+        self.enforce_limits()
+
+    def _on_contents_change(self, position, chars_removed, chars_added):
+        steps = self.document.availableUndoSteps()
+        if steps == 0 and self.document.isRedoAvailable():
+            # Everything was undone; the redo stack still holds the changes
+            self._undo_steps = 0
+            self._command_added = False
+            return
+        if steps == 0:
+            # setPlainText()/clear() reset the history along with the text
+            self._history_bytes = 0
+            self._undo_steps = 0
+            self._command_added = False
+            return
+        # A new step, or typing merged into the last one; undo and redo only
+        # move existing steps between the stacks and always change the count
+        recorded = self._command_added or steps == self._undo_steps
+        self._command_added = False
+        self._undo_steps = steps
+        if recorded:
+            # Each change keeps the removed and inserted text (UTF-16) in its command
+            self._history_bytes += (chars_removed + chars_added) * 2 + UNDO_COMMAND_OVERHEAD
+
+    def _exceeded_limit(self):
+        """Reason the history is over a limit, or None"""
+        if self.document.availableUndoSteps() > self._step_limit:
+            return f"undo history exceeded {self.max_steps} steps"
+        if self._history_bytes > self._byte_limit:
+            return f"undo history exceeded {self.max_bytes // (1024 * 1024)} MB"
+        return None
+
+    def enforce_limits(self):
+        reason = self._exceeded_limit()
+        if reason is None:
+            return
+        if not self.ask_when_full or self._exceeded_hard_limit():
+            self.clear_history(reason)
+        elif not self._asking:
+            # Answered through clear_history() or keep_history()
+            self._asking = True
+            self.limit_reached.emit(reason)
+
+    def _exceeded_hard_limit(self):
+        return (self.document.availableUndoSteps() > self.max_steps * HARD_LIMIT_FACTOR
+                or self._history_bytes > self.max_bytes * HARD_LIMIT_FACTOR)
+
+    def keep_history(self):
+        """
+        Keep a full history; limit_reached comes again once it has doubled,
+        or it is cleared without asking past HARD_LIMIT_FACTOR times the limits
+        """
+        self._asking = False
+        self._step_limit = min(self.max_steps * HARD_LIMIT_FACTOR,
+                               max(self.max_steps, self.document.availableUndoSteps() * 2))
+        self._byte_limit = min(self.max_bytes * HARD_LIMIT_FACTOR,
+                               max(self.max_bytes, self._history_bytes * 2))
+
+    def clear_history(self, reason="cleared"):
+        self.document.clearUndoRedoStacks(QTextDocument.UndoAndRedoStacks)
+        self._history_bytes = 0
+        self._undo_steps = 0
+        self._step_limit = self.max_steps
+        self._byte_limit = self.max_bytes
+        self._asking = False
+        self._last_dictation = None
+        self.history_trimmed.emit(reason)
+
+    def insert_dictation(self, text):
+        """
+        Insert dictated text at the cursor, joining it with the previous
+        dictation insert into one undo step when nothing else happened in
+        between and it arrived within the grouping window.
+        """
+        cursor = self.text_edit.textCursor()
+        now = time.monotonic()
+        last = self._last_dictation
+        joinable = (
+            last is not None
+            and (now - last[0]) * 1000 <= self.group_window_ms
+            and cursor.position() == last[1]
+            and self.document.revision() == last[2]
+            and not cursor.hasSelection()
+        )
+
+        if joinable:
+            cursor.joinPreviousEditBlock()
+        else:
+            cursor.beginEditBlock()
+        cursor.insertText(text)
+        cursor.endEditBlock()
+        self.text_edit.setTextCursor(cursor)
+
+        self._last_dictation = (now, cursor.position(), self.document.revision())
+        self.enforce_limits()
+
+    def memory_report(self):
+        """Return estimated memory use of the document, history and formats"""
+        doc = self.document
+        chars = doc.characterCount()
+        blocks = doc.blockCount()
+        formats = len(doc.allFormats())
+        return {
+            "document_chars": chars,
+            "document_blocks": blocks,
+            "document_bytes": chars * 2 + blocks * BLOCK_OVERHEAD,
+            "undo_steps": doc.availableUndoSteps(),
+            "redo_steps": doc.availableRedoSteps(),
+            "undo_bytes": self._history_bytes,
+            "format_objects": formats,
+            "format_bytes": formats * FORMAT_OVERHEAD,
+        }
@@ -2,8 +2,14 @@ import speech_recognition as sr
 import threading
 from PySide6.QtCore import QObject, Signal
 import queue
-import time
-import pyttsx3
+from .command_matcher import DEFAULT_MATCHER
+from .recognition_backends import RecognizerBackend, create_backend
+from .audio_capture import AudioCaptureStream
+from .tts_queue import TTSActor
+from .speech_cache import SpeechCache
+from .voice_metrics import VoiceMetrics
+from . import tracing
+from .wake_word import DEFAULT_WAKE_PHRASE, WakeWordListener, create_spotter
 
 class VoiceManager(QObject):
     """Manages voice recognition and text-to-speech functionality"""
@@ -13,282 +19,397 @@ class VoiceManager(QObject):
     recording_started = Signal()          # Emitted when recording starts
     recording_stopped = Signal()          # Emitted when recording stops
     error_occurred = Signal(str)          # Emitted when an error occurs
+    partial_result = Signal(str)          # Emitted with provisional text while a phrase is spoken ("" clears it)
     speech_started = Signal()             # Emitted when text-to-speech starts
     speech_finished = Signal()            # Emitted when text-to-speech finishes
+    speech_progress = Signal(int, int)    # Characters spoken so far, total characters
+    wake_word_detected = Signal()         # Emitted in hands-free mode when the wake phrase is heard
     
-    def __init__(self):
+    RECOGNITION_QUEUE_SIZE = 8  # Captured phrases waiting for recognition
+    
+    def __init__(self, backend="google", settings=None, source_factory=sr.Microphone,
+                 device_key="default", recognition_workers=2, **backend_options):
         super().__init__()
         self.recognizer = sr.Recognizer()
+        self.backend = None
+        self.set_backend(backend, **backend_options)
         self.is_listening = False
-        self.command_queue = queue.Queue()
-        self.mic = None
-        self._mic_context = None  # Store the microphone context manager
+        self.command_matcher = DEFAULT_MATCHER
         
-        # Initialize text-to-speech engine
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)  # Speed of speech
-        self.is_speaking = False
-        self.should_stop_speaking = False
+        # Captured phrases flow through this bounded queue to the recognition
+        # workers; results are re-ordered by phrase id before being emitted
+        self.command_queue = queue.Queue(maxsize=self.RECOGNITION_QUEUE_SIZE)
+        self.recognition_workers = recognition_workers
+        self._workers = []
+        self._results_lock = threading.Lock()
+        self._pending_results = {}
+        self._next_result_id = 0
         
-        # Configure voice properties
-        voices = self.engine.getProperty('voices')
-        # Try to set a female voice if available
-        for voice in voices:
-            if "female" in voice.name.lower():
-                self.engine.setProperty('voice', voice.id)
-                break
+        # Streaming recognition: partial hypotheses while the phrase is spoken
+        self.streaming = True
+        self._stream_queue = queue.Queue()
+        self._stream_thread = None
+        
+        # Long-lived capture stream, opened on first use and kept running
+        self.settings = settings
+        self.source_factory = source_factory
+        self.device_key = device_key
+        self.capture = None
+        
+        # Hands-free mode: a keyword spotter gates phrases before recognition
+        self.wake_listener = None
+        
+        # Per-stage latency of every phrase, from end of speech to execution
+        self.metrics = VoiceMetrics()
         
+        # Text-to-speech runs on its own actor thread, which owns the engine
+        self.tts = TTSActor(rate=150, cache=self._create_speech_cache())
+        self.tts.speech_started.connect(self.speech_started)
+        self.tts.speech_finished.connect(self.speech_finished)
+        self.tts.progress.connect(self.speech_progress)
+        self.tts.error_occurred.connect(self.error_occurred)
+        
+    def set_backend(self, backend, **options):
+        """
+        Select the speech recognition backend.
+        
+        Args:
+            backend: A RecognizerBackend instance or a registered backend name
+                ("google", "vosk", "sphinx", "fake")
+            **options: Options for the backend when created by name
+        """
+        if not isinstance(backend, RecognizerBackend):
+            backend = create_backend(backend, **options)
+        if self.backend is not None:
+            self.backend.close()
+        self.backend = backend
+        
+    def _create_speech_cache(self):
+        """Synthesized sentence cache, unless disabled in the settings"""
+        if self.settings is None:
+            return SpeechCache()
+        if not self.settings.value("tts/cache_enabled"):
+            return None
+        return SpeechCache(max_bytes=self.settings.value("tts/cache_max_bytes"))
+    
+    @property
+    def pending_phrases(self):
+        """Captured phrases whose recognition result has not been delivered yet"""
+        captured = self.capture.segments_captured if self.capture is not None else 0
+        with self._results_lock:
+            return captured - self._next_result_id
+    
+    def memory_report(self):
+        """Audio buffers, queues and speech state held by the voice pipeline"""
+        report = {
+            "recognition_queue": self.command_queue.qsize(),
+            "stream_queue": self._stream_queue.qsize(),
+            "undelivered_results": len(self._pending_results),
+            "recognition_workers": sum(1 for w in self._workers if w.is_alive()),
+        }
+        if self.capture is not None:
+            report.update(self.capture.memory_report())
+        report["tts_engine_loaded"] = self.tts.engine is not None
+        if self.tts.cache is not None:
+            report["speech_cache_entries"] = len(self.tts.cache)
+            report["speech_cache_bytes"] = self.tts.cache.total_bytes
+        return report
+    
+    @property
+    def is_speaking(self):
+        return self.tts.is_speaking
+    
     def speak_text(self, text):
-        """Read text using text-to-speech"""
-        try:
-            if self.is_speaking:
-                self.stop_speaking()
-            
-            self.is_speaking = True
-            self.should_stop_speaking = False
-            self.speech_started.emit()
-            
-            def speak_thread():
-                try:
-                    def on_word(name, location, length):
-                        return not self.should_stop_speaking
-                    
-                    self.engine.connect('started-word', on_word)
-                    self.engine.say(text)
-                    self.engine.runAndWait()
-                except Exception as e:
-                    print(f"Error in speech thread: {str(e)}")
-                finally:
-                    self.is_speaking = False
-                    self.speech_finished.emit()
-            
-            threading.Thread(target=speak_thread, daemon=True).start()
-            
-        except Exception as e:
-            print(f"Error starting speech: {str(e)}")
-            self.is_speaking = False
-            self.speech_finished.emit()
+        """Read text using text-to-speech, sentence by sentence"""
+        self.tts.speak(text)
     
     def stop_speaking(self):
         """Stop text-to-speech"""
-        if self.is_speaking:
-            self.should_stop_speaking = True
-            self.engine.stop()
-            self.is_speaking = False
+        self.tts.stop()
+    
+    def pause_speaking(self):
+        """Pause text-to-speech at the end of the current sentence"""
+        self.tts.pause()
+    
+    def resume_speaking(self):
+        """Resume paused text-to-speech"""
+        self.tts.resume()
+    
+    def skip_sentence(self):
+        """Skip to the next sentence"""
+        self.tts.skip()
+    
+    def _ensure_capture(self):
+        """Create the capture stream and its consumers; start() opens the source"""
+        if self.capture is None:
+            self.capture = AudioCaptureStream(
+                source_factory=self.source_factory,
+                device_key=self.device_key,
+                settings=self.settings,
+                segments=self.command_queue,
+                metrics=self.metrics)
+            self.capture.on_error = self.error_occurred.emit
+            self.capture.on_segment_ready = self._on_segment_ready
+            self.capture.on_segment_dropped = self._on_segment_dropped
+        self.capture.set_segment_listener(self._segment_listener())
+        if self._use_streaming() and (self._stream_thread is None
+                                      or not self._stream_thread.is_alive()):
+            self._stream_thread = threading.Thread(target=self._stream_loop, daemon=True,
+                                                  name="voice-streaming")
+            self._stream_thread.start()
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.recognition_workers:
+            worker = threading.Thread(target=self._listen_loop, daemon=True,
+                                      name=f"voice-recognition-{len(self._workers) + 1}")
+            worker.start()
+            self._workers.append(worker)
+    
+    def set_streaming(self, enabled):
+        """Enable partial results for backends that support streaming"""
+        self.streaming = enabled
+    
+    def _use_streaming(self):
+        return self.streaming and self.backend.supports_streaming
+    
+    def _segment_listener(self):
+        if self.wake_listener is not None:
+            return self.wake_listener
+        return self if self._use_streaming() else None
+    
+    @property
+    def hands_free(self):
+        return self.wake_listener is not None
+    
+    def start_hands_free(self, phrases=(DEFAULT_WAKE_PHRASE,), spotter=None, awake_seconds=5.0):
+        """
+        Listen continuously, but only recognize what follows a wake phrase.
+        
+        Only the capture stream's voice activity detection and a small local
+        keyword spotter run while idle; nothing is sent to the recognition
+        backend until the wake phrase was heard. The default spotter is Vosk
+        limited to the wake phrases, loaded here so a missing model is
+        reported right away (as sr.RequestError).
+        
+        Args:
+            phrases: Wake phrases, e.g. ("hey durang",)
+            spotter: A streaming RecognizerBackend to spot them with
+            awake_seconds: How long after the wake phrase a command may start
+        """
+        if self.wake_listener is not None:
+            return
+        if spotter is None:
+            model_path = self.settings.value("voice/vosk_model") if self.settings is not None else None
+            spotter = create_spotter(phrases, model_path or None)
+        if not spotter.supports_streaming:
+            raise ValueError(f"{spotter.label} cannot spot wake words")
+        spotter.start_stream(16000, 2)  # Loads the model; fails early if it is missing
+        
+        listener = WakeWordListener(spotter, phrases, awake_seconds)
+        listener.on_wake = self.wake_word_detected.emit
+        listener.on_command = self._recognize_phrase
+        listener.on_ignored = self._ignore_phrase
+        listener.on_error = self.error_occurred.emit
+        self.wake_listener = listener
+        try:
+            self._ensure_capture()
+            self.capture.begin_capture()
+            if not self.capture.is_running:
+                self.capture.start()
+        except Exception:
+            self.wake_listener = None
+            raise
+        listener.start(self.capture.source.SAMPLE_RATE, self.capture.source.SAMPLE_WIDTH)
+    
+    def stop_hands_free(self):
+        """Leave hands-free mode; push-to-talk works as before"""
+        listener = self.wake_listener
+        if listener is None:
+            return
+        self.wake_listener = None
+        if self.capture is not None:
+            # A phrase in progress is finished while the wake listener still
+            # has it, so its id is delivered before the listener stops
+            if not self.is_listening:
+                self.capture.end_capture()
+            self.capture.set_segment_listener(self._segment_listener())
+        listener.stop()
+    
+    def _recognize_phrase(self, segment_id, audio):
+        """Hands-free: send a phrase that followed the wake phrase to recognition"""
+        try:
+            self.command_queue.put_nowait((segment_id, audio))
+        except queue.Full:
+            self._on_segment_dropped(segment_id)
+            return
+        self.recording_stopped.emit()
+    
+    def _ignore_phrase(self, segment_id):
+        """Hands-free: a phrase without the wake phrase is never recognized"""
+        self.metrics.finish(segment_id, outcome="ignored")
+        self._deliver_result(segment_id, None)
+    
+    def _on_segment_ready(self):
+        # In hands-free mode most phrases are ignored; only commands report
+        if self.wake_listener is None:
+            self.recording_stopped.emit()
     
     def start_listening(self):
-        """Start background listening for voice commands"""
+        """Start capturing voice commands (push-to-talk pressed)"""
         try:
-            # Stop any existing listening session first
-            if self.is_listening:
-                self.stop_listening()
-            
-            # Clear any previous state
-            self._mic_context = None
-            self.mic = None
-            
-            # Start new listening session
+            if self.wake_listener is not None:
+                # Hands-free capture is already running; the button wakes it
+                self.is_listening = True
+                self.wake_listener.wake()
+                self.recording_started.emit()
+                return
+            self._ensure_capture()
             self.is_listening = True
-            thread = threading.Thread(target=self._listen_loop, daemon=True)
-            thread.start()
+            # Capture starts immediately, including a short pre-roll from the buffer
+            self.capture.begin_capture()
+            if not self.capture.is_running:
+                # Opened once, later presses reuse it without warm-up; capture
+                # was begun first so no frames are missed after opening
+                self.capture.start()
+            self.recording_started.emit()
             
         except Exception as e:
             print(f"Error in start_listening: {str(e)}")
             self.is_listening = False
-            self._mic_context = None
-            self.mic = None
             raise  # Re-raise the error for proper handling
     
     def stop_listening(self):
-        """Stop listening for voice commands"""
+        """Stop capturing; a phrase in progress is still recognized"""
         try:
-            # Set flag first to prevent new operations
             self.is_listening = False
-            
-            # Clean up microphone resources
-            try:
-                if self._mic_context:
-                    self._mic_context.__exit__(None, None, None)
-            except Exception as e:
-                print(f"Error closing microphone context: {str(e)}")
-            finally:
-                # Always reset these
-                self._mic_context = None
-                self.mic = None
-                
+            if self.capture is not None and self.wake_listener is None:
+                self.capture.end_capture()
         except Exception as e:
             print(f"Error in stop_listening: {str(e)}")
-            # Ensure flags are reset even if cleanup fails
-            self.is_listening = False
-            self._mic_context = None
-            self.mic = None
+    
+    def shutdown(self):
+        """Close the capture stream, stop background recognition and speech"""
+        self.is_listening = False
+        self.tts.shutdown()
+        if self.wake_listener is not None:
+            self.wake_listener.stop()
+            self.wake_listener = None
+        if self.capture is not None:
+            try:
+                self.capture.stop()
+            except Exception as e:
+                print(f"Error closing capture stream: {str(e)}")
+        if self._stream_thread is not None:
+            self._stream_queue.put(("stop", None))
+            self._stream_thread = None
+        # One sentinel per recognition worker
+        for _ in self._workers:
+            try:
+                self.command_queue.put_nowait(None)
+            except queue.Full:
+                break
+        self._workers = []
     
     def _listen_loop(self):
-        """Background loop that listens for voice commands"""
-        while self.is_listening:
+        """Recognition worker: drains captured phrases from the command queue"""
+        while True:
+            item = self.command_queue.get()
+            if item is None:
+                break
+            segment_id, audio = item
+            text = None
             try:
-                # Create and store the microphone context manager
-                self._mic_context = sr.Microphone().__enter__()
-                self.mic = self._mic_context
-                
+                with tracing.span("recognize", "voice", segment=segment_id,
+                                  backend=self.backend.name):
+                    text = self.backend.recognize(self.recognizer, audio)
+            except sr.UnknownValueError:
+                pass  # Speech was unclear
+            except sr.RequestError as e:
+                self.error_occurred.emit(f"Could not request results: {str(e)}")
+            except Exception as e:
+                self.error_occurred.emit(f"Error during recognition: {str(e)}")
+            finally:
+                self.metrics.mark(segment_id, "recognized")
+                self._deliver_result(segment_id, text)
+    
+    # Segment listener interface, called from the capture thread
+    def segment_started(self, frames):
+        self._stream_queue.put(("start", frames))
+    
+    def segment_frame(self, frame):
+        self._stream_queue.put(("frame", [frame]))
+    
+    def segment_finished(self, segment_id, audio):
+        self._stream_queue.put(("end", segment_id))
+    
+    def _stream_loop(self):
+        """Feed captured frames to a streaming session and emit partial results"""
+        session = None
+        last_partial = None
+        while True:
+            kind, payload = self._stream_queue.get()
+            if kind == "stop":
+                break
+            
+            if kind == "end":
+                text = None
                 try:
-                    self.recognizer.adjust_for_ambient_noise(self.mic, duration=0.5)
+                    if session is not None:
+                        with tracing.span("finish stream", "voice", segment=payload):
+                            text = session.finish()
+                except sr.UnknownValueError:
+                    pass  # Speech was unclear
                 except Exception as e:
-                    self.error_occurred.emit(f"Error adjusting for noise: {str(e)}")
+                    self.error_occurred.emit(f"Error during recognition: {str(e)}")
+                session = None
+                last_partial = None
+                self.metrics.mark(payload, "recognized")
+                self.partial_result.emit("")
+                self._deliver_result(payload, text)
+                continue
+            
+            try:
+                if kind == "start":
+                    source = self.capture.source
+                    session = self.backend.start_stream(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                if session is None:
                     continue
-                
-                while self.is_listening:
-                    if not self.mic or not self._mic_context:
-                        break
-                    
-                    try:
-                        self.recording_started.emit()
-                        try:
-                            audio = self.recognizer.listen(self.mic, timeout=5, phrase_time_limit=10)
-                            if not self.is_listening:  # Check if we should stop
-                                break
-                            self.recording_stopped.emit()
-                            
-                            try:
-                                text = self.recognizer.recognize_google(audio)
-                                if text and self.is_listening:  # Check again before emitting
-                                    self.voice_command_received.emit(text.lower())
-                            except sr.UnknownValueError:
-                                pass  # Speech was unclear
-                            except sr.RequestError as e:
-                                self.error_occurred.emit(f"Could not request results: {str(e)}")
-                            
-                        except sr.WaitTimeoutError:
-                            pass  # No speech detected, continue listening
-                            
-                    except Exception as e:
-                        if self.is_listening:  # Only emit error if still listening
-                            self.error_occurred.emit(f"Error during listening: {str(e)}")
-                        break  # Break inner loop to reinitialize microphone
-                
+                partial = None
+                for frame in payload:
+                    partial = session.accept(frame) or partial
+                # Only the newest hypothesis matters when frames pile up
+                if partial and partial != last_partial and self._stream_queue.empty():
+                    last_partial = partial
+                    self.partial_result.emit(partial)
+            except sr.RequestError as e:
+                self.error_occurred.emit(f"Could not request results: {str(e)}")
+                session = None
             except Exception as e:
-                if self.is_listening:  # Only emit error if still listening
-                    self.error_occurred.emit(f"Error initializing microphone: {str(e)}")
-                time.sleep(2)  # Wait before retrying
-            
-            finally:
-                # Clean up microphone in case of any errors
-                try:
-                    if self._mic_context:
-                        self._mic_context.__exit__(None, None, None)
-                except Exception:
-                    pass  # Ignore cleanup errors
-                self._mic_context = None
-                self.mic = None
+                self.error_occurred.emit(f"Error during recognition: {str(e)}")
+                session = None
+    
+    def _deliver_result(self, segment_id, text):
+        """Emit recognized phrases in capture order, whichever worker finished first"""
+        with self._results_lock:
+            self._pending_results[segment_id] = text
+            while self._next_result_id in self._pending_results:
+                text = self._pending_results.pop(self._next_result_id)
+                self._next_result_id += 1
+                if text and self.wake_listener is not None:
+                    text = self.wake_listener.strip_wake_phrase(text)
+                tracing.instant("deliver result", "voice", segment=self._next_result_id - 1,
+                                recognized=bool(text))
+                if text:
+                    self.metrics.queue_dispatch(self._next_result_id - 1)
+                    self.voice_command_received.emit(text.lower())
+                else:
+                    self.metrics.finish(self._next_result_id - 1, outcome="unrecognized")
+    
+    def _on_segment_dropped(self, segment_id):
+        """Recognition fell behind and a queued phrase was discarded"""
+        self.metrics.finish(segment_id, outcome="dropped")
+        self._deliver_result(segment_id, None)
     
     def process_command(self, command):
         """Process a voice command and return the action to take"""
-        # Basic command processing
-        command = command.lower().strip()
-        
-        # Reading commands
-        if any(phrase in command for phrase in ["read note", "read text", "read this"]):
-            return "read:all"
-        elif any(phrase in command for phrase in ["read selection", "read selected"]):
-            return "read:selection"
-        elif "stop reading" in command or "stop speaking" in command:
-            return "read:stop"
-        elif "pause reading" in command or "pause speaking" in command:
-            return "read:pause"
-        elif "resume reading" in command or "continue reading" in command:
-            return "read:resume"
-            
-        # Navigation commands
-        elif any(phrase in command for phrase in ["page up", "scroll up", "previous page"]):
-            return "nav:page_up"
-        elif any(phrase in command for phrase in ["page down", "scroll down", "next page"]):
-            return "nav:page_down"
-        elif "beginning" in command or "start of document" in command:
-            return "nav:top"
-        elif "end" in command or "end of document" in command:
-            return "nav:bottom"
-        elif any(phrase in command for phrase in ["select all", "select everything"]):
-            return "nav:select_all"
-        elif any(phrase in command for phrase in ["copy text", "copy this"]):
-            return "nav:copy"
-        elif any(phrase in command for phrase in ["paste text", "paste here"]):
-            return "nav:paste"
-        elif "undo" in command or "undo that" in command:
-            return "nav:undo"
-        elif "redo" in command or "redo that" in command:
-            return "nav:redo"
-        elif "find" in command or "search for" in command:
-            # Extract search term
-            search_term = command.split("find")[-1].strip() if "find" in command else command.split("search for")[-1].strip()
-            if search_term:
-                return f"nav:find:{search_term}"
-        
-        # File operations
-        elif any(phrase in command for phrase in ["new note", "create note", "start note"]):
-            return "new"
-        elif any(phrase in command for phrase in ["save note", "save this", "save document", "save"]):
-            return "save"
-        elif any(phrase in command for phrase in ["list notes", "show notes", "display notes", "all notes"]):
-            return "list"
-        elif any(phrase in command for phrase in ["clear note", "clear all", "clear text", "erase all"]):
-            return "clear"
-        
-        # Text formatting
-        elif any(phrase in command for phrase in ["make bold", "bold text", "set bold"]):
-            return "format:bold"
-        elif any(phrase in command for phrase in ["make italic", "italicize", "set italic"]):
-            return "format:italic"
-        elif any(phrase in command for phrase in ["regular text", "normal text", "plain text"]):
-            return "format:normal"
-        elif "font size" in command:
-            # Extract number from command
-            import re
-            sizes = re.findall(r'\d+', command)
-            if sizes:
-                return f"format:size:{sizes[0]}"
-            
-        # Color commands
-        elif "color red" in command:
-            return "format:color:red"
-        elif "color blue" in command:
-            return "format:color:blue"
-        elif "color green" in command:
-            return "format:color:green"
-        elif "color black" in command:
-            return "format:color:black"
-        elif "color" in command:
-            # Try to extract color name
-            words = command.split()
-            if len(words) > 1 and "color" in words:
-                color_index = words.index("color") + 1
-                if color_index < len(words):
-                    return f"format:color:{words[color_index]}"
-        
-        # App control
-        elif any(phrase in command for phrase in ["quit app", "exit app", "close app", "quit", "exit"]):
-            return "quit"
-        elif "about" in command:
-            return "show:about"
-        elif "help" in command:
-            return "show:help"
-        elif "credits" in command:
-            return "show:credits"
-        
-        # Special formatting
-        elif any(phrase in command for phrase in ["new line", "new paragraph", "line break"]):
-            return "text:\n"
-        elif command.startswith("title:"):
-            return f"format:title:{command[6:]}"
-        elif command.startswith("heading:"):
-            return f"format:heading:{command[8:]}"
-        
-        # Date/Time insertion
-        elif any(phrase in command for phrase in ["insert date", "add date", "current date"]):
-            from datetime import datetime
-            return f"text:{datetime.now().strftime('%Y-%m-%d')}"
-        elif any(phrase in command for phrase in ["insert time", "add time", "current time"]):
-            from datetime import datetime
-            return f"text:{datetime.now().strftime('%H:%M:%S')}"
-        
-        # If no command matches, treat as note text
-        return "text:" + command
\ No newline at end of file
+        # The grammar is precompiled once into a word-token trie
+        return self.command_matcher.match(command)
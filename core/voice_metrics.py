@@ -0,0 +1,171 @@
+import json
+import time
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, deque
+
+
+class LatencyHistogram:
+    """
+    Latency distribution for one stage of the voice pipeline.
+
+    Samples are counted into fixed millisecond buckets for the long run, and
+    the most recent ones are kept for percentiles.
+    """
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, recent=1000):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)  # Last bucket: above the largest bound
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=recent)
+
+    def add(self, ms):
+        self.counts[bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """Latency below which the given fraction of recent samples fall"""
+        if not self._recent:
+            return 0.0
+        samples = sorted(self._recent)
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def to_dict(self):
+        buckets = {f"<={bound}ms": n for bound, n in zip(self.BUCKETS_MS, self.counts)}
+        buckets[f">{self.BUCKETS_MS[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean_ms, 3),
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p90_ms": round(self.percentile(0.9), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": buckets,
+        }
+
+
+class VoiceMetrics:
+    """
+    Per-stage latency of voice commands, from the end of speech to the
+    executed action.
+
+    Each captured phrase is traced by its segment id. The capture stream and
+    recognition workers mark their stages directly; the UI, which only sees
+    the recognized text, picks commands up in the order they were emitted
+    (begin_dispatch), since VoiceManager delivers them strictly in order.
+    Completed traces feed one histogram per interval between stages.
+    Thread-safe; marking a stage costs a dictionary update under a lock.
+    """
+
+    STAGES = ("speech_end", "audio_ready", "recognized", "dispatched", "parsed", "executed")
+
+    # Interval name, from stage, to stage
+    INTERVALS = (
+        ("capture", "speech_end", "audio_ready"),
+        ("recognition", "audio_ready", "recognized"),
+        ("delivery", "recognized", "dispatched"),
+        ("parsing", "dispatched", "parsed"),
+        ("execution", "parsed", "executed"),
+        ("total", "speech_end", "executed"),
+    )
+
+    MAX_ACTIVE = 64  # Traces still in flight; older ones are abandoned
+
+    def __init__(self, history=200, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._active = OrderedDict()  # segment_id -> {stage: perf_counter timestamp}
+        self._dispatch = deque()      # Segment ids emitted to the UI, in order
+        self._history = deque(maxlen=history)
+        self._histograms = {name: LatencyHistogram() for name, _, _ in self.INTERVALS}
+        self._outcomes = {}
+
+    def mark(self, segment_id, stage, timestamp=None):
+        """Record when a phrase reached a stage (now, unless timestamp is given)"""
+        if not self.enabled or segment_id is None:
+            return
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        with self._lock:
+            trace = self._active.get(segment_id)
+            if trace is None:
+                trace = self._active[segment_id] = {}
+                while len(self._active) > self.MAX_ACTIVE:
+                    self._active.popitem(last=False)
+            trace[stage] = timestamp
+
+    def queue_dispatch(self, segment_id):
+        """The recognized command was emitted to the UI"""
+        if self.enabled:
+            with self._lock:
+                self._dispatch.append(segment_id)
+
+    def begin_dispatch(self):
+        """
+        Called by the UI when it starts handling a voice command; returns the
+        segment id of that command, or None for commands not traced here.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            segment_id = self._dispatch.popleft() if self._dispatch else None
+        self.mark(segment_id, "dispatched")
+        return segment_id
+
+    def finish(self, segment_id, outcome="executed", action=None):
+        """Close a trace and add its intervals to the histograms"""
+        if not self.enabled or segment_id is None:
+            return
+        with self._lock:
+            trace = self._active.pop(segment_id, None)
+            if trace is None:
+                return
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            intervals = {}
+            for name, start, end in self.INTERVALS:
+                if start in trace and end in trace:
+                    ms = (trace[end] - trace[start]) * 1000
+                    self._histograms[name].add(ms)
+                    intervals[name] = round(ms, 3)
+            self._history.append({
+                "segment_id": segment_id,
+                "outcome": outcome,
+                "action": action.split(":", 1)[0] if action else None,
+                "intervals_ms": intervals,
+            })
+
+    def histograms(self):
+        with self._lock:
+            return dict(self._histograms)
+
+    def snapshot(self):
+        """All statistics as a JSON-serializable dict"""
+        with self._lock:
+            return {
+                "intervals": {name: self._histograms[name].to_dict()
+                              for name, _, _ in self.INTERVALS},
+                "outcomes": dict(self._outcomes),
+                "recent": list(self._history),
+            }
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._active.clear()
+            self._dispatch.clear()
+            self._history.clear()
+            self._outcomes.clear()
+            self._histograms = {name: LatencyHistogram() for name, _, _ in self.INTERVALS}
@@ -0,0 +1,172 @@
+import queue
+import threading
+import time
+import speech_recognition as sr
+from .command_matcher import TOKEN_RE
+from .recognition_backends import VoskBackend
+from . import tracing
+
+DEFAULT_WAKE_PHRASE = "hey durang"
+
+
+def create_spotter(phrases, model_path=None):
+    """
+    Keyword spotter for the wake phrases: Vosk limited to a grammar of just
+    those phrases, so decoding stays cheap and fully offline.
+    """
+    return VoskBackend(model_path=model_path, grammar=list(phrases) + ["[unk]"])
+
+
+class WakeWordListener:
+    """
+    Segment listener for hands-free use.
+
+    While hands-free mode is on, the capture stream keeps cutting phrases
+    with its energy-based voice activity detection; silence never reaches
+    this listener. Each phrase is fed to a small keyword spotter (any
+    streaming RecognizerBackend, normally a grammar-limited Vosk model) on
+    the listener's own thread. Only after the wake phrase is heard does a
+    phrase go on to full recognition: the rest of the same phrase ("hey
+    durang, save note") or else the next phrase within awake_seconds.
+
+    Results are reported through callbacks: on_wake() when the wake phrase
+    is spotted, on_command(segment_id, audio) for phrases to recognize and
+    on_ignored(segment_id) for the others.
+    """
+
+    def __init__(self, spotter, phrases=(DEFAULT_WAKE_PHRASE,), awake_seconds=5.0):
+        self.spotter = spotter
+        self.phrases = [TOKEN_RE.findall(phrase.lower()) for phrase in phrases]
+        self.awake_seconds = awake_seconds
+        self.on_wake = None
+        self.on_command = None
+        self.on_ignored = None
+        self.on_error = None
+        self.sample_rate = None
+        self.sample_width = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._awake_until = 0.0
+
+    @property
+    def is_awake(self):
+        return time.monotonic() < self._awake_until
+
+    def start(self, sample_rate, sample_width):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name="wake-word")
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(("stop", None))
+            self._thread = None
+        self._awake_until = 0.0
+
+    def wake(self):
+        """Treat the next phrase as a command, as if the wake phrase was said"""
+        self._awake_until = time.monotonic() + self.awake_seconds
+
+    def _find_phrase(self, text):
+        """End index of the wake phrase in the tokens of text, and the tokens"""
+        tokens = TOKEN_RE.findall(text.lower())
+        for phrase in self.phrases:
+            size = len(phrase)
+            for start in range(len(tokens) - size + 1):
+                if tokens[start:start + size] == phrase:
+                    return start + size, tokens
+        return None, tokens
+
+    def strip_wake_phrase(self, text):
+        """Remove the wake phrase, and anything before it, from a recognized command"""
+        end, tokens = self._find_phrase(text)
+        if end is None:
+            return text
+        return " ".join(tokens[end:])
+
+    # Segment listener interface, called from the capture thread
+    def segment_started(self, frames):
+        self._queue.put(("start", frames))
+
+    def segment_frame(self, frame):
+        self._queue.put(("frame", [frame]))
+
+    def segment_finished(self, segment_id, audio):
+        self._queue.put(("end", (segment_id, audio)))
+
+    def _run(self):
+        session = None
+        spotted = False
+        command_phrase = False
+        while True:
+            kind, payload = self._queue.get()
+            if kind == "stop":
+                break
+
+            if kind == "start":
+                # A phrase starting inside the awake window is the command itself
+                command_phrase = self.is_awake
+                spotted = False
+                session = None
+                if not command_phrase:
+                    try:
+                        session = self.spotter.start_stream(self.sample_rate, self.sample_width)
+                    except Exception as e:
+                        if self.on_error:
+                            self.on_error(f"Wake word spotting failed: {str(e)}")
+
+            if kind in ("start", "frame"):
+                if session is None:
+                    continue
+                try:
+                    for frame in payload:
+                        # Keep decoding after a hit: words after the wake phrase
+                        # decide whether this phrase already holds the command
+                        partial = session.accept(frame)
+                        if not spotted and partial and self._find_phrase(partial)[0] is not None:
+                            # React as soon as the phrase is heard, not at the end
+                            spotted = True
+                            tracing.instant("wake phrase", "voice", partial=True)
+                            self.wake()
+                            if self.on_wake:
+                                self.on_wake()
+                except Exception as e:
+                    session = None
+                    if self.on_error:
+                        self.on_error(f"Wake word spotting failed: {str(e)}")
+                continue
+
+            segment_id, audio = payload
+            if command_phrase:
+                self._awake_until = 0.0
+                self.on_command(segment_id, audio)
+                continue
+
+            follows = False
+            if session is not None:
+                try:
+                    end, tokens = self._find_phrase(session.finish())
+                except sr.UnknownValueError:
+                    end, tokens = None, []
+                except Exception as e:
+                    end, tokens = None, []
+                    if self.on_error:
+                        self.on_error(f"Wake word spotting failed: {str(e)}")
+                if end is not None and not spotted:
+                    spotted = True
+                    self.wake()
+                    if self.on_wake:
+                        self.on_wake()
+                # Anything said after the wake phrase is the command
+                follows = end is not None and end < len(tokens)
+            session = None
+
+            if spotted and follows:
+                self._awake_until = 0.0
+                self.on_command(segment_id, audio)
+            else:
+                if spotted:
+                    self.wake()  # The awake window starts when the wake phrase ends
+                self.on_ignored(segment_id)
@@ -1,6 +1,7 @@
-from PySide6.QtCore import QObject, Signal, QThread
+from PySide6.QtCore import QObject, Signal, QThread, QRunnable
 import traceback
 import sys
+from . import tracing
 
 class WorkerSignals(QObject):
     """
@@ -38,9 +39,10 @@ class Worker(QObject):
         """
         try:
             self.signals.started.emit()
-            result = self.task(*self.args, **{**self.kwargs, 
-                                            'progress_callback': self.signals.progress.emit,
-                                            'status_callback': self.signals.status.emit})
+            with tracing.span(getattr(self.task, '__name__', 'task'), "worker"):
+                result = self.task(*self.args, **{**self.kwargs, 
+                                                'progress_callback': self.signals.progress.emit,
+                                                'status_callback': self.signals.status.emit})
             self.signals.result.emit(result)
         except:
             traceback.print_exc()
@@ -55,6 +57,34 @@ class Worker(QObject):
         """
         self._is_running = False
             
+class PooledWorker(QRunnable):
+    """
+    Short task run on a QThreadPool instead of its own QThread.
+    
+    Unlike Worker, the task gets no progress or status callbacks; results
+    and errors are reported through the same WorkerSignals, which live on
+    the creating thread, so connected slots run there.
+    """
+    
+    def __init__(self, task_func, *args, **kwargs):
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.task = task_func
+        self.args = args
+        self.kwargs = kwargs
+        
+    def run(self):
+        try:
+            with tracing.span(getattr(self.task, '__name__', 'task'), "pool"):
+                result = self.task(*self.args, **self.kwargs)
+            self.signals.result.emit(result)
+        except:
+            traceback.print_exc()
+            exctype, value = sys.exc_info()[:2]
+            self.signals.error.emit((exctype, value, traceback.format_exc()))
+        finally:
+            self.signals.finished.emit()
+            
 def create_thread_worker(task_func, *args, **kwargs):
     """
     Factory function to create and setup a worker thread.
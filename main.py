@@ -1,16 +1,89 @@
 # main.py
+import sys
+
+# The command-line mode never loads Qt, widgets or voice modules
+if __name__ == "__main__" and sys.argv[1:2] == ["--cli"]:
+    from core.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[2:]))
+
+import argparse, os
+
+
+def build_arg_parser(exit_on_error=True):
+    parser = argparse.ArgumentParser(description="DurangDBack voice notepad",
+                                     exit_on_error=exit_on_error)
+    parser.add_argument("files", nargs="*", metavar="FILE", help="text file to open")
+    parser.add_argument("--new", action="store_true", help="start with a new, empty note")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="start a separate process even if DurangDBack is running")
+    parser.add_argument("--memory-profile", action="store_true",
+                        help="trace memory from launch and show the Developer menu")
+    parser.add_argument("--memory-frames", type=int, default=25, metavar="N",
+                        help="traceback frames kept per allocation (default 25)")
+    parser.add_argument("--memory-report", metavar="FILE",
+                        help="write startup and exit memory snapshots to FILE on quit")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record a cross-thread trace and write it to FILE on quit")
+    parser.add_argument("--serve", action="store_true",
+                        help="start the local note service for this session")
+    return parser
+
+
+def forwarded_args(options):
+    """
+    The part of a parsed command line the running instance acts on: --new and
+    the files, made absolute here since the two processes' working folders differ
+    """
+    args = ["--new"] if options.new else []
+    return args + [os.path.abspath(path) for path in options.files]
+
+
+def runs_locally(options):
+    """True if the options only make sense in a process of their own"""
+    return bool(options.new_instance or options.memory_profile or options.memory_report
+                or options.trace or options.serve)
+
+
+# A second launch hands its command line to the running instance and exits
+# before paying for the window, theme and voice startup. It is parsed here,
+# so --help and mistakes are reported by this process and never reach the
+# running one
+if __name__ == "__main__":
+    launch_options, _ = build_arg_parser().parse_known_args()
+    if not runs_locally(launch_options):
+        from core.single_instance import forward_to_running_instance
+        if forward_to_running_instance(forwarded_args(launch_options)):
+            sys.exit(0)
+
 from PySide6.QtWidgets import (QApplication, QMainWindow, QTextEdit, QVBoxLayout,
     QWidget, QPushButton, QHBoxLayout, QFileDialog, QMessageBox, QMenuBar,
     QMenu, QToolBar, QDialog, QLabel, QCheckBox, QDialogButtonBox, QStatusBar,
-    QFontComboBox, QSpinBox, QComboBox, QColorDialog, QFontDialog)
+    QFontComboBox, QSpinBox, QComboBox, QColorDialog, QFontDialog, QInputDialog,
+    QDockWidget, QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem, QAbstractSlider,
+    QLineEdit)
 from PySide6.QtGui import QPalette, QColor, QAction, QIcon, QFont, QTextCharFormat, QActionGroup, QTextCursor
 from PySide6.QtCore import Qt, QTimer
-import os, sys
 from datetime import datetime
 from core.theme_manager import ThemeManager, Theme
 from core.voice_manager import VoiceManager
+from core.recognition_backends import BACKENDS
 from core.splash_screen import SplashScreen
 from core.thread_manager import ThreadManager
+from core.markup_highlighter import MarkupHighlighter
+from core.spell_checker import SpellChecker
+from core.settings import Settings
+from core.undo_manager import UndoManager
+from core.dictation_sink import DictationSink
+from core.note_manager import NoteManager
+from core.outline_index import OutlineIndex
+from core.note_service import NoteService
+from core.exporter import NoteExporter
+from core.importer import NoteImporter, format_summary
+from core.sync_engine import SyncEngine, MassDeletionError, format_summary as format_sync_summary
+from core.single_instance import SingleInstance, forward_to_running_instance
+from core import tracing
+from core.memory_profiler import (MemoryProfiler, start_tracing, stop_tracing,
+    format_snapshot, format_diff)
 
 # Create a simple red square icon for the system tray
 def create_app_icon():
@@ -44,11 +117,234 @@ def apply_dark_theme(app):
 
     app.setPalette(palette)
 
-def show_status_message(self, message, timeout=3000):
-    """Show a message in the status bar"""
-    self.statusBar().showMessage(message, timeout)
-
 # === Main window ===
+class VoiceLatencyDialog(QDialog):
+    """Per-stage latency histograms of voice commands, exportable as JSON"""
+    
+    COLUMNS = ("Stage", "Count", "Mean", "p50", "p90", "p99", "Max")
+    
+    def __init__(self, metrics, parent=None):
+        super().__init__(parent)
+        self.metrics = metrics
+        self.setWindowTitle("Voice Latency Diagnostics")
+        self.setMinimumSize(560, 320)
+        
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Milliseconds spent in each stage, from the end of speech "
+                                "to the executed command (most recent commands)."))
+        
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        
+        self.outcomes_label = QLabel()
+        layout.addWidget(self.outcomes_label)
+        
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        refresh_btn = button_box.addButton("Refresh", QDialogButtonBox.ActionRole)
+        reset_btn = button_box.addButton("Reset", QDialogButtonBox.ResetRole)
+        export_btn = button_box.addButton("Export JSON...", QDialogButtonBox.ActionRole)
+        refresh_btn.clicked.connect(self.refresh)
+        reset_btn.clicked.connect(self.reset)
+        export_btn.clicked.connect(self.export_json)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        
+        self.refresh()
+    
+    def refresh(self):
+        snapshot = self.metrics.snapshot()
+        intervals = snapshot["intervals"]
+        self.table.setRowCount(len(intervals))
+        for row, (name, stats) in enumerate(intervals.items()):
+            values = [name, str(stats["count"])] + [
+                f"{stats[key]:.1f}" for key in ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        self.table.resizeColumnsToContents()
+        outcomes = ", ".join(f"{name}: {count}" for name, count in snapshot["outcomes"].items())
+        self.outcomes_label.setText(f"Outcomes: {outcomes or 'no voice commands yet'}")
+    
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
+    
+    def export_json(self):
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Voice Latency", "voice_latency.json", "JSON Files (*.json)")
+        if filename:
+            try:
+                self.metrics.export_json(filename)
+            except OSError as e:
+                QMessageBox.warning(self, "Export Failed", str(e))
+
+class MemoryProfilerDialog(QDialog):
+    """Memory snapshots grouped by subsystem, and the diff between two of them"""
+    
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setWindowTitle("Memory Profiler")
+        self.setMinimumSize(640, 520)
+        
+        layout = QVBoxLayout(self)
+        self.tracing_label = QLabel()
+        layout.addWidget(self.tracing_label)
+        
+        compare_row = QHBoxLayout()
+        compare_row.addWidget(QLabel("Compare"))
+        self.old_combo = QComboBox()
+        self.new_combo = QComboBox()
+        compare_row.addWidget(self.old_combo, 1)
+        compare_row.addWidget(QLabel("with"))
+        compare_row.addWidget(self.new_combo, 1)
+        diff_btn = QPushButton("Diff")
+        diff_btn.clicked.connect(self.show_diff)
+        compare_row.addWidget(diff_btn)
+        layout.addLayout(compare_row)
+        
+        self.report = QTextEdit()
+        self.report.setReadOnly(True)
+        self.report.setLineWrapMode(QTextEdit.NoWrap)
+        self.report.setFont(QFont("monospace"))
+        layout.addWidget(self.report)
+        
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        self.tracing_btn = button_box.addButton("", QDialogButtonBox.ActionRole)
+        snapshot_btn = button_box.addButton("Take Snapshot", QDialogButtonBox.ActionRole)
+        export_btn = button_box.addButton("Export JSON...", QDialogButtonBox.ActionRole)
+        self.tracing_btn.clicked.connect(self.toggle_tracing)
+        snapshot_btn.clicked.connect(self.take_snapshot)
+        export_btn.clicked.connect(self.export_json)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        
+        self.old_combo.currentIndexChanged.connect(lambda index: self.show_snapshot(index))
+        self.update_tracing()
+        self.update_snapshots()
+        if profiler.snapshots:
+            self.show_snapshot(len(profiler.snapshots) - 1)
+        else:
+            self.report.setPlainText("Take a snapshot, use the session for a while, then take "
+                                     "another and diff the two.")
+    
+    def update_tracing(self):
+        if self.profiler.is_tracing:
+            self.tracing_label.setText("Tracing Python allocations.")
+            self.tracing_btn.setText("Stop Tracing")
+        else:
+            self.tracing_label.setText("Not tracing: snapshots hold Qt object counts and "
+                                       "subsystem reports only.")
+            self.tracing_btn.setText("Start Tracing")
+    
+    def update_snapshots(self):
+        labels = [snapshot.label for snapshot in self.profiler.snapshots]
+        for combo, index in ((self.old_combo, max(0, len(labels) - 2)),
+                             (self.new_combo, len(labels) - 1)):
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItems(labels)
+            combo.setCurrentIndex(index)
+            combo.blockSignals(False)
+    
+    def toggle_tracing(self):
+        if self.profiler.is_tracing:
+            stop_tracing()
+        else:
+            start_tracing()
+        self.update_tracing()
+    
+    def take_snapshot(self):
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.profiler.take_snapshot()
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.update_snapshots()
+        self.show_snapshot(len(self.profiler.snapshots) - 1)
+    
+    def show_snapshot(self, index):
+        if 0 <= index < len(self.profiler.snapshots):
+            self.report.setPlainText(format_snapshot(self.profiler.snapshots[index]))
+    
+    def show_diff(self):
+        snapshots = self.profiler.snapshots
+        old, new = self.old_combo.currentIndex(), self.new_combo.currentIndex()
+        if old < 0 or new < 0 or old == new:
+            self.report.setPlainText("Take at least two snapshots and pick two different ones.")
+            return
+        self.report.setPlainText(format_diff(self.profiler.diff(snapshots[old], snapshots[new])))
+    
+    def export_json(self):
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Memory Snapshots", "memory_profile.json", "JSON Files (*.json)")
+        if filename:
+            try:
+                self.profiler.export_json(filename)
+            except OSError as e:
+                QMessageBox.warning(self, "Export Failed", str(e))
+
+class ExportDialog(QDialog):
+    """Formats and destination for exporting every note"""
+    
+    FORMAT_LABELS = (("html", "HTML"), ("md", "Markdown"), ("pdf", "PDF"))
+    
+    def __init__(self, formats, dest, markup, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Export Notes")
+        self.setMinimumWidth(420)
+        
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Export every note to:"))
+        
+        self.format_boxes = {}
+        for fmt, label in self.FORMAT_LABELS:
+            box = QCheckBox(label)
+            box.setChecked(fmt in formats)
+            self.format_boxes[fmt] = box
+            layout.addWidget(box)
+        
+        dest_row = QHBoxLayout()
+        self.dest_edit = QLineEdit(dest)
+        browse_btn = QPushButton("Browse...")
+        browse_btn.clicked.connect(self.browse)
+        dest_row.addWidget(QLabel("Folder:"))
+        dest_row.addWidget(self.dest_edit)
+        dest_row.addWidget(browse_btn)
+        layout.addLayout(dest_row)
+        
+        self.markup_box = QCheckBox("Render markup (headings, lists, bold, code)")
+        self.markup_box.setChecked(markup)
+        layout.addWidget(self.markup_box)
+        
+        self.resume_box = QCheckBox("Skip notes unchanged since the last export to this folder")
+        self.resume_box.setChecked(True)
+        layout.addWidget(self.resume_box)
+        
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+    
+    def browse(self):
+        folder = QFileDialog.getExistingDirectory(self, "Export Folder", self.dest_edit.text())
+        if folder:
+            self.dest_edit.setText(folder)
+    
+    def formats(self):
+        return [fmt for fmt, box in self.format_boxes.items() if box.isChecked()]
+    
+    def accept(self):
+        if not self.formats():
+            QMessageBox.warning(self, "Export Notes", "Choose at least one format.")
+            return
+        if not self.dest_edit.text().strip():
+            QMessageBox.warning(self, "Export Notes", "Choose a folder to export to.")
+            return
+        super().accept()
+
 class TermsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -109,24 +405,60 @@ class DurangMain(QMainWindow):
         self.splash = SplashScreen()
         self.splash.show()
         
+        # Load persisted settings
+        self.settings = Settings()
+        
         # Initialize thread manager
         self.thread_manager = ThreadManager()
         
+        # On-demand memory reports; subsystems add their own figures
+        self.memory_profiler = MemoryProfiler()
+        self._developer_menu_visible = False
+        
+        # Command lines received before the editor exists (own or forwarded)
+        self._pending_launches = []
+        
+        # File the editor was last opened from or saved to, if any
+        self.current_path = None
+        
+        # Bulk export, import and folder sync in progress, if any
+        self.exporter = None
+        self.importer = None
+        self.sync_engine = None
+        self.memory_profiler.add_source("threads", self.thread_manager.memory_report)
+        
         # Initialize voice manager (but don't start listening yet)
-        self.voice_manager = VoiceManager()
+        self.voice_manager = VoiceManager(settings=self.settings)
+        self.apply_recognition_backend(self.settings.value("voice/backend"))
+        self.voice_manager.set_streaming(self.settings.value("voice/streaming"))
+        self.voice_manager.partial_result.connect(self.on_partial_result)
+        self.voice_manager.speech_started.connect(self.on_speech_started)
+        self.voice_manager.speech_finished.connect(self.on_speech_finished)
+        self.voice_manager.speech_progress.connect(self.on_speech_progress)
+        self._preedit_block = None
         self.voice_manager.voice_command_received.connect(self.handle_voice_command)
         self.voice_manager.recording_started.connect(self.on_recording_started)
         self.voice_manager.recording_stopped.connect(self.on_recording_stopped)
         self.voice_manager.error_occurred.connect(self.on_voice_error)
+        self.voice_manager.wake_word_detected.connect(self.on_wake_word)
         self.voice_manager.recording_stopped.connect(lambda: self.statusBar().showMessage("Processing..."))
         self.voice_manager.error_occurred.connect(lambda msg: self.statusBar().showMessage(f"Error: {msg}", 5000))
+        self.memory_profiler.add_source("voice", self.voice_manager.memory_report)
         
         # Use timer to simulate loading and initialize UI after splash
         QTimer.singleShot(2000, self.delayed_init)
         
-        # Initialize paths
-        self.notes_dir = os.path.join(os.getcwd(), "notes")
-        self.backup_dir = os.path.join(os.getcwd(), "backup")
+        # Initialize paths; the directories are created in the background below
+        self.note_manager = NoteManager(create_dirs=False)
+        self.notes_dir = self.note_manager.notes_path
+        self.backup_dir = self.note_manager.backup_path
+        
+        # Optional local JSON-RPC service for other tools; calls run on the thread pool
+        self.note_service = NoteService(self.note_manager, self.thread_manager,
+                                        name=self.settings.value("service/name") or None)
+        self.note_service.error_occurred.connect(
+            lambda msg: self.statusBar().showMessage(msg, 5000))
+        self.note_service.note_changed.connect(self.on_note_changed_externally)
         
         # Create directories in background
         def init_dirs_task(progress_callback, status_callback):
@@ -158,16 +490,47 @@ class DurangMain(QMainWindow):
         # Show terms on first run
         self.check_first_run()
         
+        if self.settings.value("voice/hands_free"):
+            self.toggle_hands_free(True)
+        
+        if self.settings.value("service/enabled"):
+            self.toggle_note_service(True)
+        
         # Close splash and show main window
         self.splash.close()
         self.show()
         
+        # With --memory-profile, later snapshots are compared to this one
+        if self.memory_profiler.is_tracing:
+            self.memory_profiler.take_snapshot("Startup")
+        
+        pending, self._pending_launches = self._pending_launches, []
+        for args, cwd in pending:
+            self.handle_launch_args(args, cwd)
+        
+    def show_status_message(self, message, timeout=3000):
+        """Show a message in the status bar"""
+        self.statusBar().showMessage(message, timeout)
+    
+    @tracing.traced("voice command", "gui")
     def handle_voice_command(self, command):
         """Handle voice commands received from VoiceManager"""
+        metrics = self.voice_manager.metrics
+        segment_id = metrics.begin_dispatch()
         try:
+            self.clear_partial_result()
             action = self.voice_manager.process_command(command)
+            metrics.mark(segment_id, "parsed")
             feedback = f"Voice command: {command}"
             
+            if action.startswith("text:"):
+                # Dictation is buffered and inserted with the rest of this frame's
+                # text; the sink marks it executed once it is in the document
+                self.dictation_sink.append(action[5:] + " ", segment_id)
+                return
+            # Other commands act on the document as dictated so far
+            self.dictation_sink.flush()
+            
             try:
                 # File operations
                 if action == "new":
@@ -198,25 +561,32 @@ class DurangMain(QMainWindow):
                     color_name = action.split(":")[-1]
                     self.text_edit.setTextColor(QColor(color_name))
                 elif action.startswith("format:title:"):
-                    text = action.split(":", 2)[-1]
-                    format = self.text_edit.currentCharFormat()
-                    format.setFontPointSize(24)
-                    format.setFontWeight(QFont.Bold)
-                    self.text_edit.setCurrentCharFormat(format)
-                    self.text_edit.insertPlainText(text + "\n")
+                    text = action.split(":", 2)[-1].strip()
+                    if self.highlighter.enabled:
+                        # Markup is styled by the highlighter and survives plain-text saves
+                        self.text_edit.insertPlainText(f"# {text}\n")
+                    else:
+                        format = self.text_edit.currentCharFormat()
+                        format.setFontPointSize(24)
+                        format.setFontWeight(QFont.Bold)
+                        self.text_edit.setCurrentCharFormat(format)
+                        self.text_edit.insertPlainText(text + "\n")
                 elif action.startswith("format:heading:"):
-                    text = action.split(":", 2)[-1]
-                    format = self.text_edit.currentCharFormat()
-                    format.setFontPointSize(18)
-                    format.setFontWeight(QFont.Bold)
-                    self.text_edit.setCurrentCharFormat(format)
-                    self.text_edit.insertPlainText(text + "\n")
+                    text = action.split(":", 2)[-1].strip()
+                    if self.highlighter.enabled:
+                        self.text_edit.insertPlainText(f"## {text}\n")
+                    else:
+                        format = self.text_edit.currentCharFormat()
+                        format.setFontPointSize(18)
+                        format.setFontWeight(QFont.Bold)
+                        self.text_edit.setCurrentCharFormat(format)
+                        self.text_edit.insertPlainText(text + "\n")
                 
                 # Navigation and text operations
                 elif action == "nav:page_up":
-                    self.text_edit.moveCursor(QTextCursor.PreviousPage)
+                    self.text_edit.verticalScrollBar().triggerAction(QAbstractSlider.SliderPageStepSub)
                 elif action == "nav:page_down":
-                    self.text_edit.moveCursor(QTextCursor.NextPage)
+                    self.text_edit.verticalScrollBar().triggerAction(QAbstractSlider.SliderPageStepAdd)
                 elif action == "nav:top":
                     self.text_edit.moveCursor(QTextCursor.Start)
                 elif action == "nav:bottom":
@@ -231,6 +601,10 @@ class DurangMain(QMainWindow):
                     self.text_edit.undo()
                 elif action == "nav:redo":
                     self.text_edit.redo()
+                elif action.startswith("nav:heading:"):
+                    title = action.split(":", 2)[-1]
+                    if not self.go_to_heading(title):
+                        feedback = f"Heading not found: {title}"
                 elif action.startswith("nav:find:"):
                     text = action.split(":", 2)[-1]
                     self.text_edit.find(text)
@@ -247,11 +621,12 @@ class DurangMain(QMainWindow):
                 elif action == "read:stop":
                     self.voice_manager.stop_speaking()
                 elif action == "read:pause":
-                    # Pause functionality will be implemented when supported
-                    self.show_status_message("Pause reading not yet supported", 3000)
+                    self.voice_manager.pause_speaking()
+                    feedback = "Reading will pause after this sentence"
                 elif action == "read:resume":
-                    # Resume functionality will be implemented when supported
-                    self.show_status_message("Resume reading not yet supported", 3000)
+                    self.voice_manager.resume_speaking()
+                elif action == "read:skip":
+                    self.voice_manager.skip_sentence()
                 
                 # Show dialogs
                 elif action == "show:about":
@@ -261,19 +636,18 @@ class DurangMain(QMainWindow):
                 elif action == "show:credits":
                     self.show_credits()
                 
-                # Text insertion
-                elif action.startswith("text:"):
-                    text = action[5:]
-                    self.text_edit.insertPlainText(text + " ")
-                
                 # Show feedback in status bar
                 self.show_status_message(feedback)
+                metrics.mark(segment_id, "executed")
+                metrics.finish(segment_id, action=action)
             
             except Exception as e:
+                metrics.finish(segment_id, outcome="failed", action=action)
                 self.show_status_message(f"Error executing command: {str(e)}", 5000)
                 print(f"Error executing voice command: {str(e)}")
         
         except Exception as e:
+            metrics.finish(segment_id, outcome="failed")
             self.show_status_message("Error processing voice command", 3000)
             print(f"Error in voice command handling: {str(e)}")
     
@@ -293,6 +667,24 @@ class DurangMain(QMainWindow):
         save_action.triggered.connect(self.save_note)
         file_menu.addAction(save_action)
         
+        export_action = QAction("&Export Notes...", self)
+        export_action.setShortcut("Ctrl+Shift+E")
+        export_action.triggered.connect(self.export_notes)
+        file_menu.addAction(export_action)
+        
+        import_action = QAction("&Import Notes...", self)
+        import_action.triggered.connect(self.import_notes)
+        file_menu.addAction(import_action)
+        
+        sync_action = QAction("S&ync Notes", self)
+        sync_action.setShortcut("Ctrl+Shift+Y")
+        sync_action.triggered.connect(lambda: self.sync_notes())
+        file_menu.addAction(sync_action)
+        
+        sync_folder_action = QAction("Sync &Folder...", self)
+        sync_folder_action.triggered.connect(lambda: self.sync_notes(choose_folder=True))
+        file_menu.addAction(sync_folder_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction("E&xit", self)
@@ -303,6 +695,18 @@ class DurangMain(QMainWindow):
         # Edit menu
         edit_menu = menubar.addMenu("&Edit")
         
+        # Undo history
+        clear_undo_action = QAction("Clear &Undo History", self)
+        clear_undo_action.setStatusTip("Free memory held by the undo history")
+        clear_undo_action.triggered.connect(lambda: self.undo_manager.clear_history())
+        edit_menu.addAction(clear_undo_action)
+        
+        undo_limits_action = QAction("Undo History &Limits...", self)
+        undo_limits_action.triggered.connect(self.configure_undo_limits)
+        edit_menu.addAction(undo_limits_action)
+        
+        edit_menu.addSeparator()
+        
         # Format submenu
         format_menu = edit_menu.addMenu("&Format")
         
@@ -326,6 +730,7 @@ class DurangMain(QMainWindow):
         
         # View menu
         view_menu = menubar.addMenu("&View")
+        self.view_menu = view_menu
         
         # Theme submenu
         theme_menu = view_menu.addMenu("&Theme")
@@ -339,6 +744,67 @@ class DurangMain(QMainWindow):
             QTextEdit.WidgetWidth if checked else QTextEdit.NoWrap))
         view_menu.addAction(wrap_action)
         
+        # Markup mode
+        self.markup_action = QAction("&Markup Mode", self)
+        self.markup_action.setCheckable(True)
+        self.markup_action.setChecked(True)
+        self.markup_action.setStatusTip("Style # headings, lists and *emphasis* as you type")
+        self.markup_action.triggered.connect(self.toggle_markup_mode)
+        view_menu.addAction(self.markup_action)
+        
+        # Spell check
+        self.spell_action = QAction("&Spell Check", self)
+        self.spell_action.setCheckable(True)
+        self.spell_action.setChecked(True)
+        self.spell_action.setStatusTip("Underline misspelled words")
+        self.spell_action.triggered.connect(self.toggle_spell_check)
+        view_menu.addAction(self.spell_action)
+        
+        view_menu.addSeparator()
+        
+        memory_action = QAction("&Memory Report...", self)
+        memory_action.setStatusTip("Show memory used by the document and undo history")
+        memory_action.triggered.connect(self.show_memory_report)
+        view_menu.addAction(memory_action)
+        
+        # Voice menu
+        voice_menu = menubar.addMenu("V&oice")
+        
+        engine_menu = voice_menu.addMenu("Recognition &Engine")
+        self.backend_group = QActionGroup(self)
+        current_backend = self.voice_manager.backend.name
+        for name, backend_class in BACKENDS.items():
+            if not backend_class.selectable:
+                continue
+            action = QAction(backend_class.label, self)
+            action.setCheckable(True)
+            action.setData(name)
+            action.setChecked(name == current_backend)
+            action.triggered.connect(self.change_recognition_backend)
+            self.backend_group.addAction(action)
+            engine_menu.addAction(action)
+        
+        streaming_action = QAction("Show &Partial Results", self)
+        streaming_action.setCheckable(True)
+        streaming_action.setChecked(self.voice_manager.streaming)
+        streaming_action.setStatusTip("Show dictation while you speak (Vosk and other streaming engines)")
+        streaming_action.triggered.connect(self.toggle_streaming_recognition)
+        voice_menu.addAction(streaming_action)
+        
+        self.hands_free_action = QAction("&Hands-Free (Wake Word)", self)
+        self.hands_free_action.setCheckable(True)
+        self.hands_free_action.setStatusTip(
+            f"Listen continuously and act on commands after "
+            f"\"{self.settings.value('voice/wake_phrase')}\" (needs a Vosk model)")
+        self.hands_free_action.triggered.connect(self.toggle_hands_free)
+        voice_menu.addAction(self.hands_free_action)
+        
+        voice_menu.addSeparator()
+        latency_action = QAction("&Latency Diagnostics...", self)
+        latency_action.setStatusTip("Show where time is spent between speaking and the command running")
+        latency_action.triggered.connect(self.show_voice_latency)
+        voice_menu.addAction(latency_action)
+        
         # Help menu
         help_menu = menubar.addMenu("&Help")
         
@@ -366,6 +832,34 @@ class DurangMain(QMainWindow):
         credits_action.triggered.connect(self.show_credits)
         help_menu.addAction(credits_action)
         
+        # Developer menu, hidden until Ctrl+Shift+F12 or --memory-profile
+        self.developer_menu = menubar.addMenu("&Developer")
+        self.developer_menu.menuAction().setVisible(self._developer_menu_visible)
+        memory_profiler_action = QAction("&Memory Profiler...", self)
+        memory_profiler_action.setStatusTip("Snapshot and diff memory use by subsystem")
+        memory_profiler_action.triggered.connect(self.show_memory_profiler)
+        self.developer_menu.addAction(memory_profiler_action)
+        
+        self.trace_action = QAction("Record &Trace", self)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(tracing.is_enabled())
+        self.trace_action.setStatusTip("Record spans across threads; stop to save Chrome trace JSON")
+        self.trace_action.triggered.connect(self.toggle_tracing)
+        self.developer_menu.addAction(self.trace_action)
+        
+        self.service_action = QAction("Local &Note Service", self)
+        self.service_action.setCheckable(True)
+        self.service_action.setChecked(self.note_service.is_running)
+        self.service_action.setStatusTip("Let local tools read and append notes over JSON-RPC")
+        self.service_action.triggered.connect(self.toggle_note_service)
+        self.developer_menu.addAction(self.service_action)
+        
+        developer_action = QAction("Show Developer Menu", self)
+        developer_action.setShortcut("Ctrl+Shift+F12")
+        developer_action.triggered.connect(
+            lambda: self.show_developer_menu(not self.developer_menu.menuAction().isVisible()))
+        self.addAction(developer_action)
+        
     def setup_theme_actions(self, theme_menu):
         self.theme_group = QActionGroup(self)
         
@@ -503,6 +997,39 @@ class DurangMain(QMainWindow):
         # Enable rich text features
         self.text_edit.setAcceptRichText(True)
         
+        # Style lightweight markup incrementally, only near the viewport
+        self.highlighter = MarkupHighlighter(self.text_edit)
+        if hasattr(self, 'markup_action'):
+            self.highlighter.set_enabled(self.markup_action.isChecked())
+        
+        # Spell check changed blocks in the background; suggestions on right-click
+        self.spell_checker = SpellChecker(
+            user_dictionary_path=os.path.join(self.notes_dir, ".user_words"))
+        self.spell_checker.error_occurred.connect(self.on_spell_check_unavailable)
+        self.spell_checker.start()
+        if not hasattr(self, 'spell_action') or self.spell_action.isChecked():
+            self.highlighter.set_spell_checker(self.spell_checker)
+        
+        # Bound the undo history and group dictation into single undo steps
+        self.undo_manager = UndoManager(
+            self.text_edit,
+            max_steps=self.settings.value("undo/max_steps"),
+            max_bytes=self.settings.value("undo/max_bytes"),
+            group_window_ms=self.settings.value("undo/group_dictation_ms"),
+            ask_when_full=self.settings.value("undo/ask_when_full"))
+        self.undo_manager.history_trimmed.connect(
+            lambda reason: self.statusBar().showMessage(f"Undo history cleared: {reason}", 5000))
+        # Queued, so the question is not asked in the middle of an edit
+        self.undo_manager.limit_reached.connect(self.on_undo_limit_reached, Qt.QueuedConnection)
+        self.memory_profiler.add_source("editor", self.undo_manager.memory_report)
+        
+        # Dictated text is applied once per frame in a single edit block
+        self.dictation_sink = DictationSink(self.undo_manager, metrics=self.voice_manager.metrics)
+        self.dictation_sink.flushed.connect(self.on_dictation_flushed)
+        
+        self.text_edit.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.text_edit.customContextMenuRequested.connect(self.show_editor_context_menu)
+        
         # Add format toolbar
         format_toolbar = QToolBar("Format")
         self.addToolBar(Qt.TopToolBarArea, format_toolbar)
@@ -543,6 +1070,68 @@ class DurangMain(QMainWindow):
         layout.addWidget(self.text_edit)
         self.setCentralWidget(central_widget)
         
+        self.setup_outline_dock()
+        
+    def setup_outline_dock(self):
+        """Create the outline dock listing the note's headings"""
+        # Headings are indexed incrementally from contentsChange
+        self.outline = OutlineIndex(self.text_edit.document())
+        
+        self.outline_list = QListWidget()
+        self.outline_list.itemActivated.connect(self.on_outline_item_activated)
+        self.outline_list.itemClicked.connect(self.on_outline_item_activated)
+        
+        self.outline_dock = QDockWidget("Outline", self)
+        self.outline_dock.setObjectName("outline_dock")
+        self.outline_dock.setWidget(self.outline_list)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.outline_dock)
+        self.outline_dock.hide()
+        
+        # Refresh the list at most once per burst of edits, and only when visible
+        self._outline_timer = QTimer(self)
+        self._outline_timer.setSingleShot(True)
+        self._outline_timer.setInterval(200)
+        self._outline_timer.timeout.connect(self.refresh_outline)
+        self.outline.outline_changed.connect(self._outline_timer.start)
+        self.outline_dock.visibilityChanged.connect(
+            lambda visible: visible and self.refresh_outline())
+        
+        if hasattr(self, 'view_menu'):
+            outline_action = self.outline_dock.toggleViewAction()
+            outline_action.setText("&Outline")
+            outline_action.setShortcut("Ctrl+Shift+O")
+            self.view_menu.addAction(outline_action)
+        
+    def refresh_outline(self):
+        """Rebuild the outline list from the heading index"""
+        if not self.outline_dock.isVisible():
+            return
+        self.outline_list.clear()
+        for entry in self.outline.entries():
+            item = QListWidgetItem("    " * (entry.level - 1) + entry.title)
+            item.setData(Qt.UserRole, entry)
+            self.outline_list.addItem(item)
+            
+    def on_outline_item_activated(self, item):
+        """Jump to the heading selected in the outline"""
+        entry = item.data(Qt.UserRole)
+        self.move_cursor_to(entry.position)
+        
+    def go_to_heading(self, title):
+        """Move the cursor to the heading matching title"""
+        entry = self.outline.find(title)
+        if entry is None:
+            return False
+        self.move_cursor_to(entry.position)
+        return True
+        
+    def move_cursor_to(self, position):
+        cursor = self.text_edit.textCursor()
+        cursor.setPosition(min(position, self.text_edit.document().characterCount() - 1))
+        self.text_edit.setTextCursor(cursor)
+        self.text_edit.ensureCursorVisible()
+        self.text_edit.setFocus()
+        
     def format_changed(self, format):
         """Update formatting buttons when text format changes"""
         self.bold_btn.setChecked(format.font().bold())
@@ -600,11 +1189,6 @@ class DurangMain(QMainWindow):
     def toggle_text_to_speech(self):
         """Toggle reading the note aloud"""
         try:
-            if not hasattr(self, 'voice_manager'):
-                self.voice_manager = VoiceManager()
-                self.voice_manager.speech_started.connect(self.on_speech_started)
-                self.voice_manager.speech_finished.connect(self.on_speech_finished)
-            
             if self.speak_btn.isChecked():
                 # Get selected text or all text
                 text = self.text_edit.textCursor().selectedText()
@@ -612,57 +1196,87 @@ class DurangMain(QMainWindow):
                     text = self.text_edit.toPlainText()
                 
                 if text:
-                    def tts_task(progress_callback, status_callback):
-                        status_callback("Initializing text-to-speech...")
-                        progress_callback(10)
-                        
-                        # Break text into chunks for progress updates
-                        chunks = [text[i:i+100] for i in range(0, len(text), 100)]
-                        total_chunks = len(chunks)
-                        
-                        for i, chunk in enumerate(chunks, 1):
-                            if not hasattr(self, 'voice_manager'):  # Check if stopped
-                                return
-                            self.voice_manager.speak_text(chunk)
-                            progress_callback(int(90 * i / total_chunks) + 10)
-                            status_callback(f"Reading chunk {i}/{total_chunks}...")
-                        
-                        return "Speech completed"
-                    
-                    def on_tts_progress(percent):
-                        self.statusBar().showMessage(f"Reading... {percent}%")
-                    
-                    def on_tts_status(msg):
-                        self.statusBar().showMessage(msg)
-                    
-                    def on_tts_error(error_info):
-                        exctype, value, tb = error_info
-                        self.speak_btn.setChecked(False)
-                        self.statusBar().showMessage(f"Error in text-to-speech: {str(value)}", 5000)
-                        print(f"Error in text-to-speech: {str(value)}")
-                    
-                    # Start TTS in background
-                    self.thread_manager.start_worker(
-                        "text_to_speech",
-                        tts_task,
-                        on_error=on_tts_error,
-                        on_progress=on_tts_progress,
-                        on_status=on_tts_status
-                    )
+                    # Sentences are queued on the TTS thread; progress arrives as signals
+                    self.voice_manager.speak_text(text)
+                    self.statusBar().showMessage("Reading...")
                 else:
                     self.speak_btn.setChecked(False)
                     self.statusBar().showMessage("No text to read", 3000)
             else:
-                # Stop any running TTS
-                self.thread_manager.stop_worker("text_to_speech")
-                if hasattr(self, 'voice_manager'):
-                    self.voice_manager.stop_speaking()
+                self.voice_manager.stop_speaking()
                 self.statusBar().showMessage("Stopped reading", 3000)
         except Exception as e:
             self.speak_btn.setChecked(False)
             self.statusBar().showMessage(f"Error in text-to-speech: {str(e)}", 5000)
             print(f"Error in text-to-speech: {str(e)}")
     
+    def on_speech_progress(self, spoken, total):
+        """Show reading progress based on characters spoken"""
+        if total:
+            paused = " (paused)" if self.voice_manager.tts.is_paused else ""
+            self.statusBar().showMessage(f"Reading... {100 * spoken // total}%{paused}")
+    
+    def on_dictation_flushed(self, text, utterances):
+        """Report a batch of dictated text once it is in the document"""
+        text = text.strip()
+        if len(text) > 60:
+            text = "..." + text[-57:]
+        self.show_status_message(f"Dictated: {text}")
+    
+    def show_voice_latency(self):
+        """Show per-stage voice command latency"""
+        VoiceLatencyDialog(self.voice_manager.metrics, self).exec()
+    
+    def toggle_hands_free(self, checked):
+        """Start or stop listening for the wake phrase"""
+        phrase = self.settings.value("voice/wake_phrase")
+        try:
+            if checked:
+                self.voice_manager.start_hands_free(phrases=(phrase,))
+                self.statusBar().showMessage(f"Hands-free: say \"{phrase}\" followed by a command", 5000)
+            else:
+                self.voice_manager.stop_hands_free()
+                self.statusBar().showMessage("Hands-free mode off", 3000)
+            self.settings.set_value("voice/hands_free", checked)
+        except Exception as e:
+            checked = False
+            self.statusBar().showMessage(f"Hands-free mode unavailable: {str(e)}", 5000)
+            print(f"Error starting hands-free mode: {str(e)}")
+        self.hands_free_action.setChecked(checked)
+    
+    def on_wake_word(self):
+        """The wake phrase was heard; the next phrase is a command"""
+        self.statusBar().showMessage("Listening for command...", 5000)
+    
+    def toggle_streaming_recognition(self, checked):
+        """Enable or disable partial recognition results"""
+        self.voice_manager.set_streaming(checked)
+        self.settings.set_value("voice/streaming", checked)
+    
+    def on_partial_result(self, text):
+        """Show a provisional hypothesis at the cursor while the phrase is spoken"""
+        if not text:
+            self.clear_partial_result()
+            return
+        if not hasattr(self, 'text_edit'):
+            return
+        self.clear_partial_result()
+        # The preedit area is drawn by the layout but is not part of the
+        # document, so partials never reach the undo stack or saved notes
+        cursor = self.text_edit.textCursor()
+        block = cursor.block()
+        block.layout().setPreeditArea(cursor.position() - block.position(), text)
+        self.text_edit.document().markContentsDirty(block.position(), block.length())
+        self._preedit_block = block
+    
+    def clear_partial_result(self):
+        """Remove the provisional hypothesis, if any"""
+        block = self._preedit_block
+        self._preedit_block = None
+        if block is not None and block.isValid() and block.layout() is not None:
+            block.layout().setPreeditArea(-1, "")
+            self.text_edit.document().markContentsDirty(block.position(), block.length())
+    
     def on_speech_started(self):
         """Handle speech started signal"""
         self.speak_btn.setChecked(True)
@@ -714,6 +1328,153 @@ class DurangMain(QMainWindow):
         """Toggle italic formatting on selected text"""
         self.text_edit.setFontItalic(not self.text_edit.fontItalic())
         
+    def toggle_markup_mode(self, checked):
+        """Enable or disable markup styling in the editor"""
+        self.highlighter.set_enabled(checked)
+        self.statusBar().showMessage(
+            "Markup mode on" if checked else "Markup mode off", 3000)
+        
+    def toggle_spell_check(self, checked):
+        """Enable or disable spell-check underlines in the editor"""
+        self.highlighter.set_spell_checker(self.spell_checker if checked else None)
+        
+    def on_spell_check_unavailable(self, message):
+        """Turn the Spell Check action off when no word list could be loaded"""
+        self.spell_action.setChecked(False)
+        self.spell_action.setEnabled(False)
+        self.spell_action.setStatusTip(message)
+        self.highlighter.set_spell_checker(None)
+        self.statusBar().showMessage(message, 10000)
+
+    def show_editor_context_menu(self, pos):
+        """Show the editor context menu with spelling suggestions on top"""
+        menu = self.text_edit.createStandardContextMenu(pos)
+        
+        cursor = self.text_edit.cursorForPosition(pos)
+        cursor.select(QTextCursor.WordUnderCursor)
+        word = cursor.selectedText()
+        if (word and self.highlighter.spell_checker is not None
+                and not self.spell_checker.is_correct(word)):
+            first_action = menu.actions()[0] if menu.actions() else None
+            # Suggestions are computed lazily, only for the clicked word
+            suggestions = self.spell_checker.suggestions(word)
+            if not suggestions:
+                no_action = QAction("No suggestions", menu)
+                no_action.setEnabled(False)
+                menu.insertAction(first_action, no_action)
+            for suggestion in suggestions:
+                action = QAction(suggestion, menu)
+                action.triggered.connect(
+                    lambda checked, c=QTextCursor(cursor), s=suggestion: c.insertText(s))
+                menu.insertAction(first_action, action)
+            add_action = QAction(f"Add \"{word}\" to Dictionary", menu)
+            add_action.triggered.connect(lambda checked, w=word: self.add_to_dictionary(w))
+            menu.insertAction(first_action, add_action)
+            menu.insertSeparator(first_action)
+        
+        menu.exec(self.text_edit.viewport().mapToGlobal(pos))
+        
+    def add_to_dictionary(self, word):
+        """Add a word to the user dictionary and clear its underline"""
+        self.spell_checker.add_word(word)
+        self.highlighter.refresh_viewport()
+        self.statusBar().showMessage(f"Added '{word}' to dictionary", 3000)
+        
+    def configure_undo_limits(self):
+        """Ask for new undo history limits and persist them"""
+        steps, ok = QInputDialog.getInt(
+            self, "Undo History Limits", "Maximum undo steps:",
+            self.undo_manager.max_steps, 10, 100000)
+        if not ok:
+            return
+        megabytes, ok = QInputDialog.getInt(
+            self, "Undo History Limits", "Maximum undo memory (MB):",
+            max(1, self.undo_manager.max_bytes // (1024 * 1024)), 1, 4096)
+        if not ok:
+            return
+        choices = ["Ask before clearing the history", "Clear the history without asking"]
+        choice, ok = QInputDialog.getItem(
+            self, "Undo History Limits", "When a limit is reached:", choices,
+            0 if self.undo_manager.ask_when_full else 1, False)
+        if not ok:
+            return
+        max_bytes = megabytes * 1024 * 1024
+        self.settings.set_value("undo/max_steps", steps)
+        self.settings.set_value("undo/max_bytes", max_bytes)
+        self.settings.set_value("undo/ask_when_full", choice == choices[0])
+        self.undo_manager.ask_when_full = choice == choices[0]
+        self.undo_manager.set_limits(steps, max_bytes)
+        self.statusBar().showMessage(f"Undo limits: {steps} steps, {megabytes} MB", 3000)
+        
+    def on_undo_limit_reached(self, reason):
+        """Ask before the undo history is cleared to stay within its limits"""
+        if self.confirm_action("Undo History Full",
+                               f"The {reason}. Clear it to free memory?\n\n"
+                               "Choose No to keep every step; you will be asked again "
+                               "once the history has doubled, and past four times the "
+                               "limits it is cleared without asking. Edit > Undo History Limits "
+                               "changes the limits or stops this question."):
+            self.undo_manager.clear_history(reason)
+        else:
+            self.undo_manager.keep_history()
+        
+    def show_memory_report(self):
+        """Show the estimated memory footprint of the current document"""
+        report = self.undo_manager.memory_report()
+        
+        def kb(value):
+            return f"{value / 1024:.1f} KB"
+        
+        QMessageBox.information(self, "Memory Report", (
+            f"Document: {report['document_chars']} chars in "
+            f"{report['document_blocks']} blocks (~{kb(report['document_bytes'])})\n"
+            f"Undo stack: {report['undo_steps']} undo / {report['redo_steps']} redo steps "
+            f"(~{kb(report['undo_bytes'])})\n"
+            f"Formats: {report['format_objects']} format objects "
+            f"(~{kb(report['format_bytes'])})\n\n"
+            f"Limits: {self.undo_manager.max_steps} steps, "
+            f"{self.undo_manager.max_bytes // (1024 * 1024)} MB"))
+        
+    def show_developer_menu(self, visible=True):
+        """Show or hide the hidden Developer menu"""
+        self._developer_menu_visible = visible
+        if hasattr(self, 'developer_menu'):
+            self.developer_menu.menuAction().setVisible(visible)
+        
+    def toggle_tracing(self, checked):
+        """Start recording a trace, or stop and save it for chrome://tracing or Perfetto"""
+        if checked:
+            tracing.clear()
+            tracing.enable()
+            self.statusBar().showMessage("Recording trace...", 3000)
+            return
+        tracing.disable()
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Save Trace", "durang_trace.json", "Chrome Trace (*.json)")
+        if filename:
+            try:
+                count = tracing.export(filename)
+                self.statusBar().showMessage(f"Saved {count} trace events to {filename}", 5000)
+            except OSError as e:
+                QMessageBox.warning(self, "Save Failed", str(e))
+        
+    def toggle_note_service(self, checked):
+        """Start or stop the local note service"""
+        if checked and self.note_service.start():
+            self.statusBar().showMessage(f"Note service listening on {self.note_service.address}", 5000)
+        elif not checked:
+            self.note_service.stop()
+            self.statusBar().showMessage("Note service stopped", 3000)
+        # A start refused because another process serves the notes keeps the setting
+        if self.note_service.is_running == checked:
+            self.settings.set_value("service/enabled", checked)
+        if hasattr(self, 'service_action'):
+            self.service_action.setChecked(self.note_service.is_running)
+        
+    def show_memory_profiler(self):
+        """Show memory snapshots grouped by subsystem"""
+        MemoryProfilerDialog(self.memory_profiler, self).exec()
+        
     def choose_font_family(self):
         """Open font selection dialog"""
         font, ok = QFontDialog.getFont(self.text_edit.currentFont(), self)
@@ -730,6 +1491,28 @@ class DurangMain(QMainWindow):
         if color.isValid():
             self.text_edit.setTextColor(color)
             
+    def apply_recognition_backend(self, name):
+        """Switch the voice manager to a recognition backend by name"""
+        options = {}
+        if name == "vosk" and self.settings.value("voice/vosk_model"):
+            options["model_path"] = self.settings.value("voice/vosk_model")
+        try:
+            self.voice_manager.set_backend(name, **options)
+        except ValueError as e:
+            print(f"Error selecting recognition backend: {str(e)}")
+            self.voice_manager.set_backend("google")
+            
+    def change_recognition_backend(self):
+        """Change the speech recognition backend and remember the choice"""
+        action = self.sender()
+        if action and action.data():
+            name = action.data()
+            self.apply_recognition_backend(name)
+            self.settings.set_value("voice/backend", name)
+            self.statusBar().showMessage(
+                f"Recognition engine: {self.voice_manager.backend.label}", 3000)
+    
+    @tracing.traced("change theme", "gui")
     def change_theme(self):
         """Change application theme"""
         action = self.sender()
@@ -808,6 +1591,7 @@ class DurangMain(QMainWindow):
                 <ul>
                     <li><b>"go to top"</b> or <b>"scroll up"</b> - Move to start</li>
                     <li><b>"go to bottom"</b> or <b>"scroll down"</b> - Move to end</li>
+                    <li><b>"go to heading [title]"</b> - Jump to a heading</li>
                     <li><b>"select all"</b> - Select all text</li>
                     <li><b>"copy"</b> or <b>"paste"</b> - Copy/paste text</li>
                     <li><b>"undo"</b> or <b>"redo"</b> - Undo/redo changes</li>
@@ -817,8 +1601,8 @@ class DurangMain(QMainWindow):
             <div style='margin: 10px 0;'>
                 <h3 style='color: #444;'>📄 Special Formatting</h3>
                 <ul>
-                    <li><b>"title: [text]"</b> - Create large title</li>
-                    <li><b>"heading: [text]"</b> - Create section heading</li>
+                    <li><b>"title: [text]"</b> - Create large title (# in markup mode)</li>
+                    <li><b>"heading: [text]"</b> - Create section heading (## in markup mode)</li>
                     <li><b>"new line"</b> or <b>"new paragraph"</b> - Insert line break</li>
                     <li><b>"insert date"</b> or <b>"insert time"</b> - Add current date/time</li>
                 </ul>
@@ -827,6 +1611,8 @@ class DurangMain(QMainWindow):
             <div style='margin: 10px 0;'>
                 <h3 style='color: #444;'>🔄 App Control</h3>
                 <ul>
+                    <li><b>"read note"</b> or <b>"read selection"</b> - Read aloud</li>
+                    <li><b>"pause reading"</b>, <b>"resume reading"</b>, <b>"skip sentence"</b>, <b>"stop reading"</b></li>
                     <li><b>"about"</b> - Show app information</li>
                     <li><b>"help"</b> - Show this help guide</li>
                     <li><b>"credits"</b> - Show development credits</li>
@@ -886,6 +1672,86 @@ class DurangMain(QMainWindow):
         """
         QMessageBox.about(self, "Credits - DurangDBack", credits_text)
 
+    def handle_launch_args(self, args, cwd):
+        """Act on a command line: ours at startup, or one forwarded by a second launch"""
+        if not hasattr(self, 'text_edit'):
+            self._pending_launches.append((args, cwd))
+            return
+        # Another process's message must never be able to exit this one
+        try:
+            options, _ = build_arg_parser(exit_on_error=False).parse_known_args(args)
+        except (argparse.ArgumentError, SystemExit) as e:
+            print(f"Ignoring launch arguments {args}: {e or '--help'}")
+            return
+        
+        # Bring the existing window forward instead of a new one appearing
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        
+        if options.new:
+            self.new_note()
+        if options.files:
+            self.open_file(os.path.join(cwd, options.files[0]))
+            if len(options.files) > 1:
+                self.statusBar().showMessage(
+                    f"Opened {options.files[0]}; only one note can be open at a time", 5000)
+    
+    def open_file(self, path):
+        """Load a text file into the editor in the background"""
+        self.dictation_sink.flush()
+        if self.text_edit.toPlainText().strip():
+            if not self.confirm_action("Open Note",
+                                     f"Replace the current note with {os.path.basename(path)}?"):
+                return
+        
+        def on_open_success(result):
+            path, content = result
+            self.text_edit.setPlainText(content)
+            self.current_path = path
+            self.statusBar().showMessage(f"Opened: {os.path.basename(path)}", 3000)
+            
+        def on_open_error(error_info):
+            exctype, value, tb = error_info
+            QMessageBox.critical(self, "Error Opening",
+                               f"Failed to open note:\n{str(value)}")
+            self.statusBar().showMessage("Error opening note", 5000)
+        
+        self.thread_manager.start_worker(
+            "open_file",
+            self.note_manager.load_note_from,
+            path,
+            on_result=on_open_success,
+            on_error=on_open_error
+        )
+    
+    def on_note_changed_externally(self, path):
+        """A note service client wrote to a note; reload it if it is the one being edited"""
+        if self.current_path is None or os.path.abspath(path) != os.path.abspath(self.current_path):
+            return
+        name, current = os.path.basename(path), self.current_path
+        if self.text_edit.document().isModified():
+            QMessageBox.warning(self, "Note Changed",
+                                f"{name} was changed by another program while you edited it.\n"
+                                "Saving it now will overwrite those changes.")
+            return
+        
+        def on_reload_success(result):
+            # Still the same note, and still unedited
+            if self.current_path == current and not self.text_edit.document().isModified():
+                self.text_edit.setPlainText(result[1])
+                self.statusBar().showMessage(f"Reloaded {name}: changed by another program", 5000)
+        
+        self.thread_manager.start_worker(
+            "reload_note",
+            self.note_manager.load_note_from,
+            path,
+            on_result=on_reload_success,
+            on_error=lambda error_info: self.statusBar().showMessage(
+                f"Could not reload {name}: {error_info[1]}", 5000)
+        )
+    
     def confirm_action(self, title, message):
         return QMessageBox.question(self, title, message,
                                   QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes
@@ -896,9 +1762,12 @@ class DurangMain(QMainWindow):
                                      "Do you want to clear the current note?"):
                 return
         self.text_edit.clear()
+        self.current_path = None
         self.statusBar().showMessage("Created new note")
 
+    @tracing.traced("save note", "gui")
     def save_note(self):
+        self.dictation_sink.flush()
         text = self.text_edit.toPlainText().strip()
         if not text:
             QMessageBox.warning(self, "Empty Note", "You can't save an empty note!")
@@ -912,25 +1781,9 @@ class DurangMain(QMainWindow):
             "Text Files (*.txt)")
 
         if path:
-            def save_task(progress_callback, status_callback):
-                # Save main file
-                status_callback("Saving note...")
-                progress_callback(25)
-                
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write(text)
-                progress_callback(50)
-                
-                # Create backup
-                status_callback("Creating backup...")
-                backup_path = os.path.join(self.backup_dir, os.path.basename(path))
-                with open(backup_path, "w", encoding="utf-8") as f:
-                    f.write(text)
-                progress_callback(100)
-                
-                return path
-            
             def on_save_success(save_path):
+                self.current_path = save_path
+                self.text_edit.document().setModified(False)
                 QMessageBox.information(self, "Saved", f"Note saved at:\n{save_path}")
                 self.statusBar().showMessage(f"Saved note: {os.path.basename(save_path)}")
                 
@@ -946,36 +1799,177 @@ class DurangMain(QMainWindow):
             # Start save operation in background
             self.thread_manager.start_worker(
                 "save_note",
-                save_task,
+                self.note_manager.save_note_as,
+                path,
+                text,
                 on_result=on_save_success,
                 on_error=on_save_error,
                 on_progress=on_save_progress
             )
 
-    def list_notes(self):
-        def scan_notes_task(progress_callback, status_callback):
-            status_callback("Scanning notes directory...")
-            progress_callback(10)
+    def export_notes(self):
+        """Export every note to HTML, Markdown or PDF in the background"""
+        if self.exporter is not None:
+            if self.confirm_action("Export Notes", "An export is running. Stop it?"):
+                self.exporter.cancel()
+            return
+        
+        dest = self.settings.value("export/dir") or os.path.join(
+            os.path.dirname(self.notes_dir), "export")
+        dialog = ExportDialog(self.settings.value("export/formats").split(","), dest,
+                              self.markup_action.isChecked(), self)
+        if not dialog.exec():
+            return
+        formats = dialog.formats()
+        dest = dialog.dest_edit.text().strip()
+        self.settings.set_value("export/formats", ",".join(formats))
+        self.settings.set_value("export/dir", dest)
+        
+        exporter = NoteExporter(self.note_manager, dest, formats,
+                                markup=dialog.markup_box.isChecked(),
+                                max_workers=self.settings.value("export/workers") or None)
+        
+        def on_export_finished():
+            if self.exporter is exporter:
+                self.exporter = None
+        
+        def on_export_complete(summary):
+            message = f"Exported {summary['exported']} notes to {summary['dest']}"
+            if summary["skipped"]:
+                message += f" ({summary['skipped']} unchanged)"
+            if summary["cancelled"]:
+                message = "Export stopped. " + message + "; export again to resume"
+            if summary["failed"]:
+                failures = "\n".join(f"{name}: {error}" for name, error in summary["failed"][:10])
+                QMessageBox.warning(self, "Export Notes",
+                                    f"{message}\n\n{len(summary['failed'])} notes failed:\n{failures}")
+            self.statusBar().showMessage(message, 5000)
             
-            notes = os.listdir(self.notes_dir)
-            notes = [n for n in notes if n.endswith('.txt')]
-            if not notes:
-                return []
+        def on_export_error(error_info):
+            exctype, value, tb = error_info
+            on_export_finished()
+            QMessageBox.critical(self, "Error Exporting",
+                               f"Failed to export notes:\n{str(value)}")
+            self.statusBar().showMessage("Error exporting notes", 5000)
             
-            # Create a more detailed notes list
-            note_info = []
-            total_notes = len(notes)
-            for i, note in enumerate(notes, 1):
-                path = os.path.join(self.notes_dir, note)
-                size = os.path.getsize(path)
-                modified = datetime.fromtimestamp(os.path.getmtime(path))
-                note_info.append(f"{note}\nSize: {size/1024:.1f}KB\nModified: {modified:%Y-%m-%d %H:%M}")
-                
-                progress = 10 + int(90 * i / total_notes)
-                progress_callback(progress)
-                status_callback(f"Scanning notes... {i}/{total_notes}")
+        self.thread_manager.start_worker(
+            "export_notes",
+            exporter.export_all,
+            resume=dialog.resume_box.isChecked(),
+            on_result=on_export_complete,
+            on_error=on_export_error,
+            on_finished=on_export_finished,
+            on_status=lambda status: self.statusBar().showMessage(status)
+        )
+        self.exporter = exporter  # Only once the export is really running
+
+    def import_notes(self):
+        """Import a folder tree of text files as notes in the background"""
+        if self.importer is not None:
+            if self.confirm_action("Import Notes", "An import is running. Stop it?"):
+                self.importer.cancel()
+            return
+        
+        source = QFileDialog.getExistingDirectory(self, "Import Notes From")
+        if not source:
+            return
+        importer = NoteImporter(self.note_manager)
+        
+        def on_import_finished():
+            if self.importer is importer:
+                self.importer = None
+        
+        def on_import_complete(summary):
+            message = format_summary(summary)
+            if summary["failed"]:
+                failures = "\n".join(f"{source}: {error}" for source, error in summary["failed"][:10])
+                QMessageBox.warning(self, "Import Notes",
+                                    f"{message}\n\nFailed files:\n{failures}")
+            self.statusBar().showMessage(message, 8000)
             
-            return note_info
+        def on_import_error(error_info):
+            exctype, value, tb = error_info
+            on_import_finished()
+            QMessageBox.critical(self, "Error Importing",
+                               f"Failed to import notes:\n{str(value)}")
+            self.statusBar().showMessage("Error importing notes", 5000)
+            
+        self.thread_manager.start_worker(
+            "import_notes",
+            importer.import_tree,
+            source,
+            on_result=on_import_complete,
+            on_error=on_import_error,
+            on_finished=on_import_finished,
+            on_status=lambda status: self.statusBar().showMessage(status)
+        )
+        self.importer = importer  # Only once the import is really running
+
+    def sync_notes(self, choose_folder=False, allow_deletions=False):
+        """
+        Two-way sync of notes and backups with a folder, in the background.
+        Choosing the folder starts over with it: the first sync copies both
+        ways and deletes nothing.
+        """
+        if self.sync_engine is not None:
+            if self.confirm_action("Sync Notes", "A sync is running. Stop it?"):
+                self.sync_engine.cancel()
+            return
+        
+        target = self.settings.value("sync/target")
+        if choose_folder or not target:
+            target = QFileDialog.getExistingDirectory(self, "Sync Notes With", target)
+            if not target:
+                return
+            self.settings.set_value("sync/target", target)
+        engine = SyncEngine(self.note_manager, target)
+        
+        def on_sync_complete(summary):
+            message = format_sync_summary(summary)
+            problems = [f"Conflict, other version kept as {path}"
+                        for path in summary["conflict_copies"]]
+            problems += [f"{path}: {error}" for path, error in summary["failed"]]
+            if problems:
+                QMessageBox.warning(self, "Sync Notes",
+                                    message + "\n\n" + "\n".join(problems[:10]))
+            self.statusBar().showMessage(message, 8000)
+            
+        def on_sync_finished():
+            # A retry may already have started the next sync
+            if self.sync_engine is engine:
+                self.sync_engine = None
+        
+        def on_sync_error(error_info):
+            exctype, value, tb = error_info
+            on_sync_finished()
+            if issubclass(exctype, MassDeletionError):
+                if self.confirm_action("Sync Notes", f"{str(value)}.\n\nDelete them anyway?"):
+                    QTimer.singleShot(0, lambda: self.sync_notes(allow_deletions=True))
+                else:
+                    self.statusBar().showMessage("Sync cancelled; nothing was deleted", 5000)
+                return
+            QMessageBox.critical(self, "Error Syncing",
+                               f"Failed to sync notes:\n{str(value)}")
+            self.statusBar().showMessage("Error syncing notes", 5000)
+            
+        self.thread_manager.start_worker(
+            "sync_notes",
+            engine.sync,
+            allow_deletions=allow_deletions,
+            reset=choose_folder,
+            on_result=on_sync_complete,
+            on_error=on_sync_error,
+            on_finished=on_sync_finished,
+            on_status=lambda status: self.statusBar().showMessage(status)
+        )
+        self.sync_engine = engine  # Only once the sync is really running
+
+    def list_notes(self):
+        def scan_notes_task(progress_callback, status_callback):
+            notes = self.note_manager.scan_notes(progress_callback, status_callback)
+            # Create a more detailed notes list
+            return [f"{note}\nSize: {size/1024:.1f}KB\nModified: {modified:%Y-%m-%d %H:%M}"
+                    for note, size, modified in notes]
         
         def on_scan_complete(note_info):
             if not note_info:
@@ -1005,13 +1999,58 @@ class DurangMain(QMainWindow):
 
 # === Run App ===
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    args, qt_args = build_arg_parser().parse_known_args()
+    
+    # Start recording before anything is created so startup is covered too
+    if args.memory_profile or args.memory_report:
+        start_tracing(args.memory_frames)
+    if args.trace:
+        tracing.enable()
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     apply_dark_theme(app)
     window = DurangMain()
+    if args.memory_profile or args.memory_report or args.trace:
+        window.show_developer_menu(True)
+    if args.serve:
+        window.note_service.start()
+    
+    # Later launches forward their command line here instead of starting up
+    instance = SingleInstance()
+    if not runs_locally(args) and not instance.listen():
+        # Another instance claimed the name while we were starting
+        if forward_to_running_instance(forwarded_args(args)):
+            sys.exit(0)
+    instance.message_received.connect(window.handle_launch_args)
+    window.handle_launch_args(forwarded_args(args), os.getcwd())
     
     # Handle application shutdown
     def cleanup():
         try:
+            if args.memory_report:
+                try:
+                    window.memory_profiler.take_snapshot("Exit")
+                    window.memory_profiler.export_json(args.memory_report)
+                except Exception as e:
+                    print(f"Error writing memory report: {str(e)}")
+            
+            if args.trace and tracing.is_enabled():
+                tracing.disable()
+                try:
+                    tracing.export(args.trace)
+                except OSError as e:
+                    print(f"Error writing trace: {str(e)}")
+            
+            instance.close()
+            
+            if hasattr(window, 'note_service'):
+                window.note_service.stop()
+            
+            # A bulk export, import or sync would otherwise finish every file before quitting
+            for job in ('exporter', 'importer', 'sync_engine'):
+                if getattr(window, job, None) is not None:
+                    getattr(window, job).cancel()
+            
             # Stop all worker threads
             if hasattr(window, 'thread_manager'):
                 try:
@@ -1019,10 +2058,15 @@ if __name__ == "__main__":
                 except Exception as e:
                     print(f"Error stopping threads during cleanup: {str(e)}")
             
+            # Stop spell checker
+            if hasattr(window, 'spell_checker'):
+                window.spell_checker.stop()
+            
             # Stop voice manager
             if hasattr(window, 'voice_manager'):
                 try:
                     window.voice_manager.stop_listening()
+                    window.voice_manager.shutdown()
                 except Exception as e:
                     print(f"Error stopping voice manager during cleanup: {str(e)}")
             
@@ -0,0 +1,55 @@
+"""
+Shared fixtures. Tests run on the offscreen Qt platform, with settings and
+the notes folders in temporary directories, never the user's own.
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Before Qt is loaded: QSettings files go under XDG_CONFIG_HOME on Linux
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp(prefix="durang_tests_")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pytest
+from PySide6.QtWidgets import QApplication, QMessageBox
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+def wait_until(condition, timeout=10.0):
+    """Run the event loop, which delivers the workers' signals, until condition holds"""
+    app = QApplication.instance()
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    """Main window working in tmp_path, with dialogs answered automatically"""
+    monkeypatch.chdir(tmp_path)
+    messages = []
+    for kind in ("information", "warning", "critical"):
+        monkeypatch.setattr(QMessageBox, kind, staticmethod(
+            lambda parent, title, text, *args, kind=kind: messages.append((kind, title, text))))
+    from headless import create_window_class
+    window = create_window_class()()
+    window.messages = messages  # (kind, title, text) of every message box shown
+    yield window
+    window.thread_manager.stop_all()
+    window.voice_manager.shutdown()
+    window.spell_checker.stop()
+    window.deleteLater()
+    qapp.processEvents()
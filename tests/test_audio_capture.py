@@ -0,0 +1,49 @@
+"""
+AudioCaptureStream tests with a fake source whose reads can be made to fail.
+"""
+import struct
+
+from conftest import wait_until
+from core.audio_capture import AudioCaptureStream
+
+QUIET = struct.pack("<h", 10) * 512
+
+
+class FlakySource:
+    """Reads fail while `failures` is above zero; every open is counted"""
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+    CHUNK = 512
+    failures = 0
+    opened = 0
+
+    def __enter__(self):
+        FlakySource.opened += 1
+        self.stream = self
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def read(self, size):
+        if FlakySource.failures > 0:
+            FlakySource.failures -= 1
+            raise OSError("device unplugged")
+        return QUIET
+
+
+def test_failing_source_is_reopened_and_reported_once(qapp, monkeypatch):
+    monkeypatch.setattr(AudioCaptureStream, "RETRY_SECONDS", 0.01)
+    monkeypatch.setattr(FlakySource, "opened", 0)
+    errors = []
+    capture = AudioCaptureStream(source_factory=FlakySource)
+    capture.on_error = errors.append
+    capture.start()
+    try:
+        FlakySource.failures = 3
+        # The first open and one more per failed read
+        assert wait_until(lambda: FlakySource.opened == 4)
+        assert len(errors) == 1
+        assert capture.is_running
+    finally:
+        capture.stop()
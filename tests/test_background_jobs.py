@@ -0,0 +1,86 @@
+"""
+File menu jobs run on named ThreadManager workers; each must work more
+than once per session.
+"""
+from conftest import wait_until
+
+
+def test_sync_twice_in_a_session(window, tmp_path):
+    target = tmp_path / "share"
+    target.mkdir()
+    window.settings.set_value("sync/target", str(target))
+    window.note_manager.create_dirs()
+
+    window.note_manager.save_note("first.txt", "one\n")
+    window.sync_notes()
+    assert window.sync_engine is not None
+    assert wait_until(lambda: window.sync_engine is None)
+    assert (target / "notes" / "first.txt").read_text() == "one\n"
+
+    window.note_manager.save_note("second.txt", "two\n")
+    window.sync_notes()
+    assert wait_until(lambda: window.sync_engine is None)
+    assert (target / "notes" / "second.txt").read_text() == "two\n"
+    assert wait_until(lambda: not window.thread_manager.is_running("sync_notes"))
+    assert "Sync Notes" not in window.suppressed  # Never asked to stop a stale sync
+    assert window.messages == []
+
+
+def test_mass_deletion_retry_runs_a_new_sync(window, tmp_path):
+    target = tmp_path / "share"
+    target.mkdir()
+    window.settings.set_value("sync/target", str(target))
+    window.note_manager.create_dirs()
+    for i in range(5):
+        window.note_manager.save_note(f"note{i}.txt", f"{i}\n")
+    window.sync_notes()
+    assert wait_until(lambda: window.sync_engine is None)
+
+    for i in range(5):
+        (target / "notes" / f"note{i}.txt").unlink()
+    window.sync_notes()  # Refused as a mass deletion; the headless window confirms it
+    assert wait_until(lambda: "Sync Notes" in window.suppressed)
+    assert wait_until(lambda: not (tmp_path / "notes" / "note0.txt").exists())
+    assert wait_until(lambda: window.sync_engine is None)
+    assert window.messages == []
+
+
+def test_export_twice_in_a_session(window, tmp_path, monkeypatch):
+    import main
+    monkeypatch.setattr(main.ExportDialog, "exec", lambda dialog: True)
+    dest = tmp_path / "export"
+    window.settings.set_value("export/dir", str(dest))
+    window.settings.set_value("export/formats", "md")
+    window.note_manager.create_dirs()
+
+    window.note_manager.save_note("first.txt", "# One\n")
+    window.export_notes()
+    assert window.exporter is not None
+    assert wait_until(lambda: window.exporter is None)
+    assert (dest / "first.md").read_text() == "# One\n"
+
+    window.note_manager.save_note("second.txt", "# Two\n")
+    window.export_notes()
+    assert wait_until(lambda: window.exporter is None)
+    assert (dest / "second.md").read_text() == "# Two\n"
+    assert "Export Notes" not in window.suppressed
+    assert window.messages == []
+
+
+def test_import_twice_in_a_session(window, tmp_path, monkeypatch):
+    from PySide6.QtWidgets import QFileDialog
+    sources = [tmp_path / "old1", tmp_path / "old2"]
+    for i, source in enumerate(sources):
+        source.mkdir()
+        (source / f"memo{i}.txt").write_text(f"memo {i}\n")
+    chosen = iter(sources)
+    monkeypatch.setattr(QFileDialog, "getExistingDirectory",
+                        staticmethod(lambda *args: str(next(chosen))))
+
+    for i in range(2):
+        window.import_notes()
+        assert window.importer is not None
+        assert wait_until(lambda: window.importer is None)
+        assert (tmp_path / "notes" / f"memo{i}.txt").read_text() == f"memo {i}\n"
+    assert "Import Notes" not in window.suppressed
+    assert window.messages == []
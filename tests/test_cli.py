@@ -0,0 +1,41 @@
+"""
+Command-line note operations, run in-process through core.cli.main().
+"""
+import io
+import json
+import os
+
+from core import cli
+
+
+def run(monkeypatch, capsys, *argv, stdin=""):
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    status = cli.main(list(argv))
+    out, err = capsys.readouterr()
+    return status, out, err
+
+
+def test_save_list_show_and_search(tmp_path, monkeypatch, capsys):
+    base = str(tmp_path)
+    status, out, _ = run(monkeypatch, capsys, "--dir", base, "save", "todo", stdin="milk\neggs\n")
+    assert status == 0 and out.strip() == os.path.join(base, "notes", "todo.txt")
+    assert os.path.isfile(os.path.join(base, "backup", "todo.txt"))
+
+    assert run(monkeypatch, capsys, "--dir", base, "list")[1] == "todo.txt\n"
+    listed = json.loads(run(monkeypatch, capsys, "--dir", base, "list", "--json")[1])
+    assert [note["name"] for note in listed] == ["todo.txt"]
+    assert run(monkeypatch, capsys, "--dir", base, "show", "todo")[1] == "milk\neggs\n"
+    assert run(monkeypatch, capsys, "--dir", base, "search", "EGG", "-i")[1] == "todo.txt:2:eggs\n"
+    assert run(monkeypatch, capsys, "--dir", base, "search", "bread")[0] == 1
+
+
+def test_reading_commands_create_no_folders(tmp_path, monkeypatch, capsys):
+    status, _, err = run(monkeypatch, capsys, "--dir", str(tmp_path), "show", "missing")
+    assert status == 1 and "not found" in err
+    status, _, err = run(monkeypatch, capsys, "--dir", str(tmp_path), "list")
+    assert status == 1 and err.startswith("Error:")
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "a.txt").write_text("a\n")
+    run(monkeypatch, capsys, "--dir", str(tmp_path), "import", str(source), "--dry-run")
+    assert sorted(os.listdir(tmp_path)) == ["in"]
@@ -0,0 +1,29 @@
+"""
+NoteExporter: export every note, then resume without redoing unchanged ones.
+"""
+import os
+
+from core.exporter import NoteExporter
+from core.note_manager import NoteManager
+
+
+def test_export_writes_every_format_and_skips_unchanged_notes(qapp, tmp_path):
+    notes = NoteManager(str(tmp_path))
+    notes.save_note("a.txt", "# Title\n\nbody\n")
+    notes.save_note("b.txt", "plain\n")
+    dest = str(tmp_path / "export")
+
+    summary = NoteExporter(notes, dest, formats=("html", "md"), max_workers=2).export_all()
+    assert (summary["exported"], summary["skipped"], summary["failed"]) == (2, 0, [])
+    for name in ("a", "b"):
+        assert os.path.isfile(os.path.join(dest, name + ".html"))
+    with open(os.path.join(dest, "a.md"), encoding="utf-8") as f:
+        assert f.read() == "# Title\n\nbody\n"
+    with open(os.path.join(dest, "a.html"), encoding="utf-8") as f:
+        assert "Title" in f.read()
+
+    notes.save_note("b.txt", "changed\n")
+    summary = NoteExporter(notes, dest, formats=("html", "md"), max_workers=2).export_all()
+    assert (summary["exported"], summary["skipped"]) == (1, 1)
+    with open(os.path.join(dest, "b.md"), encoding="utf-8") as f:
+        assert f.read() == "changed\n"
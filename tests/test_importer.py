@@ -0,0 +1,31 @@
+"""
+NoteImporter: a folder tree with a duplicate, a name clash and a legacy encoding.
+"""
+import os
+
+from core.importer import NoteImporter
+from core.note_manager import NoteManager
+
+
+def test_import_tree_saves_new_files_and_skips_duplicates(tmp_path):
+    notes = NoteManager(str(tmp_path / "app"))
+    notes.save_note("todo.txt", "existing\n")
+    source = tmp_path / "source"
+    (source / "sub").mkdir(parents=True)
+    (source / "todo.txt").write_bytes(b"new list\r\n")
+    (source / "sub" / "copy.md").write_bytes(b"existing\r\n")  # Same text as todo.txt
+    (source / "sub" / "caf\xe9.txt").write_bytes("café au lait\n".encode("cp1252"))
+    (source / "image.png").write_bytes(b"\x89PNG")
+
+    summary = NoteImporter(notes, max_workers=2).import_tree(str(source))
+    imported = {src: note for src, note, encoding in summary["imported"]}
+    assert imported == {"todo.txt": "todo_2.txt", os.path.join("sub", "caf\xe9.txt"): "caf\xe9.txt"}
+    assert summary["duplicates"] == [(os.path.join("sub", "copy.md"), "todo.txt")]
+    assert summary["failed"] == []
+    assert notes.load_note("todo_2.txt") == "new list\n"
+    assert notes.load_note("caf\xe9.txt") == "café au lait\n"
+    assert os.path.isfile(os.path.join(notes.backup_path, "todo_2.txt"))
+
+    # A second run finds everything already there
+    summary = NoteImporter(notes, max_workers=2).import_tree(str(source))
+    assert summary["imported"] == [] and len(summary["duplicates"]) == 3
@@ -0,0 +1,97 @@
+"""
+NoteService tests: a stdlib client on a helper thread talks to the service
+while the test pumps the GUI event loop.
+"""
+import os
+import socket
+import threading
+import uuid
+
+import pytest
+
+from conftest import wait_until
+from core.note_manager import NoteManager
+from core.note_service import NoteService
+from core.note_service_client import NoteServiceClient
+from core.thread_manager import ThreadManager
+
+
+def in_thread(func):
+    """Run func on a helper thread; the returned dict gets its result or error"""
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = func()
+        except Exception as e:
+            outcome["error"] = e
+    threading.Thread(target=run, daemon=True).start()
+    return outcome
+
+
+@pytest.fixture
+def service(qapp, tmp_path):
+    threads = ThreadManager()
+    service = NoteService(NoteManager(str(tmp_path)), threads, name=f"durang-test-{uuid.uuid4().hex}")
+    assert service.start()
+    yield service
+    service.stop()
+    threads.stop_all()
+
+
+def test_append_writes_the_note_and_reports_the_change(service):
+    changed = []
+    service.note_changed.connect(changed.append)
+
+    def client():
+        with NoteServiceClient(path=service.address) as notes:
+            notes.call("append_note", name="log", content="one\n")
+            notes.call("append_note", name="log", content="two\n")
+            return notes.call("load_note", name="log")["content"]
+    outcome = in_thread(client)
+    assert wait_until(lambda: outcome and len(changed) == 2)
+    assert outcome == {"result": "one\ntwo\n"}
+    path = os.path.join(service.note_manager.notes_path, "log.txt")
+    assert changed == [path, path]
+    with open(os.path.join(service.note_manager.backup_path, "log.txt"), encoding="utf-8") as f:
+        assert f.read() == "one\ntwo\n"
+
+
+def test_oversized_request_drops_the_connection(service, monkeypatch):
+    monkeypatch.setattr(NoteService, "MAX_REQUEST_BYTES", 1024)
+
+    def client():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(10)
+            sock.connect(service.address)
+            sock.sendall(b"x" * 4096)  # No newline: one endless request
+            received = b""
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    return received
+                received += data
+    outcome = in_thread(client)
+    assert wait_until(lambda: outcome)
+    assert b"Request too large" in outcome["result"]
+    assert wait_until(lambda: service.client_count == 0)
+
+
+def test_open_note_reloads_after_a_service_append(window):
+    assert wait_until(lambda: os.path.isdir(window.notes_dir))
+    path = os.path.join(window.notes_dir, "shared.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("first\n")
+    window.open_file(path)
+    assert wait_until(lambda: window.text_edit.toPlainText() == "first\n")
+
+    window.note_service.name = f"durang-test-{uuid.uuid4().hex}"
+    assert window.note_service.start()
+
+    def client():
+        with NoteServiceClient(path=window.note_service.address) as notes:
+            return notes.call("append_note", name="shared", content="second\n")
+    outcome = in_thread(client)
+    assert wait_until(lambda: window.text_edit.toPlainText() == "first\nsecond\n")
+    assert "error" not in outcome
+    window.note_service.stop()
@@ -0,0 +1,22 @@
+"""
+OutlineIndex lookups on an editor's document.
+"""
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit
+
+from core.outline_index import OutlineIndex
+
+
+def test_partial_match_returns_the_first_heading_in_the_document(qapp):
+    editor = QPlainTextEdit()
+    document = editor.document()
+    document.setPlainText("intro\n# Setup\ntext\n# Notes\n")
+    index = OutlineIndex(document)
+    # Above the others, but indexed after them
+    cursor = QTextCursor(document)
+    cursor.select(QTextCursor.BlockUnderCursor)
+    cursor.insertText("# Settings")
+    assert [e.title for e in index.entries()] == ["Settings", "Setup", "Notes"]
+    assert index.find("set").title == "Settings"
+    assert index.find("ting").title == "Settings"
+    assert index.find("setup").title == "Setup"
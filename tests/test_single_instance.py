@@ -0,0 +1,34 @@
+"""
+Launches forwarded to the running window through SingleInstance.
+"""
+import subprocess
+import sys
+import uuid
+
+from conftest import ROOT, wait_until
+from core.single_instance import SingleInstance
+
+
+def forward(args, name):
+    """Forward from a second process, as a second launch does, while the GUI loop runs"""
+    code = ("import sys; from core.single_instance import forward_to_running_instance; "
+            "sys.exit(0 if forward_to_running_instance(sys.argv[2:], name=sys.argv[1]) else 1)")
+    process = subprocess.Popen([sys.executable, "-c", code, name] + args, cwd=ROOT)
+    assert wait_until(lambda: process.poll() is not None)
+    return process.returncode == 0
+
+
+def test_forwarded_files_open_one_after_another(window, tmp_path):
+    name = f"durang-test-{uuid.uuid4().hex}"
+    instance = SingleInstance(name=name)
+    assert instance.listen()
+    instance.message_received.connect(window.handle_launch_args)
+    try:
+        for i in range(3):
+            path = tmp_path / f"doc{i}.txt"
+            path.write_text(f"document {i}\n")
+            assert forward([str(path)], name)
+            assert wait_until(lambda: window.text_edit.toPlainText() == f"document {i}\n")
+    finally:
+        instance.close()
+    assert window.messages == []
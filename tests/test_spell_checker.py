@@ -0,0 +1,22 @@
+"""
+SpellDictionary tests; pure Python, no word list or Qt event loop needed.
+"""
+import random
+import string
+import time
+
+from core.spell_checker import SpellDictionary
+
+
+def test_suggestions_one_edit_away():
+    words = SpellDictionary(["hello", "help", "world"])
+    assert words.suggestions("helo") == ["help", "hello"]
+
+
+def test_two_edit_fallback_is_bounded_for_long_unknown_words():
+    rng = random.Random(1)
+    words = SpellDictionary(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12))) for _ in range(200000))
+    start = time.perf_counter()
+    words.suggestions("incomprehensibilities")
+    assert time.perf_counter() - start < 0.5
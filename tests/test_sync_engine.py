@@ -0,0 +1,51 @@
+"""
+SyncEngine: two note folders kept in step through one target folder.
+"""
+import os
+
+import pytest
+
+from core.note_manager import NoteManager
+from core.sync_engine import MassDeletionError, SyncEngine
+
+
+def test_changes_and_deletions_travel_between_two_machines(tmp_path):
+    target = tmp_path / "drive"
+    target.mkdir()
+    laptop = NoteManager(str(tmp_path / "laptop"))
+    desktop = NoteManager(str(tmp_path / "desktop"))
+    laptop.save_note("plan.txt", "draft\n")
+    laptop.save_note("old.txt", "remove me\n")
+
+    assert SyncEngine(laptop, str(target)).sync()["push"] == 4  # Two notes, two backups
+    assert SyncEngine(desktop, str(target)).sync()["pull"] == 4
+    assert desktop.load_note("plan.txt") == "draft\n"
+
+    desktop.save_note("plan.txt", "final\n")
+    os.remove(os.path.join(desktop.notes_path, "old.txt"))
+    summary = SyncEngine(desktop, str(target)).sync()
+    assert (summary["push"], summary["delete_remote"]) == (2, 1)
+
+    summary = SyncEngine(laptop, str(target)).sync()
+    assert (summary["pull"], summary["delete_local"]) == (2, 1)
+    assert laptop.load_note("plan.txt") == "final\n"
+    assert not os.path.exists(os.path.join(laptop.notes_path, "old.txt"))
+    # Deletions never reach the backups
+    assert os.path.exists(os.path.join(laptop.backup_path, "old.txt"))
+
+
+def test_emptied_target_needs_permission_to_delete(tmp_path):
+    target = tmp_path / "drive"
+    target.mkdir()
+    notes = NoteManager(str(tmp_path / "app"))
+    for i in range(5):
+        notes.save_note(f"n{i}.txt", f"note {i}\n")
+    SyncEngine(notes, str(target)).sync()
+    for name in os.listdir(target / "notes"):
+        if name.endswith(".txt"):
+            os.remove(target / "notes" / name)
+
+    with pytest.raises(MassDeletionError):
+        SyncEngine(notes, str(target)).sync()
+    assert len(notes.list_notes()) == 5
+    assert SyncEngine(notes, str(target)).sync(allow_deletions=True)["delete_local"] == 5
@@ -0,0 +1,48 @@
+"""
+UndoManager tests on a plain QPlainTextEdit.
+"""
+import pytest
+from PySide6.QtWidgets import QPlainTextEdit
+
+from core.undo_manager import HARD_LIMIT_FACTOR, UndoManager
+
+
+@pytest.fixture
+def editor(qapp):
+    return QPlainTextEdit()
+
+
+def test_undoing_everything_keeps_the_redo_history_counted(editor):
+    undo = UndoManager(editor)
+    editor.textCursor().insertText("hello")
+    recorded = undo.history_bytes
+    assert recorded > 0
+    editor.document().undo()
+    assert undo.history_bytes == recorded
+    editor.document().redo()
+    assert undo.history_bytes == recorded
+    editor.setPlainText("replaced")
+    assert undo.history_bytes == 0
+
+
+def test_keeping_the_history_stops_at_the_hard_limit(editor):
+    undo = UndoManager(editor, max_steps=2)
+    reasons, cleared = [], []
+    undo.limit_reached.connect(reasons.append)
+    undo.history_trimmed.connect(cleared.append)
+
+    def new_step(i):
+        cursor = editor.textCursor()
+        cursor.beginEditBlock()
+        cursor.insertText(f"step {i}\n")
+        cursor.endEditBlock()
+
+    for i in range(2 * HARD_LIMIT_FACTOR + 1):
+        new_step(i)
+        if reasons:
+            reasons.clear()
+            undo.keep_history()
+        if cleared:
+            break
+    assert cleared, "history was never cleared"
+    assert editor.document().availableUndoSteps() == 0
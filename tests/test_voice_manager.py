@@ -0,0 +1,82 @@
+"""
+VoiceManager tests driven by a scripted audio source; no microphone or
+network needed.
+"""
+import queue
+import struct
+
+import pytest
+
+from conftest import wait_until
+from core.recognition_backends import FakeBackend
+from core.voice_manager import VoiceManager
+
+RATE = 16000
+CHUNK = 512
+QUIET = struct.pack("<h", 10) * CHUNK
+LOUD = b"".join(struct.pack("<h", 8000 if i % 2 else -8000) for i in range(CHUNK))
+
+
+class _ScriptedStream:
+    """Plays the frames put on its queue, and silence whenever it is empty"""
+
+    def __init__(self):
+        self.frames = queue.Queue()
+
+    def read(self, size):
+        try:
+            return self.frames.get(timeout=CHUNK / RATE / 4)
+        except queue.Empty:
+            return QUIET
+
+
+class ScriptedSource:
+    SAMPLE_RATE = RATE
+    SAMPLE_WIDTH = 2
+    CHUNK = CHUNK
+    last = None
+
+    def __enter__(self):
+        self.stream = _ScriptedStream()
+        ScriptedSource.last = self
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def play(self, *frames):
+        for frame in frames:
+            self.stream.frames.put(frame)
+
+
+@pytest.fixture
+def voice(qapp, tmp_path, monkeypatch):
+    # The speech cache lives under the working directory
+    monkeypatch.chdir(tmp_path)
+    voice = VoiceManager(backend=FakeBackend(["save note"]), source_factory=ScriptedSource,
+                         recognition_workers=1)
+    yield voice
+    voice.shutdown()
+
+
+def test_commands_work_after_leaving_hands_free_mid_phrase(voice):
+    commands = []
+    voice.voice_command_received.connect(commands.append)
+    voice.start_hands_free(spotter=FakeBackend())
+    source = ScriptedSource.last
+    source.play(*[LOUD] * 10)
+    # Every loud frame is held by the phrase in progress, none handed on yet
+    assert wait_until(lambda: source.stream.frames.empty()
+                      and voice.memory_report()["phrase_bytes"] >= 10 * len(LOUD)
+                      and voice.memory_report()["queued_phrases"] == 0
+                      and voice.pending_phrases == 0)
+
+    # Turned off while a phrase is still being spoken
+    voice.stop_hands_free()
+    assert wait_until(lambda: voice.pending_phrases == 0)
+
+    voice.start_listening()
+    source.play(*[LOUD] * 10 + [QUIET] * 40)
+    assert wait_until(lambda: commands), "push-to-talk command never delivered"
+    voice.stop_listening()
+    assert commands == ["save note"]